@@ -0,0 +1,149 @@
+"""Summarize the close approaches that match a collection of filters, in groups.
+
+The `group_stats` function computes, for each group of close approaches - by
+calendar year, by calendar month, by NEO, or by whether the NEO is hazardous -
+the number of approaches and the minimum, mean and maximum of their distances
+and velocities. It reads these straight from the columns of a `NEODatabase`
+(see `columnar.ApproachColumns`), so no `CloseApproach` is ever built.
+
+If NumPy is installed, the groups are computed from NumPy views of the columns
+in a handful of whole-array operations: the matching rows are sorted by group,
+and each statistic is reduced over each run of rows. Otherwise, the rows are
+accumulated one at a time into a dictionary of groups.
+
+Months are coded as whole months since `helpers.EPOCH`, so that they sort in
+calendar order; years are coded as themselves.
+
+Unknown distances and velocities (NaN) are left out of the minimum, mean and
+maximum on both paths, though the approaches still count towards their group;
+a statistic with no known value in a group is NaN.
+"""
+import collections
+import math
+
+from columnar import np
+from helpers import EPOCH, MINUTES_PER_DAY, MISSING_MINUTE, day_to_month
+
+
+# The attributes that close approaches can be grouped by.
+GROUP_KEYS = ('year', 'month', 'neo', 'hazardous')
+
+# The statistics of one group of close approaches.
+GroupStats = collections.namedtuple('GroupStats', [
+    'group', 'count',
+    'distance_min', 'distance_mean', 'distance_max',
+    'velocity_min', 'velocity_mean', 'velocity_max',
+])
+
+
+def _label(group_by, code, neos):
+    """Return the group label of a group code: a year, a YYYY-MM string, a designation or a hazardous flag."""
+    if group_by in ('year', 'month') and code == MISSING_MINUTE:
+        # Approaches with an unknown time are grouped together, after every year or month.
+        return None
+    if group_by == 'year':
+        return code
+    if group_by == 'month':
+        year, month = divmod(code, 12)
+        return f"{EPOCH.year + year:04d}-{month + 1:02d}"
+    if group_by == 'neo':
+        return neos[code].designation if code < len(neos) else None
+    return bool(code)
+
+
+def group_stats(columns, indices, group_by, neos):
+    """Compute the statistics of the close approaches at some positions, grouped by an attribute.
+
+    :param columns: The `columnar.ApproachColumns` of the close approaches.
+    :param indices: An iterable of the positions of the close approaches to summarize.
+    :param group_by: One of `GROUP_KEYS`.
+    :param neos: The `NearEarthObject`s, by position in `columns.neo_index`, to label NEO groups with.
+    :return: A list of `GroupStats`, one per non-empty group, sorted by group code (with
+             years and months in calendar order, and NEOs in file order).
+    :raises ValueError: If `group_by` isn't one of `GROUP_KEYS`.
+    """
+    if group_by not in GROUP_KEYS:
+        raise ValueError(f"Can't group by {group_by!r}; choose one of {', '.join(GROUP_KEYS)}.")
+    if np is not None:
+        return _group_stats_vectors(columns.vectors, indices, group_by, neos)
+
+    time, distance, velocity = columns.time, columns.distance, columns.velocity
+    if group_by in ('year', 'month'):
+        def code_of(index):
+            if time[index] == MISSING_MINUTE:
+                return MISSING_MINUTE
+            month = day_to_month(time[index] // MINUTES_PER_DAY)
+            return EPOCH.year + month // 12 if group_by == 'year' else month
+    elif group_by == 'neo':
+        code_of = columns.neo_index.__getitem__
+    else:
+        code_of = columns.hazardous.__getitem__
+
+    # Each group accumulates [count, [known, min, sum, max] of distance, [known, min, sum, max] of velocity].
+    groups = {}
+    for index in indices:
+        code = code_of(index)
+        stats = groups.get(code)
+        if stats is None:
+            stats = groups[code] = [0, [0, math.inf, 0.0, -math.inf], [0, math.inf, 0.0, -math.inf]]
+        stats[0] += 1
+        for value, summary in ((distance[index], stats[1]), (velocity[index], stats[2])):
+            if value != value:
+                # An unknown (NaN) value is left out.
+                continue
+            summary[0] += 1
+            if value < summary[1]:
+                summary[1] = value
+            summary[2] += value
+            if value > summary[3]:
+                summary[3] = value
+
+    return [GroupStats(_label(group_by, code, neos), count, *_summary(d_stats), *_summary(v_stats))
+            for code, (count, d_stats, v_stats) in sorted(groups.items())]
+
+
+def _summary(stats):
+    """Return the minimum, mean and maximum of accumulated `[known, min, sum, max]`, or NaNs if none is known."""
+    known, low, total, high = stats
+    if not known:
+        return math.nan, math.nan, math.nan
+    return low, total / known, high
+
+
+def _group_stats_vectors(vectors, indices, group_by, neos):
+    """Compute grouped statistics with whole-array NumPy operations (see `group_stats`)."""
+    if not isinstance(indices, np.ndarray):
+        indices = np.fromiter(indices, dtype=np.int64)
+    if group_by in ('year', 'month'):
+        time = vectors.time[indices]
+        months = time.astype('datetime64[m]').astype('datetime64[M]').astype(np.int64)
+        codes = months // 12 + EPOCH.year if group_by == 'year' else months
+        codes = np.where(time == MISSING_MINUTE, MISSING_MINUTE, codes)
+    elif group_by == 'neo':
+        codes = vectors.neo_index[indices]
+    else:
+        codes = vectors.hazardous[indices].astype(np.int64)
+    if not len(codes):
+        return []
+
+    # Sort the rows by group, so that each group is one run; `reduceat` then reduces every run at once.
+    order = np.argsort(codes, kind='stable')
+    codes = codes[order]
+    starts = np.concatenate(([0], np.flatnonzero(codes[1:] != codes[:-1]) + 1))
+    counts = np.diff(np.append(starts, len(codes)))
+    distance = vectors.distance[indices][order]
+    velocity = vectors.velocity[indices][order]
+
+    columns = [codes[starts].tolist(), counts.tolist()]
+    for values in (distance, velocity):
+        # As `np.nanmin`, `np.nanmean` and `np.nanmax` per run: unknown values are masked out of each reduction.
+        known = ~np.isnan(values)
+        known_counts = np.add.reduceat(known, starts)
+        none_known = known_counts == 0
+        low = np.minimum.reduceat(np.where(known, values, np.inf), starts)
+        total = np.add.reduceat(np.where(known, values, 0.0), starts)
+        high = np.maximum.reduceat(np.where(known, values, -np.inf), starts)
+        columns.append(np.where(none_known, np.nan, low).tolist())
+        columns.append(np.where(none_known, np.nan, total / np.maximum(known_counts, 1)).tolist())
+        columns.append(np.where(none_known, np.nan, high).tolist())
+    return [GroupStats(_label(group_by, row[0], neos), *row[1:]) for row in zip(*columns)]
@@ -0,0 +1,7 @@
+"""Let Python know that the `benchmarks/` folder is a package.
+
+Each benchmark is a script run from the project root as a module, so that it can
+import the project's modules the same way the tests do:
+
+    $ python3 -m benchmarks.bench_cd_to_datetime
+"""
@@ -0,0 +1,79 @@
+"""Compare `helpers.cd_to_datetime` with a plain `strptime` on every `cd` value.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_cd_to_datetime
+    $ python3 -m benchmarks.bench_cd_to_datetime --cadfile tests/test-cad-2020.json --repeat 5
+
+Each parser converts every `cd` value in the close approach file, in file order,
+and the best of several runs is reported. The memoizing layer is cleared before
+each run of `cd_to_datetime`, so its timing includes filling the cache.
+"""
+import argparse
+import datetime
+import json
+import pathlib
+import time
+
+from helpers import cd_to_datetime
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+
+
+def strptime_cd_to_datetime(calendar_date):
+    """Convert a `cd` value with `strptime`, as `helpers.cd_to_datetime` used to."""
+    return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+
+
+def load_calendar_dates(cad_json_path):
+    """Read every `cd` value from a close approach JSON file.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :return: A list of the `cd` strings, in file order.
+    """
+    with open(cad_json_path, 'r') as cad_file_obj:
+        document = json.load(cad_file_obj)
+    position = document['fields'].index('cd')
+    return [entry[position] for entry in document['data']]
+
+
+def best_time(function, values, repeat, setup=None):
+    """Return the fastest of `repeat` runs of `function` over every value, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for value in values:
+            function(value)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description="Benchmark parsing of NASA `cd` timestamps.")
+    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'), type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    parser.add_argument('--repeat', default=3, type=int,
+                        help="Number of runs per parser; the fastest is reported.")
+    args = parser.parse_args()
+
+    values = load_calendar_dates(args.cadfile)
+    if any(cd_to_datetime(value) != strptime_cd_to_datetime(value) for value in values):
+        raise SystemExit("cd_to_datetime disagrees with strptime.")
+
+    baseline = best_time(strptime_cd_to_datetime, values, args.repeat)
+    fast = best_time(cd_to_datetime, values, args.repeat, setup=cd_to_datetime.cache_clear)
+    distinct = len(set(values))
+
+    print(f"{len(values)} `cd` values ({distinct} distinct) from {args.cadfile}")
+    print(f"strptime:       {baseline:8.3f} s  ({len(values) / baseline:12,.0f} values/s)")
+    print(f"cd_to_datetime: {fast:8.3f} s  ({len(values) / fast:12,.0f} values/s)")
+    print(f"speedup:        {baseline / fast:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
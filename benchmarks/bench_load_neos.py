@@ -0,0 +1,71 @@
+"""Compare `extract.load_neos` with the dictionary-per-row loader it replaced.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_load_neos
+    $ python3 -m benchmarks.bench_load_neos --neofile tests/test-neos-2020.csv --repeat 5
+
+Both loaders read every row of the NEO file into `NearEarthObject`s, and the
+best of several runs is reported. The results of the two loaders are checked
+to agree before they are timed.
+"""
+import argparse
+import csv
+import math
+import pathlib
+import time
+
+from extract import load_neos
+from models import NearEarthObject
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+
+
+def dict_reader_load_neos(neo_csv_path):
+    """Read NEOs with a `csv.DictReader` and keyword arguments, as `extract.load_neos` used to."""
+    with open(neo_csv_path, 'r') as neo_file_obj:
+        return [NearEarthObject(**entry) for entry in csv.DictReader(neo_file_obj)]
+
+
+def describe(neo):
+    """Summarize a NEO for comparison, treating unknown diameters as equal."""
+    diameter = None if math.isnan(neo.diameter) else neo.diameter
+    return neo.designation, neo.name, diameter, neo.hazardous
+
+
+def best_time(loader, path, repeat):
+    """Return the fastest of `repeat` runs of `loader` over the file, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description="Benchmark loading of the NEO CSV file.")
+    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'), type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--repeat', default=3, type=int,
+                        help="Number of runs per loader; the fastest is reported.")
+    args = parser.parse_args()
+
+    projected = load_neos(args.neofile)
+    if [describe(neo) for neo in projected] != [describe(neo) for neo in dict_reader_load_neos(args.neofile)]:
+        raise SystemExit("load_neos disagrees with the DictReader loader.")
+
+    baseline = best_time(dict_reader_load_neos, args.neofile, args.repeat)
+    fast = best_time(load_neos, args.neofile, args.repeat)
+
+    print(f"{len(projected)} NEOs from {args.neofile}")
+    print(f"DictReader: {baseline:8.3f} s  ({len(projected) / baseline:12,.0f} rows/s)")
+    print(f"load_neos:  {fast:8.3f} s  ({len(projected) / fast:12,.0f} rows/s)")
+    print(f"speedup:    {baseline / fast:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
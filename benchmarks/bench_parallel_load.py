@@ -0,0 +1,65 @@
+"""Compare sequential and parallel parsing of the data files, for several pool sizes.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_parallel_load
+    $ python3 -m benchmarks.bench_parallel_load --workers 1 2 4 8 --repeat 3
+
+Each run parses both data files and links them into an `NEODatabase`, without
+a snapshot. The sequential run uses `extract.load_neos` and
+`extract.load_approaches`; each parallel run uses `parallel.load_parallel` with
+the given number of workers, both without splitting the close approach file and
+with one chunk per worker. The best of several runs is reported, with the
+number of CPUs for reference - a pool larger than that can't run faster.
+"""
+import argparse
+import os
+import pathlib
+import time
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from parallel import load_parallel
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+
+
+def best_time(load, repeat):
+    """Return the fastest of `repeat` runs of `load` and linking its results, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        NEODatabase(*load())
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison."""
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Benchmark parallel loading of the data files.")
+    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'), type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'), type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    parser.add_argument('--workers', nargs='+', type=int, default=sorted({1, 2, cpus}),
+                        help="The pool sizes to measure.")
+    parser.add_argument('--repeat', default=3, type=int,
+                        help="Number of runs per configuration; the fastest is reported.")
+    args = parser.parse_args()
+
+    baseline = best_time(lambda: (load_neos(args.neofile), load_approaches(args.cadfile)), args.repeat)
+    print(f"{cpus} CPUs; data from {args.neofile} and {args.cadfile}")
+    print(f"sequential:                      {baseline:8.3f} s")
+    for workers in args.workers:
+        for chunks in sorted({1, workers}):
+            elapsed = best_time(lambda: load_parallel(args.neofile, args.cadfile,
+                                                      workers=workers, cad_chunks=chunks), args.repeat)
+            print(f"parallel, {workers:2d} workers, {chunks:2d} chunks: {elapsed:8.3f} s"
+                  f"  ({baseline / elapsed:5.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
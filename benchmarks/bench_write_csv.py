@@ -0,0 +1,81 @@
+"""Measure the throughput of `write.write_to_csv` on a full-data export.
+
+To run this benchmark from the project root, run:
+
+    $ python3 -m benchmarks.bench_write_csv
+    $ python3 -m benchmarks.bench_write_csv --neofile tests/test-neos-2020.csv --cadfile tests/test-cad-2020.json
+
+Every close approach in the data set is written to a temporary CSV file, both by
+`write_to_csv` and by the `serialize`-per-row writer it replaced. The two files
+are checked to be byte-identical, and the best of several runs of each is
+reported in rows per second.
+"""
+import argparse
+import csv
+import pathlib
+import tempfile
+import time
+
+from filters import create_filters
+from snapshot import load_database
+from write import write_to_csv
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+
+
+def serialize_write_to_csv(results, filename):
+    """Write close approaches through `serialize`, as `write.write_to_csv` used to."""
+    fieldnames = ('datetime_utc', 'distance_au', 'velocity_km_s', 'designation', 'name', 'diameter_km', 'potentially_hazardous')
+    with open(filename, mode='w') as neo_file:
+        neo_writer = csv.writer(neo_file, delimiter=',')
+        neo_writer.writerow(fieldnames)
+        for row in results:
+            ser_approach = row.serialize()
+            ser_neo = ser_approach['neo']
+            neo_writer.writerow([ser_approach['datetime_utc'], ser_approach['distance_au'], ser_approach['velocity_km_s'],
+                                 ser_neo['designation'], ser_neo['name'], ser_neo['diameter_km'],
+                                 ser_neo['potentially_hazardous']])
+
+
+def best_time(writer, results, path, repeat):
+    """Return the fastest of `repeat` runs of `writer` over the results, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        writer(results, path)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    """Run the benchmark and print a comparison."""
+    parser = argparse.ArgumentParser(description="Benchmark writing every close approach to CSV.")
+    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'), type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'), type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    parser.add_argument('--repeat', default=3, type=int,
+                        help="Number of runs per writer; the fastest is reported.")
+    args = parser.parse_args()
+
+    database = load_database(args.neofile, args.cadfile, use_cache=False)
+    results = list(database.query(create_filters()))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        baseline_path = pathlib.Path(tmpdir) / 'baseline.csv'
+        fast_path = pathlib.Path(tmpdir) / 'fast.csv'
+        baseline = best_time(serialize_write_to_csv, results, baseline_path, args.repeat)
+        fast = best_time(write_to_csv, results, fast_path, args.repeat)
+        if baseline_path.read_bytes() != fast_path.read_bytes():
+            raise SystemExit("write_to_csv output differs from the serialize-per-row writer.")
+
+    print(f"{len(results)} rows from {args.cadfile}")
+    print(f"serialize per row: {baseline:8.3f} s  ({len(results) / baseline:12,.0f} rows/s)")
+    print(f"write_to_csv:      {fast:8.3f} s  ({len(results) / fast:12,.0f} rows/s)")
+    print(f"speedup:           {baseline / fast:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""Generate synthetic NEO and close approach data files of any size, for benchmarking.
+
+To generate a data set from the project root, run:
+
+    $ python3 -m benchmarks.generate_data --outdir /tmp/neo-data
+    $ python3 -m benchmarks.generate_data --outdir /tmp/neo-data --neos 500000 --approaches 10000000
+
+The files have the same layout as NASA's: `neos.csv` has every column of the
+Small-Body Database query that produced `data/neos.csv`, and `cad.json` is the
+Close Approach Data API's object of `signature`, `count`, `fields` and `data`,
+with every field of each row. Values are drawn to match the real data:
+
+- Each NEO copies the physical parameters (diameter, albedo, H magnitude, the
+  hazardous flag, ...) of a random NEO in `tests/test-neos-2020.csv`, so the
+  shares of NEOs with a known diameter, a name, or a hazardous flag are those
+  of the real catalog. Designations are made unique.
+- Close approaches are spread evenly in time from 1900 to 2200 and written in
+  time order, as the API returns them. Distances and velocities are drawn from
+  `tests/test-cad-2020.json`. A few NEOs have many approaches and most have few,
+  as in the real data.
+
+Rows are written as they are generated, so files of tens of millions of rows
+never need to fit in memory. A `--seed` makes the output reproducible.
+"""
+import argparse
+import bisect
+import csv
+import datetime
+import itertools
+import json
+import pathlib
+import random
+
+from helpers import EPOCH
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+TEST_NEO_FILE = PROJECT_ROOT / 'tests' / 'test-neos-2020.csv'
+TEST_CAD_FILE = PROJECT_ROOT / 'tests' / 'test-cad-2020.json'
+
+# The defaults match the size of the full data set in `data/`.
+DEFAULT_NEOS = 23967
+DEFAULT_APPROACHES = 406785
+
+# The time span of the close approaches, as in `data/cad.json`.
+FIRST_TIME = datetime.datetime(1900, 1, 1)
+LAST_TIME = datetime.datetime(2200, 12, 31, 23, 59)
+
+# The Julian date of `helpers.EPOCH`.
+EPOCH_JD = 2440587.5
+
+# The letters of provisional designations (I is never used).
+_LETTERS = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'
+_MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def designation(index):
+    """Return a unique provisional designation for the NEO at a position, such as '1987 CJ13'.
+
+    :param index: The position of the NEO.
+    :return: A designation of a year, two letters and a cycle number, unique to `index`.
+    """
+    cycle, rest = divmod(index, 300 * len(_LETTERS) * 24)
+    rest, year = divmod(rest, 300)
+    half_month, letter = divmod(rest, len(_LETTERS))
+    return f"{1900 + year} {_LETTERS[half_month]}{_LETTERS[letter]}{cycle or ''}"
+
+
+def read_templates():
+    """Read the rows of the bundled test data files, to draw values from.
+
+    :return: A tuple of the NEO CSV header, the NEO rows (as lists), the close approach
+             `fields` and `signature`, and the close approach rows.
+    """
+    with open(TEST_NEO_FILE, newline='') as neo_file:
+        reader = csv.reader(neo_file)
+        header = next(reader)
+        neo_rows = list(reader)
+    with open(TEST_CAD_FILE) as cad_file:
+        document = json.load(cad_file)
+    return header, neo_rows, document['fields'], document['signature'], document['data']
+
+
+def write_neos(path, count, header, templates, rng):
+    """Write a CSV file of synthetic NEOs.
+
+    :param path: Where to save the file.
+    :param count: The number of NEOs.
+    :param header: The header of the NEO CSV file.
+    :param templates: The rows of real NEOs to copy physical parameters from.
+    :param rng: A `random.Random` to draw values with.
+    :return: A tuple of the list of designations and the list of H magnitudes written.
+    """
+    columns = {field: position for position, field in enumerate(header)}
+    designations, magnitudes = [], []
+    with open(path, 'w', newline='') as neo_file:
+        writer = csv.writer(neo_file)
+        writer.writerow(header)
+        for index in range(count):
+            row = list(rng.choice(templates))
+            pdes = designation(index)
+            name = f"Synthetic {index}" if row[columns['name']] else ''
+            row[columns['id']] = f"bK{index:07d}"
+            row[columns['spkid']] = str(3000000 + index)
+            row[columns['pdes']] = pdes
+            row[columns['name']] = name
+            row[columns['full_name']] = f"  {pdes} ({name})" if name else f"       ({pdes})"
+            designations.append(pdes)
+            magnitudes.append(row[columns['H']])
+            writer.writerow(row)
+    return designations, magnitudes
+
+
+def _cd(minute):
+    """Format a number of minutes since `helpers.EPOCH` as a `cd` field, such as '2020-Jan-01 00:54'."""
+    moment = EPOCH + datetime.timedelta(minutes=minute)
+    return f"{moment.year:04d}-{_MONTH_NAMES[moment.month - 1]}-{moment.day:02d} {moment.hour:02d}:{moment.minute:02d}"
+
+
+def write_approaches(path, count, designations, magnitudes, fields, signature, templates, rng):
+    """Write a JSON file of synthetic close approaches, in time order, one row at a time.
+
+    :param path: Where to save the file.
+    :param count: The number of close approaches.
+    :param designations: The designations of the NEOs to assign approaches to.
+    :param magnitudes: The H magnitude of each NEO, in the same order.
+    :param fields: The `fields` of the close approach data.
+    :param signature: The `signature` of the close approach data.
+    :param templates: The rows of real close approaches to draw distances and velocities from.
+    :param rng: A `random.Random` to draw values with.
+    """
+    position = {field: index for index, field in enumerate(fields)}
+    # A Pareto weight per NEO: a few NEOs get many approaches, and most get a handful.
+    cumulative = list(itertools.accumulate(rng.paretovariate(2.5) for _ in designations))
+    first = (FIRST_TIME - EPOCH) // datetime.timedelta(minutes=1)
+    span = (LAST_TIME - FIRST_TIME) // datetime.timedelta(minutes=1)
+
+    with open(path, 'w') as cad_file:
+        cad_file.write('{"signature":' + json.dumps(signature) + ',"count":' + json.dumps(str(count))
+                       + ',"fields":' + json.dumps(fields) + ',"data":[\n')
+        # Exponential gaps between times spread them evenly over the span, already sorted.
+        minute = float(first)
+        for index in range(count):
+            minute += rng.expovariate(1.0) * span / count
+            neo = bisect.bisect(cumulative, rng.random() * cumulative[-1])
+            template = rng.choice(templates)
+            whole_minute = min(int(minute), first + span)
+            row = list(template)
+            row[position['des']] = designations[neo]
+            row[position['orbit_id']] = str(rng.randint(1, 200))
+            row[position['jd']] = f"{EPOCH_JD + whole_minute / 1440:.9f}"
+            row[position['cd']] = _cd(whole_minute)
+            row[position['h']] = magnitudes[neo] or template[position['h']]
+            cad_file.write(json.dumps(row, separators=(',', ':')))
+            cad_file.write(',\n' if index + 1 < count else '\n')
+        cad_file.write(']}\n')
+
+
+def generate(outdir, neos=DEFAULT_NEOS, approaches=DEFAULT_APPROACHES, seed=0):
+    """Generate a synthetic `neos.csv` and `cad.json` in a folder.
+
+    :param outdir: The folder in which to save the files; it is created if needed.
+    :param neos: The number of NEOs.
+    :param approaches: The number of close approaches.
+    :param seed: The seed of the random number generator, for reproducible files.
+    :return: A tuple of the paths of the NEO file and the close approach file.
+    """
+    outdir = pathlib.Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    header, neo_rows, fields, signature, cad_rows = read_templates()
+
+    neo_path, cad_path = outdir / 'neos.csv', outdir / 'cad.json'
+    designations, magnitudes = write_neos(neo_path, neos, header, neo_rows, rng)
+    write_approaches(cad_path, approaches, designations, magnitudes, fields, signature, cad_rows, rng)
+    return neo_path, cad_path
+
+
+def main():
+    """Generate the data files."""
+    parser = argparse.ArgumentParser(description="Generate synthetic NEO and close approach data files.")
+    parser.add_argument('--outdir', required=True, type=pathlib.Path,
+                        help="Folder in which to save `neos.csv` and `cad.json`.")
+    parser.add_argument('--neos', default=DEFAULT_NEOS, type=int,
+                        help="The number of NEOs (by default, as many as in the full data set).")
+    parser.add_argument('--approaches', default=DEFAULT_APPROACHES, type=int,
+                        help="The number of close approaches (by default, as many as in the full data set).")
+    parser.add_argument('--seed', default=0, type=int,
+                        help="The seed of the random number generator.")
+    args = parser.parse_args()
+
+    neo_path, cad_path = generate(args.outdir, args.neos, args.approaches, args.seed)
+    print(f"Wrote {args.neos} NEOs to {neo_path} and {args.approaches} close approaches to {cad_path}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Report the memory used per `NearEarthObject` and per `CloseApproach`.
+
+To run this report from the project root, run:
+
+    $ python3 -m benchmarks.memory_report
+    $ python3 -m benchmarks.memory_report --neofile tests/test-neos-2020.csv --cadfile tests/test-cad-2020.json
+
+The data set is loaded and linked as usual. Then, for each model, every object
+is copied twice - once into an instance of the slotted model class, and once
+into a plain object that keeps the same attributes in a per-instance `__dict__`
+(as the models did before they declared `__slots__`) - and `tracemalloc`
+measures the bytes allocated per copy. The attribute values themselves are
+shared with the originals, so only the cost of the object layout is counted.
+"""
+import argparse
+import pathlib
+import sys
+import tracemalloc
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+
+
+# Plain classes, one per model, whose instances hold attributes in a per-instance `__dict__`.
+_DICT_BACKED = {}
+
+
+def slotted_copy(obj):
+    """Copy an object into a new instance of its own slotted class."""
+    copy = object.__new__(type(obj))
+    for name in type(obj).__slots__:
+        setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def dict_backed_copy(obj):
+    """Copy the slotted attributes of an object into a plain, dict-backed object."""
+    cls = type(obj)
+    if cls not in _DICT_BACKED:
+        # A separate class per model keeps CPython's key-sharing dictionaries in play, as before.
+        _DICT_BACKED[cls] = type(f'DictBacked{cls.__name__}', (), {})
+    copy = _DICT_BACKED[cls]()
+    for name in type(obj).__slots__:
+        setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def bytes_per_copy(objects, copy):
+    """Measure the bytes allocated per object when copying each object with `copy`."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        copies = [copy(obj) for obj in objects]
+        allocated = tracemalloc.get_traced_memory()[0] - baseline - sys.getsizeof(copies)
+    finally:
+        tracemalloc.stop()
+    return allocated / max(len(copies), 1)
+
+
+def main():
+    """Load the data set and print the memory report."""
+    parser = argparse.ArgumentParser(description="Report the memory used by each model object.")
+    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'), type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'), type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    args = parser.parse_args()
+
+    neos = load_neos(args.neofile)
+    approaches = load_approaches(args.cadfile)
+    NEODatabase(neos, approaches)
+
+    print(f"{'':18} {'count':>9} {'__dict__ B/obj':>15} {'__slots__ B/obj':>16} {'saved MB':>9}")
+    for label, objects in (('NearEarthObject', neos), ('CloseApproach', approaches)):
+        before = bytes_per_copy(objects, dict_backed_copy)
+        after = bytes_per_copy(objects, slotted_copy)
+        saved = (before - after) * len(objects) / 2 ** 20
+        print(f"{label:18} {len(objects):9} {before:15.1f} {after:16.1f} {saved:9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""Time each stage of the project's work on a data set, and compare with a stored baseline.
+
+To run the suite from the project root, run:
+
+    $ python3 -m benchmarks.suite
+    $ python3 -m benchmarks.generate_data --outdir /tmp/neo-data
+    $ python3 -m benchmarks.suite --neofile /tmp/neo-data/neos.csv --cadfile /tmp/neo-data/cad.json
+
+The suite times loading each data file, linking them into an `NEODatabase`,
+building the database's indexes (see `NEODatabase.build_indexes`), a query on
+each kind of filter (and on all of them at once), a `limit`ed query, exporting
+every close approach to CSV and to JSON, and a query through the interactive
+shell, both the first time and again from its cache. Each case runs `--repeat`
+times, after garbage collection; the fastest run is kept. Queries run once
+more beforehand, untimed, so that they are timed at their steady state.
+
+The results are saved as JSON with `--output`, and compared case by case with a
+baseline - by default, `benchmarks/baseline.json`, which was measured on the
+default synthetic data set (`benchmarks.generate_data` with its defaults). A
+case slower than its baseline by more than `--tolerance` is reported as a
+regression (unless it's slower by under a millisecond, which is mostly noise),
+and the suite then exits with status 1. `--save-baseline` replaces
+the baseline with the current results instead.
+"""
+import argparse
+import contextlib
+import datetime
+import gc
+import io
+import json
+import pathlib
+import platform
+import sys
+import tempfile
+import time
+
+from cache import QueryCache
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, limit
+from main import NEOShell, make_parser
+from write import write_to_csv, write_to_json
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+BASELINE = pathlib.Path(__file__).parent / 'baseline.json'
+
+# The criteria of the query cases, one per kind of filter.
+QUERIES = {
+    'query_all': {},
+    'query_date': {'date': datetime.date(2020, 1, 1)},
+    'query_date_range': {'start_date': datetime.date(2020, 1, 1), 'end_date': datetime.date(2020, 12, 31)},
+    'query_distance': {'distance_max': 0.05},
+    'query_velocity': {'velocity_min': 30},
+    'query_diameter': {'diameter_min': 1},
+    'query_hazardous': {'hazardous': True},
+    'query_combined': {'start_date': datetime.date(2000, 1, 1), 'distance_max': 0.1, 'velocity_min': 10,
+                       'diameter_max': 5, 'hazardous': False},
+}
+
+# The command of the interactive shell cases.
+SHELL_COMMAND = 'query --start-date 2000-01-01 --max-distance 0.1 --limit 10'
+
+# A case is never a regression if it's slower than its baseline by less than this, in seconds:
+# timings of a fraction of a millisecond are mostly noise.
+NOISE_FLOOR = 0.001
+
+
+def best_time(run, repeat, setup=None, warm_up=False):
+    """Return the fastest of `repeat` runs of a function, in seconds.
+
+    :param run: A function to time; it is called with the result of `setup`, if given.
+    :param repeat: The number of runs.
+    :param setup: A function to call, untimed, before each run.
+    :param warm_up: Whether to call `run` once more, untimed, before the timed runs.
+    :return: The fastest run's duration, in seconds.
+    """
+    if warm_up:
+        run(*((setup(),) if setup is not None else ()))
+    timings = []
+    for _ in range(repeat):
+        arguments = (setup(),) if setup is not None else ()
+        gc.collect()
+        start = time.perf_counter()
+        run(*arguments)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def shell_query(shell, command=SHELL_COMMAND):
+    """Run a command in an interactive shell, discarding what it prints."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        shell.onecmd(command)
+
+
+def run_suite(neofile, cadfile, repeat):
+    """Time every case of the suite on a data set.
+
+    :param neofile: A path to a CSV file of near-Earth objects.
+    :param cadfile: A path to a JSON file of close approach data.
+    :param repeat: The number of runs of each case.
+    :return: A tuple of a dictionary describing the data set, and a dictionary mapping each
+             case's name to its fastest time, in seconds.
+    """
+    results = {}
+    results['load_neos'] = best_time(lambda: load_neos(neofile), repeat)
+    results['load_approaches'] = best_time(lambda: load_approaches(cadfile), repeat)
+    results['link'] = best_time(lambda loaded: NEODatabase(*loaded), repeat,
+                                setup=lambda: (load_neos(neofile), load_approaches(cadfile)))
+
+    new_database = lambda: NEODatabase(load_neos(neofile), load_approaches(cadfile))  # noqa: E731
+    results['build_indexes'] = best_time(NEODatabase.build_indexes, repeat, setup=new_database)
+
+    # The query cases time queries on a database whose indexes are already built.
+    database = new_database()
+    database.build_indexes()
+    for name, criteria in QUERIES.items():
+        results[name] = best_time(lambda: sum(1 for _ in database.query(create_filters(**criteria))), repeat,
+                                  warm_up=True)
+    results['limit'] = best_time(lambda: list(limit(database.query(create_filters(distance_min=0.4)), 10)), repeat,
+                                 warm_up=True)
+
+    approaches = list(database.query(create_filters()))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results['export_csv'] = best_time(lambda: write_to_csv(approaches, pathlib.Path(tmpdir) / 'all.csv'), repeat)
+        results['export_json'] = best_time(lambda: write_to_json(approaches, pathlib.Path(tmpdir) / 'all.json'),
+                                           repeat)
+
+    _, inspect_parser, query_parser = make_parser()
+    new_shell = lambda: NEOShell(database, inspect_parser, query_parser, cache=QueryCache())  # noqa: E731
+    results['shell_query'] = best_time(shell_query, repeat, setup=new_shell)
+    cached_shell = new_shell()
+    shell_query(cached_shell)
+    results['shell_query_cached'] = best_time(lambda: shell_query(cached_shell), repeat)
+
+    dataset = {'neos': len(database._neos), 'approaches': len(database._approaches)}
+    return dataset, results
+
+
+def compare(results, baseline, tolerance):
+    """Print each case's time next to its baseline, and find the regressions.
+
+    :param results: A dictionary mapping each case's name to its time, in seconds.
+    :param baseline: A dictionary mapping case names to their baseline times, in seconds.
+    :param tolerance: The fraction by which a case may be slower than its baseline.
+    :return: A list of the names of the cases slower than their baseline by more than `tolerance`
+             (and by more than `NOISE_FLOOR`).
+    """
+    regressions = []
+    print(f"{'case':<20} {'seconds':>10} {'baseline':>10} {'ratio':>7}")
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<20} {seconds:10.4f} {'-':>10} {'-':>7}")
+            continue
+        ratio = seconds / reference if reference else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance and seconds - reference > NOISE_FLOOR:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<20} {seconds:10.4f} {reference:10.4f} {ratio:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    """Run the suite, save its results, and compare them with the baseline."""
+    parser = argparse.ArgumentParser(description="Time each stage of the project's work on a data set.")
+    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'), type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'), type=pathlib.Path,
+                        help="Path to JSON file of close approach data.")
+    parser.add_argument('--repeat', default=3, type=int,
+                        help="Number of runs per case; the fastest is reported.")
+    parser.add_argument('--output', type=pathlib.Path,
+                        help="File in which to save the results, as JSON.")
+    parser.add_argument('--baseline', default=BASELINE, type=pathlib.Path,
+                        help="The results to compare with, as saved by --output or --save-baseline.")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Replace the baseline with these results, instead of comparing with it.")
+    parser.add_argument('--tolerance', default=0.25, type=float,
+                        help="The fraction by which a case may be slower than its baseline.")
+    args = parser.parse_args()
+
+    dataset, results = run_suite(args.neofile, args.cadfile, args.repeat)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dataset': dataset,
+        'results': results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"Saved the results as the baseline in {args.baseline}.")
+        return
+
+    try:
+        baseline = json.loads(args.baseline.read_text())
+    except (OSError, ValueError):
+        print(f"No baseline in {args.baseline}; use --save-baseline to store one.", file=sys.stderr)
+        baseline = {'dataset': dataset, 'results': {}}
+    if baseline['dataset'] != dataset:
+        print(f"The baseline was measured on {baseline['dataset']}, not {dataset}; "
+              f"the comparison is only indicative.", file=sys.stderr)
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Cache the results of queries, for an interactive session that repeats them.
+
+A `QueryCache` remembers, for each recently-run collection of filters, the
+positions of the matching close approaches in the `NEODatabase` - compact
+`array.array`s of integers, rather than the `CloseApproach` objects themselves.
+Filters are normalized into a `filters.FilterPlan` first, so the same criteria
+given in a different order, or with a different `--limit` or `--outfile`, hit
+the same entry.
+
+A query that isn't cached, but only narrows the criteria of one that is (say, a
+cached `--start-date 2020-01-01` followed by `--start-date 2020-01-01
+--max-distance 0.1`), is answered by filtering the cached positions instead of
+scanning the database.
+
+A `--limit`ed query that misses is answered by the database directly, so it
+keeps the database's shortcuts - stopping at the `limit`-th match, or walking a
+presorted index for the first matches in `--sort-by` order - and is only cached
+if its matches are estimated to be few (see `NEODatabase.estimate_count`), so
+that finding all of them costs little more. An unlimited query finds every
+match anyway, so its matches are always cached.
+
+The cache holds at most `max_entries` results and `max_bytes` bytes of
+positions, evicting the least recently used results first. It belongs to one
+`NEODatabase`, at one `generation`: querying it with another database, or after
+the database has been updated in place (see `NEODatabase.update`), empties it.
+"""
+import array
+import collections
+import sys
+
+from filters import FilterPlan, DateFilter
+
+
+# A limited query that misses is answered in full, and cached, if it is estimated to match at most this many approaches.
+EAGER_MATCHES = 4096
+
+
+class QueryCache:
+    """A bounded, least-recently-used cache of the positions of matching close approaches."""
+    def __init__(self, max_entries=64, max_bytes=64 << 20, eager_matches=EAGER_MATCHES):
+        """Create a new, empty `QueryCache`.
+
+        :param max_entries: The maximum number of query results to keep.
+        :param max_bytes: The maximum total size, in bytes, of the query results to keep.
+        :param eager_matches: The largest estimated number of matches of a limited query that misses
+                              for which every match is found and cached.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.eager_matches = eager_matches
+        self._entries = collections.OrderedDict()
+        self._database = None
+        self._generation = None
+        self.bytes = 0
+        self.hits = 0
+        self.narrowed = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """Return the number of cached query results."""
+        return len(self._entries)
+
+    def clear(self):
+        """Forget every cached query result, keeping the counters."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def query(self, database, filters, sort_by=None, descending=False, limit=None):
+        """Query a database for the close approaches that match a collection of filters, through the cache.
+
+        The cache holds every match of the filters, in internal order; any
+        `sort_by` order (see `NEODatabase.order_indices`) and `limit` are
+        applied to the cached positions, so they don't make a separate entry.
+        A `limit`ed query that can't be answered from the cache, and is
+        estimated to match more than `eager_matches` approaches, goes to the
+        database as it is, and isn't cached.
+
+        :param database: The `NEODatabase` to query.
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param sort_by: One of `database.SORT_KEYS` to order the matches by, or None for internal order.
+        :param descending: Whether to order the matches from the largest value of `sort_by` down.
+        :param limit: The maximum number of matches to generate, or None (or 0) for all of them.
+        :return: A stream of matching `CloseApproach` objects, in the same order as `database.query`.
+        """
+        if database is not self._database or database.generation != self._generation:
+            self.clear()
+            self._database, self._generation = database, database.generation
+
+        plan = FilterPlan.from_filters(filters)
+        key = plan.key
+        if key is None:
+            # Criteria that can't be compared can't be cached.
+            self.misses += 1
+            return database.query(plan, sort_by=sort_by, descending=descending, limit=limit)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._results(database, entry[1], sort_by, descending, limit)
+
+        within = self._narrowest_superset(plan)
+        if within is not None:
+            self.narrowed += 1
+        else:
+            self.misses += 1
+            if limit and database.estimate_count(plan) > self.eager_matches:
+                return database.query(plan, sort_by=sort_by, descending=descending, limit=limit)
+        indices = array.array('q', database.query_indices(plan, within=within))
+        self._store(key, plan, indices)
+        return self._results(database, indices, sort_by, descending, limit)
+
+    @staticmethod
+    def _results(database, indices, sort_by, descending, limit):
+        """Look up the close approaches at cached positions, in the order and number asked for."""
+        if sort_by is not None:
+            indices = database.order_indices(indices, sort_by, descending=descending, limit=limit)
+        elif limit:
+            indices = indices[:limit]
+        return database.approaches_at(indices)
+
+    def _narrowest_superset(self, plan):
+        """Find the smallest cached result that holds every match of a plan, in the right order.
+
+        Cached results are ordered as their own queries generate them, which is
+        time order only if they have date criteria - so a result is only reused
+        for a plan with date criteria if it has them too, and vice versa.
+
+        :param plan: A `FilterPlan` that isn't cached itself.
+        :return: The cached positions, or None if no cached result narrows down to the plan.
+        """
+        dated = DateFilter in plan.intervals
+        best = None
+        for cached_plan, indices in self._entries.values():
+            if (DateFilter in cached_plan.intervals) != dated or not plan.narrows(cached_plan):
+                continue
+            if best is None or len(indices) < len(best):
+                best = indices
+        return best
+
+    def _store(self, key, plan, indices):
+        """Cache the positions matching a plan, evicting least recently used results to fit."""
+        size = sys.getsizeof(indices)
+        if size > self.max_bytes or self.max_entries < 1:
+            return
+        while self._entries and (len(self._entries) >= self.max_entries or self.bytes + size > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= sys.getsizeof(evicted)
+            self.evictions += 1
+        self._entries[key] = (plan, indices)
+        self.bytes += size
+
+    def stats(self):
+        """Return a one-line summary of the cache's contents and counters."""
+        return (f"{len(self._entries)}/{self.max_entries} results, "
+                f"{self.bytes / (1 << 20):.1f}/{self.max_bytes / (1 << 20):.1f} MiB; "
+                f"{self.hits} hits, {self.narrowed} narrowed, {self.misses} misses, "
+                f"{self.evictions} evictions")
@@ -0,0 +1,251 @@
+"""Store close approach data column by column for fast querying.
+
+The `ApproachColumns` class lays out the attributes that the filters from
+`filters.create_filters` inspect - approach time, distance and velocity, and the
+diameter and hazardous flag of the approach's NEO - as compact, contiguous
+`array.array`s, one entry per close approach. The columns are read from the raw
+values that each `CloseApproach` keeps, so building them doesn't parse a
+`datetime` per approach. Filters read these columns directly by position,
+instead of fetching attributes from each `CloseApproach`.
+
+If NumPy is installed, the same columns can also be viewed, without copying, as
+NumPy arrays (see `ApproachColumns.vectors`). Each filter can then be evaluated
+over the whole data set at once as a boolean mask. NumPy is an optional
+dependency: if it isn't installed, `np` is None and `NEODatabase` keeps to its
+row-by-row query path.
+
+Times are stored as whole minutes since `helpers.EPOCH` (NASA's data doesn't
+carry seconds), and dates as whole days since `helpers.EPOCH`.
+"""
+import array
+import bisect
+
+from helpers import MINUTES_PER_DAY, MISSING_DAY, MISSING_MINUTE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy.
+    np = None
+
+
+class ApproachColumns:
+    """A columnar copy of a linked set of NEOs and close approaches.
+
+    Approach-side columns (`time`, `distance`, `velocity` and `neo_index`) have
+    one entry per close approach, in the same order as the approaches supplied
+    to the constructor. NEO-side columns (`neo_diameter` and `neo_hazardous`)
+    have one entry per NEO, plus a final sentinel entry (unknown diameter, not
+    hazardous) that unlinked approaches point to, so that gathering NEO
+    attributes never needs a special case.
+
+    The `day`, `diameter` and `hazardous` columns, with one entry per close
+    approach, are derived from these on first use.
+    """
+    def __init__(self, neos, approaches):
+        """Create a new `ApproachColumns` from linked NEOs and close approaches.
+
+        :param neos: A collection of `NearEarthObject`s.
+        :param approaches: A collection of `CloseApproach`es, already linked to `neos`.
+        """
+        position_by_neo = {id(neo): index for index, neo in enumerate(neos)}
+        missing = len(position_by_neo)
+
+        self.neo_diameter = array.array('d', [neo.diameter for neo in neos])
+        self.neo_diameter.append(float('nan'))
+        self.neo_hazardous = array.array('b', [neo.hazardous for neo in neos])
+        self.neo_hazardous.append(False)
+
+        self.time = array.array('q', [approach.minute for approach in approaches])
+        self.distance = array.array('d', [float(approach._distance) for approach in approaches])
+        self.velocity = array.array('d', [float(approach._velocity) for approach in approaches])
+        self.neo_index = array.array('q', [position_by_neo.get(id(approach.neo), missing)
+                                           for approach in approaches])
+
+        self._derived = {}
+        self._vectors = None
+
+    @classmethod
+    def from_buffers(cls, time, distance, velocity, neo_index, neo_diameter, neo_hazardous):
+        """Create a new `ApproachColumns` around existing columns, without copying them.
+
+        Each column may be any indexable buffer of the right item type - such
+        as an `array.array`, or a `memoryview` of a memory-mapped file.
+
+        :return: A new `ApproachColumns` sharing memory with the given columns.
+        """
+        columns = cls.__new__(cls)
+        columns.time = time
+        columns.distance = distance
+        columns.velocity = velocity
+        columns.neo_index = neo_index
+        columns.neo_diameter = neo_diameter
+        columns.neo_hazardous = neo_hazardous
+        columns._derived = {}
+        columns._vectors = None
+        return columns
+
+    def __len__(self):
+        """Return the number of close approaches in these columns."""
+        return len(self.time)
+
+    def time_index(self):
+        """Sort the close approaches by time, and find where each day starts in that order.
+
+        :return: A tuple of the time-sorted permutation of approach positions, the
+                 sorted list of distinct days (in days since `helpers.EPOCH`), and the
+                 position in the permutation where each day starts, followed by a
+                 final sentinel equal to the number of approaches.
+        """
+        times = self.time
+        time_order = array.array('q', sorted(range(len(times)), key=times.__getitem__))
+        return (time_order,) + self.day_index(time_order)
+
+    def day_index(self, time_order):
+        """Find where each day starts in a time-sorted permutation of the close approaches.
+
+        :param time_order: The positions of the close approaches, sorted by time.
+        Approaches with an unknown time (`helpers.MISSING_MINUTE`) sort last,
+        and their day isn't listed, so that no date range includes them.
+
+        :return: A tuple of the sorted list of distinct days (in days since
+                 `helpers.EPOCH`), and the position in `time_order` where each day
+                 starts, followed by a final sentinel equal to the number of approaches
+                 with a known time.
+        """
+        times = self.time
+        sorted_days = [times[index] // MINUTES_PER_DAY for index in time_order]
+        days = sorted(set(sorted_days))
+        if days and days[-1] == MISSING_DAY:
+            days.pop()
+        day_starts = array.array('q', [bisect.bisect_left(sorted_days, day) for day in days])
+        day_starts.append(bisect.bisect_left(sorted_days, MISSING_DAY))
+        return days, day_starts
+
+    @property
+    def day(self):
+        """Return the day of each close approach, as a number of days since `helpers.EPOCH` (NaN if unknown)."""
+        if 'day' not in self._derived:
+            # NaN compares false with every date, so an unknown time never matches a date criterion.
+            self._derived['day'] = array.array('d', [minute // MINUTES_PER_DAY if minute != MISSING_MINUTE
+                                                     else float('nan') for minute in self.time])
+        return self._derived['day']
+
+    @property
+    def diameter(self):
+        """Return the diameter of each approach's NEO, one entry per approach."""
+        if 'diameter' not in self._derived:
+            neo_diameter = self.neo_diameter
+            self._derived['diameter'] = array.array('d', [neo_diameter[index] for index in self.neo_index])
+        return self._derived['diameter']
+
+    @property
+    def hazardous(self):
+        """Return the hazardous flag of each approach's NEO, one entry per approach."""
+        if 'hazardous' not in self._derived:
+            # Stored as 0 or 1, which compare equal to False and True.
+            neo_hazardous = self.neo_hazardous
+            self._derived['hazardous'] = array.array('b', [neo_hazardous[index] for index in self.neo_index])
+        return self._derived['hazardous']
+
+    def bind(self, filters):
+        """Prepare a collection of filters to be evaluated against these columns by position.
+
+        Each filter that can read its attribute from a column is reduced to an
+        `(op, column, reference)` triple, so that it holds for the approach at
+        `index` exactly when `op(column[index], reference)` is true. Any other
+        filter is returned separately, to be called on the `CloseApproach`.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A tuple of a list of `(op, column, reference)` triples and a list of the remaining filters.
+        """
+        tests = []
+        remaining = []
+        for f in filters:
+            column = getattr(f, 'column', None)
+            if column is None:
+                remaining.append(f)
+                continue
+            try:
+                tests.append((f.op, column(self), f.reference()))
+            except NotImplementedError:
+                remaining.append(f)
+        return tests, remaining
+
+    @property
+    def vectors(self):
+        """Return NumPy views of these columns, for vectorized evaluation of filters.
+
+        :return: A `VectorColumns` sharing memory with these columns.
+        """
+        if self._vectors is None:
+            self._vectors = VectorColumns(self)
+        return self._vectors
+
+
+class VectorColumns:
+    """NumPy views of an `ApproachColumns`, with the same column names.
+
+    The approach-side and NEO-side columns share memory with the underlying
+    `array.array`s. The per-approach `day`, `diameter` and `hazardous` columns
+    are computed with vectorized operations.
+    """
+    def __init__(self, columns):
+        """Create a new `VectorColumns` over an `ApproachColumns`.
+
+        :param columns: The `ApproachColumns` to view.
+        """
+        if np is None:
+            raise ImportError("The columnar query engine requires NumPy.")
+
+        # `np.asarray` follows each buffer's own item type, and shares its memory.
+        self.time = np.asarray(columns.time)
+        self.distance = np.asarray(columns.distance)
+        self.velocity = np.asarray(columns.velocity)
+        self.neo_index = np.asarray(columns.neo_index)
+        self.neo_diameter = np.asarray(columns.neo_diameter)
+        self.neo_hazardous = np.asarray(columns.neo_hazardous).astype(np.bool_)
+
+        self.day = np.where(self.time == MISSING_MINUTE, np.nan, self.time // MINUTES_PER_DAY)
+        self.diameter = self.neo_diameter[self.neo_index]
+        self.hazardous = self.neo_hazardous[self.neo_index]
+
+    def __len__(self):
+        """Return the number of close approaches in these columns."""
+        return len(self.time)
+
+    @staticmethod
+    def time_ordered(positions):
+        """View a slice of `NEODatabase`'s time-sorted index as an array, without copying.
+
+        :param positions: An `array.array('q')` (or a `memoryview` of one) of approach indices.
+        :return: A NumPy int64 array sharing memory with `positions`.
+        """
+        return np.asarray(positions)
+
+    def select(self, filters):
+        """Evaluate a collection of filters to a boolean mask over all close approaches.
+
+        Filters that can't be vectorized (those without a `mask` method, or
+        whose `mask` raises `NotImplementedError`) are returned separately, so
+        that the caller can check them one approach at a time on the rows that
+        survive the vectorized filters. Once no approach is left, the remaining
+        masks aren't computed, so filters given most selective first can stop early.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A tuple of the boolean mask and a list of the remaining filters.
+        """
+        selected = np.ones(len(self), dtype=np.bool_)
+        remaining = []
+        for f in filters:
+            mask = getattr(f, 'mask', None)
+            if mask is None:
+                remaining.append(f)
+                continue
+            try:
+                selected &= mask(self)
+            except NotImplementedError:
+                remaining.append(f)
+                continue
+            if not selected.any():
+                return selected, []
+        return selected, remaining
@@ -9,8 +9,104 @@ Under normal circumstances, the main module creates one NEODatabase from the
 data on NEOs and close approaches extracted by `extract.load_neos` and
 `extract.load_approaches`.
 
+A `NEODatabase` also keeps a columnar copy of the close approach data (see
+`columnar.ApproachColumns`), from which filters read raw values by position, so
+that a query only looks up (and parses) the `CloseApproach`es that match.
+Optionally, it answers queries by evaluating each filter over NumPy views of
+those columns as a vectorized boolean mask, which requires NumPy.
+
+Date criteria are answered from a time-sorted index of the close approaches:
+the dates resolve by binary search to one contiguous slice of that index, and
+the remaining filters only run on the approaches inside the slice. Likewise,
+distance and velocity criteria can resolve to a slice of a sorted index on that
+attribute. Criteria on an approach's NEO - diameter and hazardous - are
+answered NEO-first instead: the few matching NEOs are found from a sorted
+diameter index and a hazardous partition, and only their approaches are
+checked. Whichever index selects the fewest candidates drives the query.
+Counts over date ranges and bands of distance and velocity are answered from
+prefix sums of a `timecube.TimeCube`, without looking at the approaches.
+
+The filters left to check on the candidates run cheapest and most selective
+first, as estimated from histograms of a sample of the columns (see
+`histogram.ColumnStatistics`), and each approach stops at the first filter that
+rejects it. The row-by-row engine compiles those filters into one function
+per query shape (see `predicate`).
+
+A `NEODatabase` can also be brought up to date in place with freshly loaded
+data (see `NEODatabase.update`): only the NEOs and close approaches that were
+added, removed or changed are touched, and the indexes are adjusted rather than
+rebuilt.
+
 You'll edit this file in Tasks 2 and 3.
 """
+import array
+import bisect
+import collections
+import contextlib
+import heapq
+import itertools
+
+from aggregate import group_stats
+from columnar import ApproachColumns
+from filters import DateFilter, DistanceFilter, VelocityFilter, DiameterFilter, IsHaradousFilter, FilterPlan
+from helpers import cd_to_minute, date_to_day, MISSING_MINUTE
+from histogram import ColumnStatistics
+from predicate import check_rows
+from timecube import TimeCube
+
+
+# The filters whose attributes have sorted indexes, for range lookups.
+INDEXED_FILTERS = (DistanceFilter, VelocityFilter)
+
+# The filters on attributes of an approach's NEO, answered from the NEOs first.
+NEO_FILTERS = (DiameterFilter, IsHaradousFilter)
+
+# The ways in which a query can find its candidate close approaches (see `NEODatabase._access_path`).
+FULL_SCAN = 'full scan'
+DATE_SLICE = 'date slice'
+INDEX_RANGE = 'index range'
+NEO_FIRST = 'NEO-first'
+ACCESS_PATHS = (FULL_SCAN, DATE_SLICE, INDEX_RANGE, NEO_FIRST)
+
+# The attributes that query results can be ordered by, and the filter on each.
+SORT_KEYS = {
+    'time': DateFilter,
+    'distance': DistanceFilter,
+    'velocity': VelocityFilter,
+    'diameter': DiameterFilter,
+}
+
+# A summary of the changes applied by `NEODatabase.update`.
+DatabaseDelta = collections.namedtuple('DatabaseDelta', [
+    'neos_added', 'neos_removed', 'neos_changed',
+    'approaches_added', 'approaches_removed', 'approaches_changed',
+])
+
+
+def _take(column, typecode, kept, removed):
+    """Copy a column into a new `array.array`, keeping only the entries at the kept positions."""
+    if not removed:
+        return array.array(typecode, column)
+    return array.array(typecode, [column[index] for index in kept])
+
+
+def _same(value, other):
+    """Return whether two values are equal, counting two NaNs as equal."""
+    return value == other or (value != value and other != other)
+
+
+def _sort_column(column):
+    """Sort the positions of a numeric column by value, leaving out NaN.
+
+    :param column: An indexable column of numbers.
+    :return: A tuple of an `array.array('q')` of the sorted positions, and an
+             `array.array('d')` of the values in the same order.
+    """
+    # NaN never matches a range, and would break the ordering, so it's left out.
+    order = array.array('q', sorted((position for position in range(len(column))
+                                     if column[position] == column[position]),
+                                    key=column.__getitem__))
+    return order, array.array('d', [column[position] for position in order])
 
 
 class NEODatabase:
@@ -21,7 +117,13 @@ class NEODatabase:
     help fetch NEOs by primary designation or by name and to help speed up
     querying for close approaches that match criteria.
     """
-    def __init__(self, neos, approaches):
+    # The largest fraction of the data set that a sorted index may select and still drive a query.
+    index_selectivity = 0.25
+
+    # The `explain.QueryProfile` that the query path reports to, while `explain.analyze` runs a query.
+    _profile = None
+
+    def __init__(self, neos, approaches, columnar=False):
         """Create a new `NEODatabase`.
 
         As a precondition, this constructor assumes that the collections of NEOs
@@ -34,13 +136,61 @@ class NEODatabase:
         constructor modifies the supplied NEOs and close approaches to link them
         together - after it's done, the `.approaches` attribute of each NEO has
         a collection of that NEO's close approaches, and the `.neo` attribute of
-        each close approach references the appropriate NEO.
+        each close approach references the appropriate NEO. The `._designation`
+        of each linked close approach is then reset to None, since it duplicates
+        `.neo.designation`.
 
         :param neos: A collection of `NearEarthObject`s.
         :param approaches: A collection of `CloseApproach`es.
+        :param columnar: Whether to answer queries with the vectorized, NumPy-backed engine.
         """
         self._neos = neos
         self._approaches = approaches
+        self.generation = 0
+        self._index_neos()
+
+        for index, cad in enumerate(self._approaches):
+            if cad._designation in self._neos_by_designation:
+                cur_neo = self._neos_by_designation[cad._designation]
+
+                # Updating approach details in the NEO
+                self._neos_by_designation[cad._designation].approaches.append(cad)
+
+                # Updating NEO reference in the CloseApproach
+                self._approaches[index].neo = cur_neo
+
+                # The designation is now reachable as `.neo.designation`, so release the duplicate
+                cad._designation = None
+
+        # The columnar copy is built only once linking is done, since it gathers NEO attributes.
+        self._index_approaches(ApproachColumns(self._neos, self._approaches), columnar)
+        self._release_raw_values(range(len(self._approaches)))
+
+    @classmethod
+    def from_columns(cls, neos, approaches, columns, time_index=None, columnar=False):
+        """Create a `NEODatabase` around NEOs and close approaches that are already linked.
+
+        Unlike the constructor, this doesn't link anything or read any attribute
+        of the close approaches, so `approaches` may be any sequence - such as
+        one that only creates each `CloseApproach` when it is first looked up.
+
+        :param neos: A sequence of linked `NearEarthObject`s.
+        :param approaches: A sequence of linked `CloseApproach`es.
+        :param columns: A `columnar.ApproachColumns` of the same data, in the same order.
+        :param time_index: A precomputed (time_order, days, day_starts) tuple, or None to compute it.
+        :param columnar: Whether to answer queries with the vectorized, NumPy-backed engine.
+        :return: A new `NEODatabase`.
+        """
+        database = cls.__new__(cls)
+        database._neos = neos
+        database._approaches = approaches
+        database.generation = 0
+        database._index_neos()
+        database._index_approaches(columns, columnar, time_index)
+        return database
+
+    def _index_neos(self):
+        """Build the dictionaries that look up NEOs by designation and by name."""
 
         """ 
         As per data one designation is associated with only one NEO 
@@ -64,15 +214,336 @@ class NEODatabase:
             else:
                 self._neos_by_name[_neo.name] = [_neo.designation]
 
-        for index, cad in enumerate(self._approaches):
-            if cad._designation in self._neos_by_designation:
-                cur_neo = self._neos_by_designation[cad._designation]
+    def _index_approaches(self, columns, columnar=False, time_index=None):
+        """Build the auxiliary structures that speed up querying for close approaches.
 
-                # Updating approach details in the NEO
-                self._neos_by_designation[cad._designation].approaches.append(cad)
+        :param columns: A `columnar.ApproachColumns` of the close approaches.
+        :param columnar: Whether to answer queries with the vectorized, NumPy-backed engine.
+        :param time_index: A precomputed (time_order, days, day_starts) tuple, or None to compute it.
+        """
+        self._columns = columns
+        self._vectors = self._columns.vectors if columnar else None
+        # Histograms of a sample of the columns, to check the most selective filters first.
+        self._statistics = ColumnStatistics(columns)
 
-                # Updating NEO reference in the CloseApproach
-                self._approaches[index].neo = cur_neo
+        # Sorted indexes on approach distance and velocity, and the NEO indexes under 'neo', built on first use.
+        self._sorted_indexes = {}
+        # Counts of approaches by day, band and hazardous flag (see `timecube.TimeCube`), built on first use.
+        self._cube = None
+
+        """
+        A time-sorted permutation of the approaches, with the first position of
+        each distinct day in it. `_days` is sorted, so a date range resolves by
+        bisection to a slice of `_time_order`; `_day_starts` carries a final
+        sentinel so that every day's bucket ends where the next one starts.
+        Days are counted in whole days since `helpers.EPOCH`.
+        """
+        if time_index is None:
+            time_index = self._columns.time_index()
+        self._time_order, self._days, self._day_starts = time_index
+
+    def _release_raw_values(self, positions):
+        """Replace the raw strings that close approaches keep from their rows with their parsed values.
+
+        Once the columns are built, they hold every approach's time, distance and
+        velocity, so the strings read from the data file needn't be kept as well.
+        Each approach keeps only its time in minutes since `helpers.EPOCH`, and
+        its distance and velocity as floats, which are much smaller.
+
+        :param positions: The positions of the close approaches whose values to replace.
+        """
+        approaches, columns = self._approaches, self._columns
+        time, distance, velocity = columns.time, columns.distance, columns.velocity
+        for index in positions:
+            approach = approaches[index]
+            if approach._time.__class__ is str:
+                approach._time = time[index]
+            approach._distance = distance[index]
+            approach._velocity = velocity[index]
+
+    def update(self, neos, approaches):
+        """Bring this database up to date with freshly loaded NEOs and close approaches, in place.
+
+        The fresh collections are compared with the loaded ones: NEOs are matched
+        by designation, and close approaches by their NEO's designation and their
+        time. Matched NEOs and close approaches keep their identity, and are only
+        modified if their values changed; unmatched ones are added or removed.
+        The links between NEOs and close approaches, the lookup dictionaries, the
+        columns and the time-sorted index are adjusted for these changes only -
+        the time index, for instance, is merged with the added approaches rather
+        than sorted again. Any distance, velocity and NEO indexes and time cube
+        built before the update are kept up to date as well.
+
+        Kept close approaches stay in their internal order, followed by any added
+        ones. If nothing changed, the columns and indexes are left untouched.
+        Otherwise, the `generation` counter is incremented, so that derived
+        state (such as a `cache.QueryCache`) can tell.
+
+        :param neos: A fresh collection of unlinked `NearEarthObject`s.
+        :param approaches: A fresh collection of unlinked `CloseApproach`es.
+        :return: A `DatabaseDelta` counting the NEOs and approaches added, removed and changed.
+        """
+        if not isinstance(self._approaches, list):
+            # A database opened from a column store creates its objects lazily; create them all now.
+            self._approaches = list(self._approaches)
+            for neo in self._neos:
+                neo.approaches = list(neo.approaches)
+
+        old_neos, old_approaches, columns = self._neos, self._approaches, self._columns
+        old_missing = len(old_neos)
+        cube, sorted_indexes = self._cube, self._sorted_indexes
+
+        # Key each loaded approach by (designation, minute), before any NEO changes. A key is
+        # almost always unique; the positions of any later approaches with the same key are kept aside.
+        designations = [neo.designation for neo in old_neos]
+        designations.append(None)
+        keys = list(zip(map(designations.__getitem__, columns.neo_index), columns.time))
+        for index in [index for index, neo_index in enumerate(columns.neo_index) if neo_index == old_missing]:
+            keys[index] = (old_approaches[index]._designation, keys[index][1])
+        # Filled from the end, so that the first position of each key is the one that stays.
+        position_by_key = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+        duplicates = collections.defaultdict(collections.deque)
+        if len(position_by_key) < len(keys):
+            for index, key in enumerate(keys):
+                if position_by_key[key] != index:
+                    duplicates[key].append(index)
+        del keys
+
+        neos_removed, neos_added, neos_changed = self._update_neos(neos)
+
+        # Match the fresh approaches to the loaded ones.
+        distance, velocity = array.array('d', columns.distance), array.array('d', columns.velocity)
+        added, changed = [], []
+        pop = position_by_key.pop
+        for fresh in approaches:
+            # Read the raw values directly: the fresh approaches are only compared, and then dropped.
+            time = fresh._time
+            key = (fresh._designation, cd_to_minute(time) if time.__class__ is str else fresh.minute)
+            index = pop(key, None)
+            if index is None:
+                matches = duplicates.get(key)
+                if not matches:
+                    added.append(fresh)
+                    continue
+                index = matches.popleft()
+            fresh_distance, fresh_velocity = float(fresh._distance), float(fresh._velocity)
+            if distance[index] == fresh_distance and velocity[index] == fresh_velocity:
+                continue
+            if not (_same(distance[index], fresh_distance) and _same(velocity[index], fresh_velocity)):
+                approach = old_approaches[index]
+                approach.distance = distance[index] = fresh_distance
+                approach.velocity = velocity[index] = fresh_velocity
+                changed.append(index)
+        removed = sorted([*position_by_key.values(), *(index for matches in duplicates.values() for index in matches)])
+        if not (neos_removed or neos_added or neos_changed or added or removed or changed):
+            # Nothing changed, so the columns and every index still hold.
+            return DatabaseDelta(0, 0, 0, 0, 0, 0)
+
+        # Unlink the removed approaches.
+        removed_approaches = {id(old_approaches[index]) for index in removed}
+        for neo in {id(approach.neo): approach.neo for approach in map(old_approaches.__getitem__, removed)
+                    if approach.neo is not None}.values():
+            neo.approaches = [approach for approach in neo.approaches if id(approach) not in removed_approaches]
+
+        # Keep the positions that weren't removed (all of them, if none were), in order.
+        if removed:
+            new_position = array.array('q', range(len(old_approaches)))
+            for index in removed:
+                new_position[index] = -1
+            kept = [index for index in range(len(old_approaches)) if new_position[index] >= 0]
+            for position, index in enumerate(kept):
+                new_position[index] = position
+            self._approaches = [old_approaches[index] for index in kept]
+        else:
+            kept = range(len(old_approaches))
+        missing = len(self._neos)
+
+        # Carry each kept approach's NEO position over to the updated list of NEOs.
+        neo_index = columns.neo_index
+        if neos_added or neos_removed:
+            position_by_neo = {id(neo): position for position, neo in enumerate(self._neos)}
+            neo_position = [position_by_neo.get(id(neo), missing) for neo in old_neos] + [missing]
+            neo_index = array.array('q', [neo_position[neo_index[index]] for index in kept])
+            for position in [position for position, value in enumerate(neo_index) if value == missing]:
+                # An unlinked approach may belong to a newly added NEO.
+                approach = self._approaches[position]
+                self._link(approach)
+                if approach.neo is not None:
+                    neo_index[position] = position_by_neo[id(approach.neo)]
+        else:
+            position_by_neo = None
+            neo_index = _take(neo_index, 'q', kept, removed)
+
+        for approach in added:
+            self._link(approach)
+            self._approaches.append(approach)
+            if approach.neo is None:
+                neo_index.append(missing)
+            else:
+                if position_by_neo is None:
+                    position_by_neo = {id(neo): position for position, neo in enumerate(self._neos)}
+                neo_index.append(position_by_neo[id(approach.neo)])
+
+        time = _take(columns.time, 'q', kept, removed)
+        time.extend(approach.minute for approach in added)
+        distance = _take(distance, 'd', kept, removed)
+        distance.extend(approach.distance for approach in added)
+        velocity = _take(velocity, 'd', kept, removed)
+        velocity.extend(approach.velocity for approach in added)
+        if neos_added or neos_removed or neos_changed:
+            neo_diameter = array.array('d', [neo.diameter for neo in self._neos])
+            neo_diameter.append(float('nan'))
+            neo_hazardous = array.array('b', [neo.hazardous for neo in self._neos])
+            neo_hazardous.append(False)
+        else:
+            neo_diameter, neo_hazardous = columns.neo_diameter, columns.neo_hazardous
+        updated = ApproachColumns.from_buffers(time, distance, velocity, neo_index, neo_diameter, neo_hazardous)
+
+        # Merge the added approaches into the time-sorted index of the kept ones.
+        if removed or added:
+            time_order = self._time_order
+            if removed:
+                time_order = [new_position[index] for index in time_order if new_position[index] >= 0]
+            added_order = sorted(range(len(kept), len(time)), key=time.__getitem__)
+            time_order = array.array('q', heapq.merge(time_order, added_order, key=time.__getitem__))
+            time_index = (time_order,) + updated.day_index(time_order)
+        else:
+            time_index = (self._time_order, self._days, self._day_starts)
+
+        self._index_approaches(updated, self._vectors is not None, time_index)
+        self._release_raw_values(range(len(kept), len(time)))
+        if removed:
+            changed = [new_position[index] for index in changed]
+        # Adjusting an index costs more than rebuilding it once a large share of the approaches is added or removed.
+        adjust = 4 * (len(added) + len(removed)) <= len(time)
+        if cube is not None and adjust:
+            self._update_cube(cube, columns, kept, removed, changed, neos_added or neos_removed or neos_changed)
+            self._cube = cube
+        self._update_sorted_indexes(sorted_indexes, new_position if removed else None, changed, len(kept), adjust)
+        self.generation += 1
+        return DatabaseDelta(neos_added, neos_removed, neos_changed, len(added), len(removed), len(changed))
+
+    def _update_sorted_indexes(self, old_indexes, new_position, changed, first_added, adjust):
+        """Bring the sorted indexes built before an update up to date with the updated columns.
+
+        A distance or velocity index is adjusted, if `adjust` is true: its kept
+        positions are renumbered in their sorted order, and the changed and
+        added approaches are sorted on their own and merged in. Otherwise it is
+        rebuilt, as are the NEO indexes, which group the approaches by NEO
+        position. Indexes that weren't built before the update aren't built now.
+
+        :param old_indexes: The `_sorted_indexes` of the approaches before the update.
+        :param new_position: The new position of each old approach (-1 if removed), or None if none were removed.
+        :param changed: The new positions of the approaches whose distance or velocity changed.
+        :param first_added: The new position of the first added approach.
+        :param adjust: Whether to adjust the distance and velocity indexes, rather than rebuild them.
+        """
+        for key, (order, _) in ((key, index) for key, index in old_indexes.items() if key in INDEXED_FILTERS):
+            if not adjust:
+                self._sorted_index(key)
+                continue
+            column = key.column(self._columns)
+            moved = set(changed)
+            if new_position is not None:
+                order = (new_position[position] for position in order)
+            kept = [position for position in order if position >= 0 and position not in moved]
+            resorted = sorted((position for position in itertools.chain(sorted(moved), range(first_added, len(column)))
+                               if column[position] == column[position]), key=column.__getitem__)
+            # Ties are ordered by position, as when the index is built from scratch.
+            order = array.array('q', heapq.merge(kept, resorted, key=lambda position: (column[position], position)))
+            self._sorted_indexes[key] = order, array.array('d', [column[position] for position in order])
+        if 'neo' in old_indexes:
+            self._neo_index()
+
+    def _update_cube(self, cube, old_columns, kept, removed, changed, neos_changed):
+        """Bring a `timecube.TimeCube` of the loaded approaches up to date with their updated columns.
+
+        :param cube: The `TimeCube` of the approaches before the update.
+        :param old_columns: The `columnar.ApproachColumns` of the approaches before the update.
+        :param kept: The old positions of the kept approaches, in order.
+        :param removed: The old positions of the removed approaches.
+        :param changed: The new positions of the approaches whose distance or velocity changed.
+        :param neos_changed: Whether any NEO was added, removed or changed, which may change
+                             the hazardous flag of any approach.
+        """
+        columns, cells = self._columns, cube.cells
+        for index in removed:
+            cube.remove(cells[index], old_columns.time[index])
+        cells = _take(cells, 'h', kept, removed)
+
+        hazardous, distance, velocity, time = columns.hazardous, columns.distance, columns.velocity, columns.time
+        for position in (range(len(cells)) if neos_changed else changed):
+            cell = cube.cell(hazardous[position], distance[position], velocity[position])
+            if cell != cells[position]:
+                cube.remove(cells[position], time[position])
+                cube.add(cell, time[position])
+                cells[position] = cell
+        for position in range(len(cells), len(columns)):
+            cell = cube.cell(hazardous[position], distance[position], velocity[position])
+            cube.add(cell, time[position])
+            cells.append(cell)
+        cube.cells = cells
+
+    def _update_neos(self, neos):
+        """Bring the NEOs and their lookup dictionaries up to date with a fresh collection of NEOs.
+
+        :param neos: A fresh collection of unlinked `NearEarthObject`s.
+        :return: A tuple of the numbers of NEOs removed, added and changed.
+        """
+        fresh_by_designation = {neo.designation: neo for neo in neos}
+        matched = set()
+        kept, removed, changed = [], 0, 0
+        for neo in self._neos:
+            fresh = fresh_by_designation.get(neo.designation)
+            if fresh is None:
+                # Close approaches of a removed NEO that are still in the data become unlinked.
+                for approach in neo.approaches:
+                    approach._designation, approach.neo = neo.designation, None
+                neo.approaches = []
+                self._forget_neo(neo)
+                removed += 1
+                continue
+
+            if fresh.name != neo.name:
+                self._forget_neo(neo)
+                neo.name = fresh.name
+                self._remember_neo(neo)
+                changed += 1
+            elif not (_same(fresh.diameter, neo.diameter) and fresh.hazardous == neo.hazardous):
+                changed += 1
+            neo.diameter, neo.hazardous = fresh.diameter, fresh.hazardous
+            matched.add(neo.designation)
+            kept.append(neo)
+
+        # The unmatched fresh NEOs are new.
+        added = [neo for designation, neo in fresh_by_designation.items() if designation not in matched]
+        for neo in added:
+            kept.append(neo)
+            self._remember_neo(neo)
+        self._neos = kept
+        return removed, len(added), changed
+
+    def _remember_neo(self, neo):
+        """Add an NEO to the dictionaries that look it up by designation and by name."""
+        self._neos_by_designation[neo.designation] = neo
+        self._neos_by_name.setdefault(neo.name, []).append(neo.designation)
+
+    def _forget_neo(self, neo):
+        """Remove an NEO from the dictionaries that look it up by designation and by name."""
+        self._neos_by_designation.pop(neo.designation, None)
+        designations = self._neos_by_name.get(neo.name, [])
+        if neo.designation in designations:
+            designations.remove(neo.designation)
+            if not designations:
+                del self._neos_by_name[neo.name]
+
+    def _link(self, approach):
+        """Link an unlinked close approach to its NEO, if that NEO is in the database."""
+        neo = self._neos_by_designation.get(approach._designation)
+        if neo is not None:
+            neo.approaches.append(approach)
+            approach.neo = neo
+            approach._designation = None
 
     def get_neo_by_designation(self, designation):
         """Find and return an NEO by its primary designation.
@@ -107,7 +578,7 @@ class NEODatabase:
 
         return self.get_neo_by_designation(self._neos_by_name[name][0]) if name in self._neos_by_name else None
 
-    def query(self, filters):
+    def query(self, filters, sort_by=None, descending=False, limit=None):
         """Query close approaches to generate those that match a collection of filters.
 
         This generates a stream of `CloseApproach` objects that match all of the
@@ -117,14 +588,607 @@ class NEODatabase:
 
         The `CloseApproach` objects are generated in internal order, which isn't
         guaranteed to be sorted meaninfully, although is often sorted by time.
+        When the filters include date criteria, the matches are generated in
+        time order.
+
+        With `sort_by`, the matches are instead generated in order of one of
+        `SORT_KEYS` (see `sorted_indices`); combined with `limit`, only the first
+        matches in that order are kept while searching, rather than sorting all
+        of them.
+
+        A collection of filters that is known to match nothing (see
+        `filters.FilterPlan`) returns immediately, without scanning.
 
         :param filters: A collection of filters capturing user-specified criteria.
+        :param sort_by: One of `SORT_KEYS` to order the matches by, or None for internal order.
+        :param descending: Whether to order the matches from the largest value of `sort_by` down.
+        :param limit: The maximum number of matches to generate, or None (or 0) for all of them.
         :return: A stream of matching `CloseApproach` objects.
         """
+        yield from self.approaches_at(self._result_indices(filters, sort_by, descending, limit))
+
+    def _result_indices(self, filters, sort_by, descending, limit):
+        """Find the positions of the close approaches that `query` generates, in the same order."""
+        if sort_by is None:
+            indices = self.query_indices(filters)
+            if limit:
+                indices = itertools.islice(indices, limit)
+            return indices
+        return self.sorted_indices(filters, sort_by, descending=descending, limit=limit)
+
+    def sorted_indices(self, filters, sort_by, descending=False, limit=None):
+        """Query close approaches for the positions of those that match, ordered by an attribute.
+
+        Approaches with an unknown value (such as an NEO's missing diameter)
+        come last, and ties keep the approaches' order in the data set.
+
+        With a `limit` of `k`, and an attribute with a presorted index (time,
+        and distance and velocity - see `_sorted_index`), the index is walked
+        from the chosen end and the first `k` matches are kept, unless another
+        index narrows the candidates down more (see `_choose_driver`). Otherwise,
+        the matches are found as usual, and a heap of size `k` keeps the first
+        ones in order - so memory stays proportional to `k`, not to the matches.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param sort_by: One of `SORT_KEYS`.
+        :param descending: Whether to order the matches from the largest value down.
+        :param limit: The maximum number of positions to return, or None (or 0) for all of them.
+        :return: A list of the positions of matching close approaches, in order.
+        :raises ValueError: If `sort_by` isn't one of `SORT_KEYS`.
+        """
+        key = self._sort_key(sort_by, descending)
+        plan = FilterPlan.from_filters(filters)
+        if plan.empty:
+            return []
+
+        # The driving index is chosen once, and only its candidates are collected if it's used.
+        with self._stage('plan'):
+            driver = self._choose_driver(plan)
+            presorted = self._presorted_order(sort_by, plan) if limit and driver is None else None
+            access = self._path_from(plan, driver) if presorted is None else None
+        if presorted is not None:
+            order, remaining = presorted
+            if self._profile is not None:
+                self._profile.access(f"presorted {sort_by} index", order, 'walking the index')
+            with self._stage('sort'):
+                return self._walk_presorted(order, remaining, key, descending, limit)
+        indices = self._path_indices(plan, access)
+        if self._profile is not None:
+            self._profile.order = 'keeping a heap' if limit else 'sorting all of the matches'
+        with self._stage('sort'):
+            return self.order_indices(indices, sort_by, descending=descending, limit=limit)
+
+    def order_indices(self, indices, sort_by, descending=False, limit=None):
+        """Order approach positions by an attribute, keeping only the first `limit` of them.
+
+        :param indices: An iterable of approach positions, in internal order.
+        :param sort_by: One of `SORT_KEYS`.
+        :param descending: Whether to order the positions from the largest value down.
+        :param limit: The maximum number of positions to return, or None (or 0) for all of them.
+        :return: A list of the first positions, in order.
+        :raises ValueError: If `sort_by` isn't one of `SORT_KEYS`.
+        """
+        key = self._sort_key(sort_by, descending)
+        if limit:
+            return heapq.nsmallest(limit, indices, key=key)
+        return sorted(indices, key=key)
+
+    def _sort_key(self, sort_by, descending):
+        """Return a key function that orders approach positions by an attribute, unknown values last."""
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Can't sort by {sort_by!r}; choose one of {', '.join(SORT_KEYS)}.")
+        column = getattr(self._columns, sort_by)
+        sign = -1 if descending else 1
+        # Unknown values are NaN, or `helpers.MISSING_MINUTE` for times.
+        unknown = MISSING_MINUTE if sort_by == 'time' else None
 
-        for approach in self._approaches:
-            is_valid = True
-            for f in filters:
-                is_valid = is_valid and f(approach)
-            if is_valid:
-                yield approach
+        def key(position):
+            value = column[position]
+            if value != value or value == unknown:
+                return True, 0, position
+            return False, sign * value, position
+        return key
+
+    def _presorted_order(self, sort_by, plan):
+        """Find the presorted index of an attribute, narrowed to a plan's interval on it.
+
+        :param sort_by: One of `SORT_KEYS`.
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :return: A tuple of the approach positions sorted by the attribute (only those inside
+                 the plan's interval on it), and the remaining filters - or None if the
+                 attribute has no index, or its index leaves out unknown values.
+        """
+        filter_class = SORT_KEYS[sort_by]
+        interval = plan.intervals.get(filter_class)
+        if filter_class is DateFilter:
+            if interval is None:
+                if self._day_starts[-1] != len(self._time_order):
+                    # Unknown times come last in the time index, where a descending walk would start.
+                    return None
+                return self._time_order, plan
+            start, stop = self._date_slice(*interval)
+            return self._time_order[start:stop], plan.without(DateFilter)
+
+        if filter_class not in INDEXED_FILTERS:
+            return None
+        order, values = self._sorted_index(filter_class)
+        if len(order) != len(self._approaches):
+            return None
+        if interval is None:
+            return order, plan
+        low, high = interval
+        start = 0 if low is None else bisect.bisect_left(values, low)
+        stop = len(values) if high is None else bisect.bisect_right(values, high)
+        return order[start:stop], plan.without(filter_class)
+
+    def _walk_presorted(self, order, filters, key, descending, limit):
+        """Collect the first `limit` matches of a plan by walking a presorted index from one end.
+
+        The walk continues past the `limit`-th match through any ties with it,
+        which a descending walk meets in reverse internal order; the collected
+        matches are then sorted by `key` to put ties back in internal order.
+        """
+        if descending:
+            order = reversed(order)
+        matches = []
+        for index in self._check_rows(order, filters):
+            if len(matches) >= limit and key(index)[1] != key(matches[-1])[1]:
+                break
+            matches.append(index)
+        matches.sort(key=key)
+        return matches[:limit]
+
+    def query_indices(self, filters, within=None):
+        """Query close approaches to generate the positions of those that match a collection of filters.
+
+        This is the engine behind `query`, which looks up the `CloseApproach` at
+        each position (see `approaches_at`). The positions are generated in the
+        same order as `query` would generate the approaches.
+
+        If `within` is given, only those positions are checked, in their given
+        order, instead of the whole data set (or the slice of it that the date
+        criteria select) - for example, to narrow down the matches of an earlier
+        query whose criteria were looser.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param within: A sequence of approach positions to check, or None to check all of them.
+        :return: A stream of the positions of matching close approaches.
+        """
+        plan = FilterPlan.from_filters(filters)
+        if plan.empty:
+            return
+
+        if within is not None:
+            if self._vectors is not None:
+                yield from self._query_vectors(plan, within)
+            else:
+                yield from self._check_rows(within, plan)
+            return
+
+        with self._stage('plan'):
+            access = self._access_path(plan)
+        yield from self._path_indices(plan, access)
+
+    def _access_path(self, plan):
+        """Choose how to find the candidate close approaches of a filter plan.
+
+        A sorted index or the NEO indexes drive the query if they narrow the
+        candidates down enough (see `_choose_driver`); otherwise, date criteria
+        select a slice of the time-sorted index; otherwise, every approach is a
+        candidate.
+
+        :param plan: A non-empty `FilterPlan` capturing user-specified criteria.
+        :return: A tuple of the access path (one of `ACCESS_PATHS`), the candidate positions
+                 in the order to generate them, and the filters still to check on them.
+        """
+        return self._path_from(plan, self._choose_driver(plan))
+
+    def _path_from(self, plan, driver):
+        """Find the candidate close approaches of a filter plan, once the index to drive it is chosen.
+
+        :param plan: A non-empty `FilterPlan` capturing user-specified criteria.
+        :param driver: What `_choose_driver` returned for the plan.
+        :return: A tuple of the access path, the candidates and the remaining filters, as `_access_path` does.
+        """
+        if driver is not None:
+            # A sorted index narrows the candidates to a small set; check the other filters on those rows only.
+            filter_classes, _ = driver
+            path = NEO_FIRST if filter_classes[0] in NEO_FILTERS else INDEX_RANGE
+            return path, self._driver_candidates(plan, filter_classes), plan.without(*filter_classes)
+
+        dates = plan.intervals.get(DateFilter)
+        if dates is None:
+            return FULL_SCAN, range(len(self._approaches)), list(plan)
+        start, stop = self._date_slice(*dates)
+        return DATE_SLICE, self._time_order[start:stop], plan.without(DateFilter)
+
+    def _path_indices(self, plan, access):
+        """Generate the positions of the close approaches that match a filter plan, along a chosen access path.
+
+        :param plan: A non-empty `FilterPlan` capturing user-specified criteria.
+        :param access: The access path, candidates and remaining filters of the plan, from `_access_path`.
+        :return: A stream of the positions of matching close approaches.
+        """
+        path, candidates, remaining = access
+        if self._profile is not None:
+            self._profile.access(path, candidates)
+        if self._vectors is not None and path in (FULL_SCAN, DATE_SLICE):
+            return self._query_vectors(plan)
+        return self._check_rows(candidates, remaining)
+
+    def _check_rows(self, candidates, filters):
+        """Generate the candidate positions whose close approaches match every filter, one row at a time.
+
+        The filters are checked in increasing order of rank (see
+        `histogram.ColumnStatistics.rank`), and an approach is rejected at the
+        first filter that fails, without checking the rest. The column tests are
+        compiled into one function for the query's shape (see `predicate`).
+
+        :param candidates: An iterable of approach positions, in the order to generate them.
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A stream of the positions of matching close approaches.
+        """
+        # Filters read the raw columns by position; only the matches are looked up as `CloseApproach`es.
+        tests, residual = self._columns.bind(self._statistics.order(filters))
+        if self._profile is not None:
+            return self._profile.rows(candidates, lambda rows: check_rows(rows, tests, residual, self._approaches))
+        return check_rows(candidates, tests, residual, self._approaches)
+
+    def _stage(self, name):
+        """Time a block of the query path as a stage of the attached `explain.QueryProfile`, if any."""
+        if self._profile is None:
+            return contextlib.nullcontext()
+        return self._profile.stage(name)
+
+    def build_indexes(self):
+        """Build the sorted indexes, the NEO indexes and the time cube now, instead of on first use."""
+        for filter_class in INDEXED_FILTERS:
+            self._sorted_index(filter_class)
+        self._neo_index()
+        self._time_cube()
+
+    def _time_cube(self):
+        """Return the `timecube.TimeCube` of the close approaches, building it if needed."""
+        if self._cube is None:
+            self._cube = TimeCube(self._columns, self._time_order)
+        return self._cube
+
+    def count(self, filters):
+        """Count the close approaches that match a collection of filters.
+
+        The count is answered from the time cube (see `timecube.TimeCube`) if
+        the criteria fit it - dates, the hazardous flag, and distance and
+        velocity bounds at band edges - without looking at any approach.
+        Otherwise, the matching positions are counted as `query_indices`
+        generates them, still without building any `CloseApproach`.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: The number of matching close approaches.
+        """
+        plan = FilterPlan.from_filters(filters)
+        if plan.empty:
+            return 0
+        count = self._time_cube().count(plan)
+        if count is None:
+            count = sum(1 for _ in self.query_indices(plan))
+        return count
+
+    def estimate_count(self, filters):
+        """Estimate the number of close approaches that match a collection of filters, without querying.
+
+        The estimate comes from the sampled statistics of the columns alone (see
+        `histogram.ColumnStatistics.combined_selectivity`), so it builds no index.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: The estimated number of matching close approaches.
+        """
+        plan = FilterPlan.from_filters(filters)
+        if plan.empty:
+            return 0
+        return round(len(self._approaches) * self._statistics.combined_selectivity(plan))
+
+    def _sorted_index(self, filter_class):
+        """Return the sorted index on the attribute of a filter class, building it if needed.
+
+        :param filter_class: One of `INDEXED_FILTERS`.
+        :return: A tuple of the positions of the close approaches sorted by that attribute
+                 (leaving out any NaN), and the attribute's values in the same order.
+        """
+        index = self._sorted_indexes.get(filter_class)
+        if index is None:
+            column = filter_class.column(self._columns)
+            index = self._sorted_indexes[filter_class] = _sort_column(column)
+        return index
+
+    def _neo_index(self):
+        """Return the indexes of the NEO-level attributes, building them if needed.
+
+        NEO positions run up to and including `len(self._neos)`, the sentinel
+        that unlinked approaches point to in `self._columns.neo_index` - so that
+        NEO-first queries match exactly what a scan of the columns would.
+
+        :return: A tuple of the NEO positions sorted by diameter (leaving out unknown
+                 diameters) with the diameters in the same order, the positions of the
+                 NEOs that aren't and that are hazardous, and the positions of the close
+                 approaches grouped by NEO with the position where each NEO's group
+                 starts (followed by a final sentinel).
+        """
+        index = self._sorted_indexes.get('neo')
+        if index is None:
+            columns = self._columns
+            diameter_order, diameters = _sort_column(columns.neo_diameter)
+            by_hazardous = ([], [])
+            for position, hazardous in enumerate(columns.neo_hazardous):
+                by_hazardous[hazardous].append(position)
+
+            neo_index = columns.neo_index
+            # A stable sort keeps each NEO's approaches in position order.
+            neo_order = array.array('q', sorted(range(len(neo_index)), key=neo_index.__getitem__))
+            counts = [0] * (len(columns.neo_hazardous) + 1)
+            for position in neo_index:
+                counts[position + 1] += 1
+            neo_starts = array.array('q', itertools.accumulate(counts))
+            index = (diameter_order, diameters, by_hazardous, neo_order, neo_starts)
+            self._sorted_indexes['neo'] = index
+        return index
+
+    def _neo_matches(self, plan):
+        """Find the NEOs that match a filter plan's NEO-level criteria.
+
+        The diameter interval resolves by binary search to a slice of the NEOs
+        sorted by diameter, and the hazardous criterion to one (or both) of the
+        hazardous and non-hazardous partitions of the NEOs. The smaller of these
+        is checked against the other criterion.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :return: A sequence of the positions of the matching NEOs, in no particular order.
+        """
+        diameter_order, diameters, by_hazardous, _, _ = self._neo_index()
+        neo_hazardous = self._columns.neo_hazardous
+
+        hazardous = plan.intervals.get(IsHaradousFilter, (None, None))
+        flags = [flag for flag in (False, True)
+                 if (hazardous[0] is None or hazardous[0] <= flag) and (hazardous[1] is None or flag <= hazardous[1])]
+        if DiameterFilter in plan.intervals:
+            low, high = plan.intervals[DiameterFilter]
+            start = 0 if low is None else bisect.bisect_left(diameters, low)
+            stop = len(diameters) if high is None else bisect.bisect_right(diameters, high)
+            neos = diameter_order[start:stop]
+            if len(flags) < 2:
+                neos = [position for position in neos if bool(neo_hazardous[position]) in flags]
+            return neos
+        return [position for flag in flags for position in by_hazardous[flag]]
+
+    def _neo_count(self, plan, best_count=float('inf'), build=True):
+        """Count the close approaches of the NEOs that match a filter plan's NEO-level criteria.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :param best_count: The number of candidates to beat; counting stops once it is reached.
+        :param build: Whether to build the NEO indexes if needed, rather than estimate the count.
+        :return: The number of close approaches, or None if there are at least `best_count`.
+        """
+        if not build and 'neo' not in self._sorted_indexes:
+            count = self.estimate_count(FilterPlan({filter_class: plan.intervals[filter_class]
+                                                    for filter_class in NEO_FILTERS if filter_class in plan.intervals}))
+            return None if count >= best_count else count
+        neo_starts = self._neo_index()[4]
+        count = 0
+        for position in self._neo_matches(plan):
+            count += neo_starts[position + 1] - neo_starts[position]
+            if count >= best_count:
+                return None
+        return count
+
+    def _selectivity(self, filter_class, interval, build=True):
+        """Estimate the fraction of the close approaches inside an interval of one attribute.
+
+        The fraction is exact for a single attribute: it is read from the
+        time-sorted index, a sorted index, or the NEO indexes. Without `build`,
+        an index that isn't built yet is estimated from the column statistics
+        instead (see `estimate_count`).
+
+        :param filter_class: An `AttributeFilter` subclass.
+        :param interval: A `(low, high)` interval of that attribute, either end of which may be None.
+        :param build: Whether to build the attribute's index if needed, rather than estimate the fraction.
+        :return: The fraction of the close approaches inside the interval, between 0 and 1.
+        """
+        total = len(self._approaches)
+        if not total:
+            return 0.0
+        low, high = interval
+        if filter_class is DateFilter:
+            start, stop = self._date_slice(low, high)
+            return (stop - start) / total
+        if filter_class in INDEXED_FILTERS:
+            return self._index_count(filter_class, interval, build) / total
+        if filter_class in NEO_FILTERS:
+            return self._neo_count(FilterPlan({filter_class: interval}), build=build) / total
+        return 1.0
+
+    def _index_count(self, filter_class, interval, build=True):
+        """Count the close approaches inside an interval of an indexed attribute, by binary search.
+
+        :param filter_class: One of `INDEXED_FILTERS`.
+        :param interval: A `(low, high)` interval of that attribute, either end of which may be None.
+        :param build: Whether to build the attribute's sorted index if needed, rather than estimate the count.
+        :return: The number of close approaches inside the interval.
+        """
+        if not build and filter_class not in self._sorted_indexes:
+            return self.estimate_count(FilterPlan({filter_class: interval}))
+        _, values = self._sorted_index(filter_class)
+        low, high = interval
+        start = 0 if low is None else bisect.bisect_left(values, low)
+        stop = len(values) if high is None else bisect.bisect_right(values, high)
+        return max(stop - start, 0)
+
+    def _choose_driver(self, plan, build=True):
+        """Pick the index that narrows a filter plan's candidates the most, if it is worth using.
+
+        Each distance or velocity interval of the plan resolves by binary search
+        to a slice of that attribute's sorted index, and the diameter and
+        hazardous criteria together resolve to the approaches of the matching
+        NEOs (see `_neo_matches`). The smallest of these drives the query if it
+        is smaller than both the plan's date slice (if any) and
+        `index_selectivity` of the whole data set - a larger one would cost more
+        to put back in order than a scan would. Only the candidates are counted
+        here; `_driver_candidates` collects them. Without `build`, the indexes
+        that aren't built yet aren't built to count them, and their counts are
+        estimated instead - so the choice may differ from the one a query makes.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :param build: Whether to build the indexes if needed, rather than estimate their counts.
+        :return: A tuple of the filter classes of the driving index and its number of
+                 candidates - or None to scan as usual.
+        """
+        intervals = [(filter_class, plan.intervals[filter_class])
+                     for filter_class in INDEXED_FILTERS if filter_class in plan.intervals]
+        neo_level = tuple(filter_class for filter_class in NEO_FILTERS if filter_class in plan.intervals)
+        if not intervals and not neo_level:
+            return None
+
+        dates = plan.intervals.get(DateFilter)
+        best_count = len(self._approaches) * self.index_selectivity
+        if dates is not None:
+            start, stop = self._date_slice(*dates)
+            best_count = min(best_count, stop - start)
+
+        best = None
+        for filter_class, interval in intervals:
+            count = self._index_count(filter_class, interval, build)
+            if count < best_count:
+                best, best_count = (filter_class,), count
+        if neo_level:
+            count = self._neo_count(plan, best_count, build)
+            if count is not None:
+                best, best_count = neo_level, count
+        return None if best is None else (best, best_count)
+
+    def _driver_candidates(self, plan, filter_classes):
+        """Collect the candidates of the index chosen to drive a filter plan (see `_choose_driver`).
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :param filter_classes: The filter classes of the driving index.
+        :return: The candidate positions, in the order the query generates them.
+        """
+        if filter_classes[0] in NEO_FILTERS:
+            _, _, _, neo_order, neo_starts = self._neo_index()
+            candidates = [approach for position in self._neo_matches(plan)
+                          for approach in neo_order[neo_starts[position]:neo_starts[position + 1]]]
+        else:
+            (filter_class,) = filter_classes
+            order, values = self._sorted_index(filter_class)
+            low, high = plan.intervals[filter_class]
+            start = 0 if low is None else bisect.bisect_left(values, low)
+            stop = len(values) if high is None else bisect.bisect_right(values, high)
+            candidates = order[start:stop]
+
+        # Put the candidates in the order a scan would have generated them: by position, or by time for dates.
+        if DateFilter not in plan.intervals:
+            return sorted(candidates)
+        time = self._columns.time
+        return sorted(candidates, key=lambda position: (time[position], position))
+
+    def _index_driver(self, plan):
+        """Pick the index that narrows a filter plan's candidates the most, and collect its candidates.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :return: A tuple of the filter classes that the candidates match already, and the
+                 candidate positions in the order the query generates them - or None to
+                 scan as usual (see `_choose_driver`).
+        """
+        driver = self._choose_driver(plan)
+        if driver is None:
+            return None
+        filter_classes, _ = driver
+        return filter_classes, self._driver_candidates(plan, filter_classes)
+
+    def aggregate(self, filters, group_by='year'):
+        """Summarize the close approaches that match a collection of filters, in groups.
+
+        The statistics are computed from the columns alone (see
+        `aggregate.group_stats`), without building any `CloseApproach`. With the
+        vectorized engine, and filters that all vectorize, the whole computation
+        runs on NumPy arrays.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param group_by: One of `aggregate.GROUP_KEYS`: 'year', 'month', 'neo' or 'hazardous'.
+        :return: A list of `aggregate.GroupStats`, one per non-empty group, in group order.
+        :raises ValueError: If `group_by` isn't one of `aggregate.GROUP_KEYS`.
+        """
+        plan = FilterPlan.from_filters(filters)
+        indices = ()
+        if not plan.empty:
+            indices = self.query_indices(plan)
+            if self._vectors is not None:
+                matches, remaining = self._vector_indices(plan)
+                if not remaining:
+                    indices = matches
+        return group_stats(self._columns, indices, group_by, self._neos)
+
+    def approaches_at(self, indices):
+        """Generate the close approaches at a sequence of positions, such as from `query_indices`.
+
+        :param indices: An iterable of approach positions.
+        :return: A stream of the `CloseApproach` objects at those positions.
+        """
+        approaches = self._approaches
+        for index in indices:
+            yield approaches[index]
+
+    def _query_vectors(self, plan, within=None):
+        """Generate the positions of the close approaches that match a filter plan, using NumPy views.
+
+        Every vectorizable filter is reduced to a boolean mask in one pass over
+        the columns. Any other filter is checked one approach at a time, but
+        only on the approaches that survived the masks. As on the row-by-row
+        path, date criteria make the matches come out in time order. Matching positions are
+        generated lazily, so a consumer such as `limit` that stops early never
+        touches the rest.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :param within: A sequence of approach positions to check, or None to check all of them.
+        :return: A stream of the positions of matching close approaches.
+        """
+        with self._stage('scan'):
+            indices, remaining = self._vector_indices(plan, within)
+        if self._profile is not None:
+            # The masks examine every approach (or every position `within`), not just the candidates.
+            self._profile.examined += len(self._approaches) if within is None else len(within)
+        for index in indices.tolist():
+            if not remaining or all(f(self._approaches[index]) for f in remaining):
+                yield index
+
+    def _vector_indices(self, plan, within=None):
+        """Find the positions of the close approaches that match a filter plan's vectorizable filters.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :param within: A sequence of approach positions to check, or None to check all of them.
+        :return: A tuple of a NumPy array of the matching positions, in query order, and a
+                 list of the filters that still have to be checked one approach at a time.
+        """
+        selected, remaining = self._vectors.select(self._statistics.order(plan))
+        dates = plan.intervals.get(DateFilter)
+        if within is not None:
+            indices = self._vectors.time_ordered(within)
+            indices = indices[selected[indices]]
+        elif dates is None:
+            indices = selected.nonzero()[0]
+        else:
+            start, stop = self._date_slice(*dates)
+            indices = self._vectors.time_ordered(self._time_order[start:stop])
+            indices = indices[selected[indices]]
+        return indices, remaining
+
+    def _date_slice(self, first=None, last=None):
+        """Find the slice of the time-sorted index holding approaches between two dates.
+
+        :param first: The earliest date allowed (inclusive), or None if unbounded.
+        :param last: The latest date allowed (inclusive), or None if unbounded.
+        :return: A (start, stop) pair of positions in `_time_order`.
+        """
+        first = None if first is None else date_to_day(first)
+        last = None if last is None else date_to_day(last)
+        # The final sentinel of `_day_starts` is where the approaches with an unknown time start.
+        start = 0 if first is None else self._day_starts[bisect.bisect_left(self._days, first)]
+        stop = self._day_starts[-1] if last is None else self._day_starts[bisect.bisect_right(self._days, last)]
+        return start, max(start, stop)
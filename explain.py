@@ -0,0 +1,226 @@
+"""Explain how a `NEODatabase` answers a query, and profile each stage as it runs.
+
+The `explain` function describes a query without running it: the normalized
+`filters.FilterPlan`, the query engine, the access path that finds the candidate
+close approaches (a full scan, a slice of the time-sorted index, a range of a
+sorted index, or the approaches of the matching NEOs - see
+`NEODatabase._access_path`), the filters left to check on the candidates, how the
+results are ordered, and estimates of the rows examined and matched. Nothing is
+built to describe it: an attribute's selectivity is exact on its own if its
+index is built already, and estimated from the database's histograms otherwise;
+the estimate of the matches multiplies them together, as if the attributes were
+independent. The remaining filters are listed in the order they are checked -
+cheapest and most selective first (see `histogram.ColumnStatistics.rank`) - with
+the fraction of the approaches that each is estimated to let through, and its
+relative cost per approach.
+
+The `analyze` function runs the query the way `NEODatabase.query` does, with a
+`QueryProfile` attached to the database that its query path reports to: the
+access path it took, how many candidates it found and how many rows it examined
+before stopping, and the time spent in each stage - choosing the access path
+(`plan`), finding and checking the candidates (`scan`), ordering the matches
+(`sort`), building their `CloseApproach`es (`materialize`), and writing them
+(`write`).
+"""
+import collections
+import contextlib
+import time
+
+from database import DATE_SLICE, FULL_SCAN, INDEX_RANGE, NEO_FIRST, NEO_FILTERS, SORT_KEYS, INDEXED_FILTERS
+from filters import DateFilter, FilterPlan
+
+
+def _engine(database, path):
+    """Describe the engine that checks the candidates of an access path."""
+    if database._vectors is not None and path in (FULL_SCAN, DATE_SLICE):
+        return 'vectorized (NumPy)'
+    return 'row-by-row'
+
+
+def _order(database, plan, sort_by, descending, limit):
+    """Describe how the matches of a plan are ordered."""
+    if sort_by is None:
+        return 'time order' if DateFilter in plan.intervals else 'internal order'
+    direction = 'descending' if descending else 'ascending'
+    if limit and database._choose_driver(plan, build=False) is None and _presorted(database, plan, sort_by):
+        how = f"walking its sorted index until {limit} matches"
+    elif limit:
+        how = f"keeping a heap of the first {limit} matches"
+    else:
+        how = "sorting all of the matches"
+    return f"by {sort_by}, {direction}, {how}"
+
+
+def _presorted(database, plan, sort_by):
+    """Tell whether a query ordered by an attribute can walk the attribute's presorted index.
+
+    As `NEODatabase._presorted_order` does, but without building the index: an
+    index that isn't built yet is taken to be whole if the attribute's sampled
+    values are all known.
+    """
+    filter_class = SORT_KEYS.get(sort_by)
+    if filter_class is DateFilter:
+        return DateFilter in plan.intervals or database._day_starts[-1] == len(database._time_order)
+    if filter_class not in INDEXED_FILTERS:
+        return False
+    if filter_class in database._sorted_indexes:
+        return len(database._sorted_indexes[filter_class][0]) == len(database._approaches)
+    histogram = filter_class.column(database._statistics)
+    return len(histogram.values) == histogram.size
+
+
+def _describe_filter(statistics, f):
+    """Describe a filter with its estimated selectivity and cost."""
+    return f"{f!r} (passes ~{statistics.selectivity(f):.1%}, cost {statistics.cost(f):g})"
+
+
+def explain(database, filters, sort_by=None, descending=False, limit=None):
+    """Describe how a database would answer a query, without running it or building any index.
+
+    :param database: The `NEODatabase` to query.
+    :param filters: A collection of filters capturing user-specified criteria.
+    :param sort_by: One of `database.SORT_KEYS` to order the matches by, or None for internal order.
+    :param descending: Whether to order the matches from the largest value of `sort_by` down.
+    :param limit: The maximum number of matches, or None (or 0) for all of them.
+    :return: A multi-line description of the query plan.
+    """
+    plan = FilterPlan.from_filters(filters)
+    lines = [f"Plan: {plan!r}"]
+    if plan.empty:
+        lines.append("Access path: none - the criteria contradict each other, so nothing matches")
+        return '\n'.join(lines)
+
+    # The same choice as `NEODatabase._access_path`, from bisects of the indexes that are built, and estimates.
+    driver = database._choose_driver(plan, build=False)
+    if driver is not None:
+        driving, examined = driver
+        path = NEO_FIRST if driving[0] in NEO_FILTERS else INDEX_RANGE
+    elif DateFilter in plan.intervals:
+        driving, path = (DateFilter,), DATE_SLICE
+        start, stop = database._date_slice(*plan.intervals[DateFilter])
+        examined = stop - start
+    else:
+        driving, path, examined = (), FULL_SCAN, len(database._approaches)
+    remaining = plan.without(*driving)
+    estimate = examined
+    for filter_class, interval in plan.intervals.items():
+        if filter_class not in driving:
+            estimate *= database._selectivity(filter_class, interval, build=False)
+
+    lines.append(f"Engine: {_engine(database, path)}")
+    lines.append(f"Access path: {path}" + (f" on {', '.join(sorted(cls.__name__ for cls in driving))}"
+                                          if driving else ''))
+    lines.append(f"Estimated rows examined: {examined}")
+    lines.append(f"Estimated matches: {round(estimate)}")
+    statistics = database._statistics
+    lines.append("Remaining filters: " + (', '.join(_describe_filter(statistics, f)
+                                                    for f in statistics.order(remaining)) or 'none'))
+    lines.append(f"Order: {_order(database, plan, sort_by, descending, limit)}")
+    lines.append(f"Limit: {limit or 'none'}")
+    return '\n'.join(lines)
+
+
+class QueryProfile:
+    """Counters and timers that a `NEODatabase` fills in as it answers a query.
+
+    While a profile is attached to a database (as `analyze` does), the
+    database's query path reports the access path it takes and its candidates
+    (`access`), counts the rows it examines (`rows`), and times its stages
+    (`stage`). A stage's time leaves out the time of any stage timed within it,
+    so the stages add up to the total.
+    """
+    def __init__(self):
+        """Create a new, empty `QueryProfile`."""
+        self.path = None
+        self.candidates = None
+        self.examined = 0
+        self.order = None
+        self.stages = collections.OrderedDict()
+        self._recorded = 0.0
+
+    def access(self, path, candidates, order=None):
+        """Record the access path of a query, and its candidate positions.
+
+        :param path: One of `database.ACCESS_PATHS`, or a description of the index walked.
+        :param candidates: The sequence of candidate positions.
+        :param order: How the access path orders the matches, if it does.
+        """
+        self.path = path
+        self.candidates = len(candidates)
+        if order is not None:
+            self.order = order
+
+    def record(self, stage, seconds):
+        """Add time to a stage."""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self._recorded += seconds
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a block as a stage, leaving out the time of the stages timed within it."""
+        start, recorded = time.perf_counter(), self._recorded
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start - (self._recorded - recorded))
+
+    def rows(self, candidates, check):
+        """Count the candidate positions that a check examines, and time it as the `scan` stage.
+
+        :param candidates: An iterable of approach positions.
+        :param check: A function from an iterable of positions to a stream of those that match.
+        :return: A stream of the positions of matching close approaches.
+        """
+        matches = check(self._examine(candidates))
+        while True:
+            start, recorded = time.perf_counter(), self._recorded
+            index = next(matches, None)
+            self.record('scan', time.perf_counter() - start - (self._recorded - recorded))
+            if index is None:
+                return
+            yield index
+
+    def _examine(self, candidates):
+        """Generate candidate positions, counting them."""
+        for index in candidates:
+            self.examined += 1
+            yield index
+
+
+def analyze(database, filters, sort_by=None, descending=False, limit=None, write=None):
+    """Run a query the way `NEODatabase.query` does, and describe what each stage did.
+
+    :param database: The `NEODatabase` to query.
+    :param filters: A collection of filters capturing user-specified criteria.
+    :param sort_by: One of `database.SORT_KEYS` to order the matches by, or None for internal order.
+    :param descending: Whether to order the matches from the largest value of `sort_by` down.
+    :param limit: The maximum number of matches, or None (or 0) for all of them.
+    :param write: A function to call with the list of resulting `CloseApproach`es, or None.
+    :return: A multi-line description of the query plan and its execution.
+    """
+    plan = FilterPlan.from_filters(filters)
+    lines = [explain(database, plan, sort_by=sort_by, descending=descending, limit=limit)]
+
+    profile = database._profile = QueryProfile()
+    try:
+        rows = list(database._result_indices(plan, sort_by, descending, limit))
+    finally:
+        database._profile = None
+
+    with profile.stage('materialize'):
+        results = list(database.approaches_at(rows))
+    if write is not None:
+        with profile.stage('write'):
+            write(results)
+
+    if profile.path is not None:
+        lines.append(f"Access path taken: {profile.path}"
+                     + (f" ({profile.candidates} candidates)" if profile.candidates is not None else ''))
+    lines.append(f"Rows examined: {profile.examined}")
+    if profile.order is not None:
+        lines.append(f"Ordered by: {profile.order}")
+    lines.append(f"Results: {len(results)}")
+    stages = profile.stages
+    lines.append("Time: " + ', '.join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in stages.items())
+                 + f" (total {sum(stages.values()) * 1000:.1f} ms)")
+    return '\n'.join(lines)
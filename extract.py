@@ -2,10 +2,13 @@
 
 The `load_neos` function extracts NEO data from a CSV file, formatted as
 described in the project instructions, into a collection of `NearEarthObject`s.
+It reads only the four columns that a `NearEarthObject` uses.
 
 The `load_approaches` function extracts close approach data from a JSON file,
 formatted as described in the project instructions, into a collection of
-`CloseApproach` objects.
+`CloseApproach` objects. It is built on `iter_approaches`, which parses the
+file incrementally and generates one `CloseApproach` at a time, so that the raw
+text and the decoded list of rows are never held in memory all at once.
 
 The main module calls these functions with the arguments provided at the command
 line, and uses the resulting collections to build an `NEODatabase`.
@@ -14,28 +17,47 @@ You'll edit this file in Task 2.
 """
 import csv
 import json
+import operator
+import re
 
 from models import NearEarthObject, CloseApproach
 
 
+# The columns of a NEO CSV file that a `NearEarthObject` uses.
+NEO_FIELDS = ('pdes', 'name', 'diameter', 'pha')
+
+
 def load_neos(neo_csv_path):
     """Read near-Earth object information from a CSV file.
 
+    Only the `pdes`, `name`, `diameter` and `pha` columns are read. Their
+    positions are resolved from the header once, and each row is read as a
+    plain list, so no dictionary of the file's other columns is built per row.
+
     :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
     :return: A collection of `NearEarthObject`s.
     """
+    with open(neo_csv_path, 'r', newline='') as neo_file_obj:
+        from_row = NearEarthObject.from_row
+        return [from_row(*values) for values in _iter_neo_rows(neo_file_obj)]
 
-    """ A list for keeping all the `NearEarthObject`s created from each CSV row """
-    neo_list = []
 
-    with open(neo_csv_path, 'r') as neo_file_obj:
-        reader = csv.DictReader(neo_file_obj)
+def _iter_neo_rows(neo_file_obj):
+    """Generate the values of the columns of interest (`NEO_FIELDS`) of each row of a NEO CSV file.
 
-        """ Reading each row in the CSV file, creating `NearEarthObject` and adding to the list """
-        for entry in reader:
-            neo_list.append(NearEarthObject(**entry))
+    :param neo_file_obj: An open text file containing data about near-Earth objects.
+    :yield: A tuple of the `pdes`, `name`, `diameter` and `pha` strings of each non-empty row.
+    """
+    reader = csv.reader(neo_file_obj)
+    header = next(reader, None)
+    if header is None:
+        return
 
-    return neo_list
+    # Resolve the columns of interest once, instead of building a dictionary per row.
+    project = operator.itemgetter(*[header.index(field) for field in NEO_FIELDS])
+    for row in reader:
+        if row:
+            yield project(row)
 
 
 def load_approaches(cad_json_path):
@@ -44,18 +66,148 @@ def load_approaches(cad_json_path):
     :param cad_json_path: A path to a JSON file containing data about close approaches.
     :return: A collection of `CloseApproach`es.
     """
+    return list(iter_approaches(cad_json_path))
 
-    """ A list for keeping all the `CloseApproach`s created from each JSON `data` entry """
-    cad_list = []
 
+def iter_approaches(cad_json_path):
+    """Generate close approaches from a JSON file, one at a time.
+
+    The file is read through a buffer and parsed incrementally, so only one row
+    of the `data` array is decoded at a time. If the `fields` header precedes
+    the `data` array (as it does in NASA's API responses), memory use stays
+    flat however large the file is; otherwise, the rows are held until the
+    header is reached.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :yield: Each `CloseApproach` in the file, in order.
+    """
+    positions = None
     with open(cad_json_path, 'r') as cad_file_obj:
-        json_reader = json.loads(cad_file_obj.read())
+        for cad_fields, entry in _iter_cad_rows(cad_file_obj):
+            if positions is None:
+                # Resolve the columns of interest once, instead of building a dictionary per row.
+                positions = [cad_fields.index(field) for field in ('des', 'cd', 'dist', 'v_rel')]
+                des, cd, dist, v_rel = positions
+            yield CloseApproach.from_row(entry[des], entry[cd], entry[dist], entry[v_rel])
+
+
+# Matches the (possibly empty) run of whitespace allowed between JSON tokens.
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
 
-        cad_fields = json_reader['fields']
-        for entry in json_reader['data']:
-            cad = {}
-            for index, value in enumerate(cad_fields):
-                cad[value] = entry[index]
-            cad_list.append(CloseApproach(**cad))
 
-    return cad_list
+class _JSONStream:
+    """A buffered cursor over a JSON document that decodes one value at a time.
+
+    Values are decoded with `json.JSONDecoder.raw_decode` from a buffer that is
+    refilled from the underlying file whenever a value runs past its end.
+    """
+    def __init__(self, file_obj, chunk_size=1 << 16):
+        """Create a new `_JSONStream` over an open text file."""
+        self._file = file_obj
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Read another chunk into the buffer, discarding what has been consumed."""
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def next_char(self):
+        """Consume and return the next non-whitespace character, or '' at the end of the file."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                char = self._buffer[self._pos]
+                self._pos += 1
+                return char
+            if not self._fill():
+                return ''
+
+    def peek_char(self):
+        """Return the next non-whitespace character without consuming it, or '' at the end."""
+        char = self.next_char()
+        if char:
+            self._pos -= 1
+        return char
+
+    def expect(self, expected):
+        """Consume the next non-whitespace character, which must be `expected`."""
+        char = self.next_char()
+        if char != expected:
+            raise ValueError(f"Malformed JSON: expected {expected!r} but found {char!r}.")
+
+    def value(self):
+        """Consume and return the next JSON value."""
+        self.peek_char()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A value that runs up to the end of the buffer (such as a number) may continue in the next chunk.
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def _iter_cad_rows(cad_file_obj):
+    """Parse the top-level object of a close approach JSON file, generating its `data` rows.
+
+    :param cad_file_obj: An open text file containing close approach data.
+    :yield: A tuple of the `fields` header and a row of the `data` array, for each row.
+    """
+    stream = _JSONStream(cad_file_obj)
+    cad_fields = None
+    held_rows = []
+
+    stream.expect('{')
+    if stream.peek_char() == '}':
+        stream.next_char()
+        return
+
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == 'data':
+            stream.expect('[')
+            if stream.peek_char() == ']':
+                stream.next_char()
+            else:
+                while True:
+                    entry = stream.value()
+                    if cad_fields is None:
+                        held_rows.append(entry)
+                    else:
+                        yield cad_fields, entry
+                    char = stream.next_char()
+                    if char == ']':
+                        break
+                    if char != ',':
+                        raise ValueError(f"Malformed JSON: unexpected {char!r} in the data array.")
+        else:
+            value = stream.value()
+            if key == 'fields':
+                cad_fields = value
+                for entry in held_rows:
+                    yield cad_fields, entry
+                held_rows = []
+
+        char = stream.next_char()
+        if char == '}':
+            break
+        if char != ',':
+            raise ValueError(f"Malformed JSON: unexpected {char!r} in the top-level object.")
+
+    if held_rows:
+        raise ValueError("Malformed close approach data: the `fields` header is missing.")
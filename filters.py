@@ -9,7 +9,13 @@ This function can be thought to return a collection of instances of subclasses
 of `AttributeFilter` - a 1-argument callable (on a `CloseApproach`) constructed
 from a comparator (from the `operator` module), a reference value, and a class
 method `get` that subclasses can override to fetch an attribute of interest from
-the supplied `CloseApproach`.
+the supplied `CloseApproach`. Each filter can also read the attribute of
+interest straight from a columnar copy of the data, through the class method
+`column` and the matching `reference` value - by position, or over the whole
+data set at once with `mask`.
+
+The filters are normalized into a `FilterPlan`, which merges the criteria on
+each attribute into one interval and recognizes criteria that match nothing.
 
 The `limit` function simply limits the maximum number of values produced by an
 iterator.
@@ -19,6 +25,9 @@ You'll edit this file in Tasks 3a and 3c.
 import operator
 import itertools
 
+from columnar import np
+from helpers import date_to_day
+
 class UnsupportedCriterionError(NotImplementedError):
     """A filter criterion is unsupported."""
 
@@ -38,6 +47,7 @@ class AttributeFilter:
     Concrete subclasses can override the `get` classmethod to provide custom
     behavior to fetch a desired attribute from the given `CloseApproach`.
     """
+
     def __init__(self, op, value):
         """Construct a new `AttributeFilter` from an binary predicate and a reference value.
 
@@ -68,6 +78,37 @@ class AttributeFilter:
         """
         raise UnsupportedCriterionError
 
+    def mask(self, columns):
+        """Evaluate this filter over every close approach at once.
+
+        This executes `column(columns) OP reference()` on whole NumPy arrays,
+        producing a boolean mask with one entry per close approach.
+
+        :param columns: A `columnar.VectorColumns` holding the close approach data.
+        :return: A boolean array, true where a close approach satisfies this filter.
+        """
+        return self.op(self.column(columns), self.reference())
+
+    @classmethod
+    def column(cls, columns):
+        """Get the column of interest from a columnar copy of the close approaches.
+
+        Concrete subclasses must override this method to return the column that
+        holds, at each approach's position, the raw value that `get` would
+        produce (in the units of `reference`).
+
+        :param columns: A `columnar.ApproachColumns` or `columnar.VectorColumns`.
+        :return: A column of the attribute of interest, comparable to `self.reference()` via `self.op`.
+        """
+        raise UnsupportedCriterionError
+
+    def reference(self):
+        """Return the reference value in the units stored by `column`.
+
+        :return: The reference value, comparable to an element of `column` via `self.op`.
+        """
+        return self.value
+
     def __repr__(self):
         return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, value={self.value})"
 
@@ -84,6 +125,20 @@ class DateFilter(AttributeFilter):
         """
         return approach.time.date()
 
+    @classmethod
+    def column(cls, columns):
+        """
+            :param columns: A columnar copy of the close approach data.
+            :return: The day of each `CloseApproach`, as a number of days since `helpers.EPOCH`
+        """
+        return columns.day
+
+    def reference(self):
+        """
+            :return: The reference date, as a number of days since `helpers.EPOCH`
+        """
+        return date_to_day(self.value)
+
 class DistanceFilter(AttributeFilter):
     """
     Class to filter on `CloseApproach`s distance attribute
@@ -96,6 +151,14 @@ class DistanceFilter(AttributeFilter):
         """
         return approach.distance
 
+    @classmethod
+    def column(cls, columns):
+        """
+            :param columns: A columnar copy of the close approach data.
+            :return: The distance of each `CloseApproach`
+        """
+        return columns.distance
+
 class VelocityFilter(AttributeFilter):
     """
     Class to filter on `CloseApproach`s velocity attribute
@@ -108,6 +171,14 @@ class VelocityFilter(AttributeFilter):
         """
         return approach.velocity
 
+    @classmethod
+    def column(cls, columns):
+        """
+            :param columns: A columnar copy of the close approach data.
+            :return: The velocity of each `CloseApproach`
+        """
+        return columns.velocity
+
 class DiameterFilter(AttributeFilter):
     """
     Class to filter on `CloseApproach`s `NearEarthObject` diameter attribute
@@ -120,6 +191,14 @@ class DiameterFilter(AttributeFilter):
         """
         return approach.neo.diameter
 
+    @classmethod
+    def column(cls, columns):
+        """
+            :param columns: A columnar copy of the close approach data.
+            :return: The diameter of each `CloseApproach`s `NearEarthObject`
+        """
+        return columns.diameter
+
 class IsHaradousFilter(AttributeFilter):
     """
     Class to filter `CloseApproach`s `NearEarthObject` hazardous attribute
@@ -132,7 +211,170 @@ class IsHaradousFilter(AttributeFilter):
         """
         return approach.neo.hazardous
 
+    @classmethod
+    def column(cls, columns):
+        """
+            :param columns: A columnar copy of the close approach data.
+            :return: The hazardous of each `CloseApproach`s `NearEarthObject`
+        """
+        return columns.hazardous
+
+
+class MatchNothingFilter:
+    """A filter that no close approach satisfies.
+
+    A `FilterPlan` whose criteria contradict each other (for example, a
+    minimum distance above the maximum distance) holds only this filter, so
+    that even a caller that simply calls each filter finds no matches.
+    """
+    def __call__(self, approach):
+        """Invoke `self(approach)`."""
+        return False
+
+    def mask(self, columns):
+        """Evaluate this filter over every close approach at once."""
+        return np.zeros(len(columns), dtype=np.bool_)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+def _filter_key(f):
+    """Return a hashable key for a filter: its attribute, comparator and value, if it has them."""
+    if isinstance(f, AttributeFilter):
+        return type(f).__name__, f.op.__name__, f.value
+    return f
+
 
+class FilterPlan:
+    """A normalized collection of filters, with one closed interval per attribute.
+
+    A `FilterPlan` merges every `AttributeFilter` on the same attribute (that
+    is, of the same subclass) with an `eq`, `ge` or `le` comparator into a
+    single closed interval `(low, high)`, where either end may be None if it is
+    unbounded. If any interval is empty, the whole plan can match nothing, and
+    `empty` is True.
+
+    Iterating over a `FilterPlan` produces plain 1-argument callables - at most
+    two `AttributeFilter`s per interval (or one with `eq` if the interval is a
+    single value), followed by any filters that couldn't be merged - so it can
+    be used anywhere a collection of filters is expected.
+    """
+    def __init__(self, intervals=None, residual=(), empty=False):
+        """Create a new `FilterPlan`.
+
+        :param intervals: A dictionary mapping `AttributeFilter` subclasses to `(low, high)` intervals.
+        :param residual: A collection of filters that aren't expressed as intervals.
+        :param empty: Whether the criteria are known to match nothing.
+        """
+        self.intervals = dict(intervals or {})
+        self.residual = list(residual)
+        self.empty = empty
+
+        if self.empty:
+            self._filters = [MatchNothingFilter()]
+        else:
+            self._filters = []
+            for filter_class, (low, high) in self.intervals.items():
+                if low is not None and low == high:
+                    self._filters.append(filter_class(operator.eq, low))
+                    continue
+                if low is not None:
+                    self._filters.append(filter_class(operator.ge, low))
+                if high is not None:
+                    self._filters.append(filter_class(operator.le, high))
+            self._filters.extend(self.residual)
+
+    @classmethod
+    def from_filters(cls, filters):
+        """Normalize a collection of filters into a `FilterPlan`.
+
+        :param filters: A collection of filters, such as a list of `AttributeFilter`s.
+        :return: A `FilterPlan` matching exactly the same close approaches.
+        """
+        if isinstance(filters, cls):
+            return filters
+
+        intervals = {}
+        residual = []
+        for f in filters:
+            if not isinstance(f, AttributeFilter) or f.op not in (operator.eq, operator.ge, operator.le):
+                residual.append(f)
+                continue
+
+            low, high = intervals.get(type(f), (None, None))
+            if f.op is not operator.le:
+                low = f.value if low is None else max(low, f.value)
+            if f.op is not operator.ge:
+                high = f.value if high is None else min(high, f.value)
+            intervals[type(f)] = (low, high)
+
+        empty = any(isinstance(f, MatchNothingFilter) for f in residual) or any(
+            low is not None and high is not None and low > high
+            for low, high in intervals.values()
+        )
+        return cls(intervals, residual, empty)
+
+    @property
+    def key(self):
+        """Return a hashable key that is equal for plans with equal criteria, or None.
+
+        Filters are keyed by attribute, comparator and reference value, so the
+        order in which the criteria were given doesn't matter. A plan with a
+        residual filter that isn't an `AttributeFilter` has no key.
+        """
+        if self.empty:
+            return (MatchNothingFilter.__name__,)
+        if not all(isinstance(f, AttributeFilter) for f in self.residual):
+            return None
+        intervals = sorted((filter_class.__name__, interval) for filter_class, interval in self.intervals.items())
+        return tuple(intervals), frozenset(_filter_key(f) for f in self.residual)
+
+    def narrows(self, other):
+        """Return whether every close approach matching this plan also matches `other`.
+
+        This is decided from the criteria alone: each of `other`'s intervals must
+        contain this plan's interval on the same attribute, and each of
+        `other`'s residual filters must also be one of this plan's.
+
+        :param other: Another `FilterPlan`.
+        :return: True if this plan's matches are known to be a subset of `other`'s.
+        """
+        if self.empty:
+            return True
+        if other.empty or not {_filter_key(f) for f in other.residual} <= {_filter_key(f) for f in self.residual}:
+            return False
+        for filter_class, (low, high) in other.intervals.items():
+            if filter_class not in self.intervals:
+                return False
+            own_low, own_high = self.intervals[filter_class]
+            if low is not None and (own_low is None or own_low < low):
+                return False
+            if high is not None and (own_high is None or own_high > high):
+                return False
+        return True
+
+    def without(self, *filter_classes):
+        """Return the filters of this plan, leaving out those on the given attributes.
+
+        :param filter_classes: `AttributeFilter` subclasses whose intervals to leave out.
+        :return: A list of the remaining filters.
+        """
+        return [f for f in self._filters if type(f) not in filter_classes]
+
+    def __iter__(self):
+        """Iterate over the filters of this plan."""
+        return iter(self._filters)
+
+    def __len__(self):
+        """Return the number of filters in this plan."""
+        return len(self._filters)
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(intervals={{"
+                + ", ".join(f"{filter_class.__name__}: {interval!r}"
+                            for filter_class, interval in self.intervals.items())
+                + f"}}, residual={self.residual!r}, empty={self.empty!r})")
 
 
 def create_filters(date=None, start_date=None, end_date=None,
@@ -154,8 +396,11 @@ def create_filters(date=None, start_date=None, end_date=None,
     `hazardous=False`, not to be confused with `hazardous=None`).
 
     The return value must be compatible with the `query` method of `NEODatabase`
-    because the main module directly passes this result to that method. For now,
-    this can be thought of as a collection of `AttributeFilter`s.
+    because the main module directly passes this result to that method. It is a
+    `FilterPlan`: the criteria are merged into one closed interval per attribute
+    (so `--date` with `--start-date`, say, becomes a single date interval), and
+    contradictory criteria produce a plan whose `empty` attribute is True. The
+    plan still iterates as a collection of `AttributeFilter`s.
 
     :param date: A `date` on which a matching `CloseApproach` occurs.
     :param start_date: A `date` on or after which a matching `CloseApproach` occurs.
@@ -167,7 +412,7 @@ def create_filters(date=None, start_date=None, end_date=None,
     :param diameter_min: A minimum diameter of the NEO of a matching `CloseApproach`.
     :param diameter_max: A maximum diameter of the NEO of a matching `CloseApproach`.
     :param hazardous: Whether the NEO of a matching `CloseApproach` is potentially hazardous.
-    :return: A collection of filters for use with `query`.
+    :return: A `FilterPlan` of filters for use with `query`.
     """
 
     """ List for keeping all the filter classes """
@@ -204,7 +449,7 @@ def create_filters(date=None, start_date=None, end_date=None,
     if hazardous is not None:
         filter_list.append(IsHaradousFilter(operator.eq, hazardous))
 
-    return filter_list
+    return FilterPlan.from_filters(filter_list)
 
 
 def limit(iterator, n=None):
@@ -3,7 +3,10 @@
 NASA's dataset provides timestamps as naive datetimes (corresponding to UTC).
 
 The `cd_to_datetime` function converts a string, formatted as the `cd` field of
-NASA's close approach data, into a Python `datetime`
+NASA's close approach data, into a Python `datetime`. Since it runs once per
+close approach, it slices the fixed-width string directly instead of calling
+`strptime`, and remembers recent results, falling back to `strptime` for
+anything it doesn't recognize.
 
 The `datetime_to_str` function converts a Python `datetime` into a string.
 Although `datetime`s already have human-readable string representations, those
@@ -11,8 +14,55 @@ representations display seconds, but NASA's data (and our datetimes!) don't
 provide that level of resolution, so the output format also will not.
 """
 import datetime
+import functools
 
 
+# English month abbreviations, as they appear in the `cd` field, and their numbers.
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+
+# The reference point for timestamps stored as whole minutes, and dates stored as whole days.
+EPOCH = datetime.datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+_EPOCH_ORDINAL = EPOCH.toordinal()
+_ONE_MINUTE = datetime.timedelta(minutes=1)
+
+# The time, in minutes since `EPOCH`, that stands for an unknown time of closest approach: the
+# largest 64-bit integer, so that unknown times sort after every known one. Its day is kept out
+# of every date range.
+MISSING_MINUTE = (1 << 63) - 1
+MISSING_DAY = MISSING_MINUTE // MINUTES_PER_DAY
+
+# The number of recent results each memoized conversion keeps. The data files list
+# approaches in time order, so repeated days and timestamps are close together, and a
+# few thousand entries catch as many repeats as an unbounded cache would.
+_CACHE_SIZE = 4096
+
+# The minutes since midnight of every hh:mm time of day.
+_CLOCK_MINUTES = {f"{hour:02d}:{minute:02d}": hour * 60 + minute for hour in range(24) for minute in range(60)}
+
+
+def _split_calendar_date(calendar_date):
+    """Split a `cd` string in the fixed YYYY-bb-DD hh:mm layout into integer fields.
+
+    :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
+    :return: A (year, month, day, hour, minute) tuple, or None if the layout doesn't match.
+    """
+    if (len(calendar_date) == 17 and calendar_date[4] == '-' and calendar_date[8] == '-'
+            and calendar_date[11] == ' ' and calendar_date[14] == ':'):
+        month = _MONTHS.get(calendar_date[5:8])
+        year, day = calendar_date[0:4], calendar_date[9:11]
+        hour, minute = calendar_date[12:14], calendar_date[15:17]
+        if (month is not None and year.isdigit() and day.isdigit()
+                and hour.isdigit() and minute.isdigit()):
+            return int(year), month, int(day), int(hour), int(minute)
+    return None
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
 def cd_to_datetime(calendar_date):
     """Convert a NASA-formatted calendar date/time description into a datetime.
 
@@ -23,12 +73,107 @@ def cd_to_datetime(calendar_date):
 
     This will become the Python object `datetime.datetime(2020, 12, 31, 12, 0)`.
 
+    Recent results are memoized, since approaches close in time often share a
+    timestamp, and `datetime`s are immutable. Input that doesn't match the fixed layout is
+    handed to `strptime`, which raises `ValueError` if it is malformed.
+
     :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
     :return: A naive `datetime` corresponding to the given calendar date and time.
     """
+    fields = _split_calendar_date(calendar_date)
+    if fields is not None:
+        try:
+            return datetime.datetime(*fields)
+        except ValueError:
+            pass
     return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
 
 
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _calendar_day_to_day(calendar_day):
+    """Convert the YYYY-bb-DD date part of a `cd` string into days since `EPOCH`.
+
+    The date part is shared by every approach on the same day, so recent
+    results are memoized.
+
+    :param calendar_day: A calendar date in YYYY-bb-DD format.
+    :return: The number of whole days since `EPOCH`, or None if the layout doesn't match.
+    """
+    if len(calendar_day) == 11 and calendar_day[4] == '-' and calendar_day[8] == '-':
+        month = _MONTHS.get(calendar_day[5:8])
+        year, day = calendar_day[0:4], calendar_day[9:11]
+        if month is not None and year.isdigit() and day.isdigit():
+            try:
+                return datetime.date(int(year), month, int(day)).toordinal() - _EPOCH_ORDINAL
+            except ValueError:
+                pass
+    return None
+
+
+def cd_to_minute(calendar_date):
+    """Convert a NASA-formatted calendar date/time description into minutes since `EPOCH`.
+
+    This is equivalent to `datetime_to_minute(cd_to_datetime(calendar_date))`,
+    but doesn't build (or cache) a `datetime` for well-formed input.
+
+    :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
+    :return: The number of whole minutes between `EPOCH` and the given calendar date and time.
+    """
+    if len(calendar_date) == 17 and calendar_date[11] == ' ':
+        clock = _CLOCK_MINUTES.get(calendar_date[12:])
+        if clock is not None:
+            day = _calendar_day_to_day(calendar_date[:11])
+            if day is not None:
+                return day * MINUTES_PER_DAY + clock
+    return datetime_to_minute(cd_to_datetime(calendar_date))
+
+
+def cd_to_str(calendar_date):
+    """Convert a NASA-formatted calendar date/time description into a human-readable string.
+
+    This is equivalent to `datetime_to_str(cd_to_datetime(calendar_date))`, but
+    doesn't build (or cache) a `datetime` for well-formed input: the date part
+    is reformatted once per day, and the hour and minute are kept as they are.
+
+    :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
+    :return: That time, as a human-readable string without seconds.
+    """
+    if len(calendar_date) == 17 and calendar_date[11] == ' ' and calendar_date[14] == ':':
+        hour, minute = calendar_date[12:14], calendar_date[15:17]
+        if hour.isdigit() and minute.isdigit() and int(hour) < 24 and int(minute) < 60:
+            day = _calendar_day_to_day(calendar_date[:11])
+            if day is not None:
+                return _day_to_str(day) + calendar_date[11:]
+    return datetime_to_str(cd_to_datetime(calendar_date))
+
+
+def datetime_to_minute(dt):
+    """Convert a naive `datetime` into a number of minutes since `EPOCH`.
+
+    :param dt: A naive `datetime`.
+    :return: The number of whole minutes between `EPOCH` and that datetime.
+    """
+    return (dt - EPOCH) // _ONE_MINUTE
+
+
+def minute_to_datetime(minute):
+    """Convert a number of minutes since `EPOCH` back into a naive `datetime`.
+
+    :param minute: A number of whole minutes since `EPOCH`.
+    :return: The corresponding naive `datetime`.
+    """
+    return EPOCH + minute * _ONE_MINUTE
+
+
+def date_to_day(date):
+    """Convert a `datetime.date` into a number of days since `EPOCH`.
+
+    :param date: A `datetime.date`.
+    :return: The number of whole days between `EPOCH` and that date.
+    """
+    return date.toordinal() - _EPOCH_ORDINAL
+
+
 def datetime_to_str(dt):
     """Convert a naive Python datetime into a human-readable string.
 
@@ -42,3 +187,35 @@ def datetime_to_str(dt):
     :return: That datetime, as a human-readable string without seconds.
     """
     return datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M")
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def _day_to_str(day):
+    """Format a number of days since `EPOCH` as YYYY-MM-DD, as `datetime_to_str` would."""
+    return datetime.date.fromordinal(_EPOCH_ORDINAL + day).strftime("%Y-%m-%d")
+
+
+def minute_to_str(minute):
+    """Convert a number of minutes since `EPOCH` into a human-readable string.
+
+    This is equivalent to `datetime_to_str(minute_to_datetime(minute))`, but
+    doesn't build a `datetime`: each day's date is formatted once, and only the
+    hour and minute are formatted per call.
+
+    :param minute: A number of whole minutes since `EPOCH`.
+    :return: That time, as a human-readable string without seconds.
+    """
+    day, minute = divmod(minute, MINUTES_PER_DAY)
+    hour, minute = divmod(minute, 60)
+    return f"{_day_to_str(day)} {hour:02d}:{minute:02d}"
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def day_to_month(day):
+    """Find the calendar month of a number of days since `EPOCH`.
+
+    :param day: A number of whole days since `EPOCH`.
+    :return: The number of whole months between `EPOCH` and the month holding that day.
+    """
+    date = datetime.date.fromordinal(_EPOCH_ORDINAL + day)
+    return (date.year - EPOCH.year) * 12 + date.month - 1
@@ -0,0 +1,183 @@
+"""Estimate how selective filters are, from histograms of a sample of the close approaches.
+
+A `ColumnStatistics` holds one `Histogram` per attribute that the filters from
+`filters.create_filters` inspect - day, distance, velocity, and the diameter and
+hazardous flag of each approach's NEO - under the same names as the columns of
+a `columnar.ApproachColumns`. So a filter finds its histogram the same way it
+finds its column, through its `column` class method, and estimates the fraction
+of the close approaches that it lets through from its comparator and `reference`
+value.
+
+Each histogram is equi-depth: it keeps the sorted values of an evenly spaced
+sample of at most `SAMPLE_SIZE` approaches, and every sampled value stands for
+the same number of approaches. Building them reads only the sampled positions
+of the columns, so it is cheap enough to do whenever the columns are built, and
+the estimates are exact for data sets no larger than the sample.
+
+Filters are then ranked for evaluation (see `ColumnStatistics.rank`): a filter
+that rejects more of the approaches, at a lower cost per approach, runs first,
+so that the filters after it run on fewer approaches.
+"""
+import bisect
+import operator
+
+from helpers import MINUTES_PER_DAY, MISSING_MINUTE
+
+
+# The largest number of close approaches sampled for each histogram.
+SAMPLE_SIZE = 2048
+
+# The estimated fraction of the approaches let through by a filter without a histogram.
+DEFAULT_SELECTIVITY = 1 / 3
+
+# The relative cost of checking one approach against a column, rather than calling a filter on its `CloseApproach`.
+COLUMN_COST = 0.5
+
+# The relative cost of calling a filter on a `CloseApproach`, rather than checking a column.
+DEFAULT_COST = 4
+
+
+class Histogram:
+    """An equi-depth histogram of a sample of the values of one attribute."""
+    def __init__(self, values):
+        """Create a new `Histogram` from a sample of values.
+
+        :param values: A sample of the values of an attribute, in any order; NaN marks an unknown value.
+        """
+        self.size = len(values)
+        # NaN compares false with everything, so unknown values count towards the size but never match.
+        self.values = sorted(value for value in values if value == value)
+
+    def fraction(self, op, reference):
+        """Estimate the fraction of the values `value` for which `op(value, reference)` is true.
+
+        :param op: A comparator from the `operator` module.
+        :param reference: The reference value, in the units of the sampled values.
+        :return: The estimated fraction, between 0 and 1, or None for an unsupported comparator.
+        """
+        if not self.size:
+            return 0.0
+        values = self.values
+        if op is operator.eq:
+            count = bisect.bisect_right(values, reference) - bisect.bisect_left(values, reference)
+        elif op is operator.le:
+            count = bisect.bisect_right(values, reference)
+        elif op is operator.lt:
+            count = bisect.bisect_left(values, reference)
+        elif op is operator.ge:
+            count = len(values) - bisect.bisect_left(values, reference)
+        elif op is operator.gt:
+            count = len(values) - bisect.bisect_right(values, reference)
+        else:
+            return None
+        return count / self.size
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(size={self.size}, known={len(self.values)})"
+
+
+class ColumnStatistics:
+    """Histograms of the attributes of the close approaches, named like the columns they describe."""
+    def __init__(self, columns, sample_size=SAMPLE_SIZE):
+        """Create a new `ColumnStatistics` from a sample of a columnar copy of the close approaches.
+
+        :param columns: A `columnar.ApproachColumns`.
+        :param sample_size: The largest number of close approaches to sample.
+        """
+        step = max(len(columns) // sample_size, 1)
+        positions = range(0, len(columns), step)
+        time, neo_index = columns.time, columns.neo_index
+
+        self.day = Histogram([time[position] // MINUTES_PER_DAY if time[position] != MISSING_MINUTE else float('nan')
+                              for position in positions])
+        self.distance = Histogram([columns.distance[position] for position in positions])
+        self.velocity = Histogram([columns.velocity[position] for position in positions])
+        self.diameter = Histogram([columns.neo_diameter[neo_index[position]] for position in positions])
+        self.hazardous = Histogram([columns.neo_hazardous[neo_index[position]] for position in positions])
+
+    def histogram(self, f):
+        """Find the histogram of the attribute that a filter inspects.
+
+        :param f: A filter, such as an `AttributeFilter`.
+        :return: The `Histogram` of the filter's attribute, or None if there isn't one.
+        """
+        column = getattr(f, 'column', None)
+        if column is None:
+            return None
+        try:
+            histogram = column(self)
+        except (AttributeError, NotImplementedError):
+            return None
+        return histogram if isinstance(histogram, Histogram) else None
+
+    def selectivity(self, f):
+        """Estimate the fraction of the close approaches that a filter lets through.
+
+        :param f: A filter, such as an `AttributeFilter`.
+        :return: The estimated fraction, between 0 and 1.
+        """
+        histogram = self.histogram(f)
+        if histogram is not None:
+            fraction = histogram.fraction(f.op, f.reference())
+            if fraction is not None:
+                return fraction
+        return DEFAULT_SELECTIVITY
+
+    def combined_selectivity(self, filters):
+        """Estimate the fraction of the close approaches that match every one of a collection of filters.
+
+        Filters on the same attribute are estimated by the most selective of
+        them, which is an upper bound on the fraction that they let through
+        together; filters on different attributes are taken to be independent.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: The estimated fraction, between 0 and 1.
+        """
+        by_attribute = {}
+        for f in filters:
+            # Filters without a histogram are each their own attribute.
+            attribute = type(f) if self.histogram(f) is not None else id(f)
+            by_attribute[attribute] = min(by_attribute.get(attribute, 1.0), self.selectivity(f))
+        fraction = 1.0
+        for selectivity in by_attribute.values():
+            fraction *= selectivity
+        return fraction
+
+    def cost(self, f):
+        """Estimate the relative cost of checking one close approach against a filter.
+
+        A filter on an attribute with a histogram is checked against its column
+        (see `columnar.ApproachColumns.bind`), at `COLUMN_COST`. Any other filter
+        is called on the `CloseApproach`, at `DEFAULT_COST`.
+
+        :param f: A filter, such as an `AttributeFilter`.
+        :return: The relative cost per close approach.
+        """
+        if self.histogram(f) is not None:
+            return COLUMN_COST
+        return DEFAULT_COST
+
+    def rank(self, f):
+        """Return the rank of a filter: filters of lower rank should be checked first.
+
+        The rank is the filter's cost per approach divided by the fraction of
+        the approaches that it rejects. Checking filters in increasing order of
+        rank minimizes the expected cost of checking an approach against all of
+        them, stopping at the first that fails (if their selectivities are
+        independent).
+
+        :param f: A filter, such as an `AttributeFilter`.
+        :return: The filter's rank.
+        """
+        rejected = 1 - self.selectivity(f)
+        if rejected <= 0:
+            return float('inf')
+        return self.cost(f) / rejected
+
+    def order(self, filters):
+        """Order a collection of filters by rank, so the cheapest and most selective come first.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A list of the same filters, in increasing order of rank (ties keep their order).
+        """
+        return sorted(filters, key=self.rank)
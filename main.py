@@ -5,7 +5,7 @@ See `README.md` for a detailed discussion of this project.
 
 This script can be invoked from the command line::
 
-    $ python3 main.py {inspect,query,interactive} [args]
+    $ python3 main.py {inspect,query,aggregate,interactive} [args]
 
 The `inspect` subcommand looks up an NEO by name or by primary designation, and
 optionally lists all of that NEO's known close approaches:
@@ -29,25 +29,102 @@ or JSON format:
     $ python3 main.py query --limit 5 --outfile results.csv
     $ python3 main.py query --limit 15 --outfile results.json
 
+Results can be ordered by time, distance, velocity or diameter with `--sort-by`
+(and `--desc`, largest first); with `--limit`, only the first matches in that
+order are kept while searching:
+
+    $ python3 main.py query --start-date 2000-01-01 --sort-by distance --limit 20
+    $ python3 main.py query --hazardous --sort-by velocity --desc --limit 20
+
+With `--count`, only the number of matches is printed. Counts over date ranges,
+the hazardous flag, and distance and velocity bounds at the band edges of
+`timecube` are answered from precomputed prefix sums, without a search:
+
+    $ python3 main.py query --count --start-date 2000-01-01 --end-date 2009-12-31 --max-distance 0.05
+
+To see how a query is answered, `--explain` prints its filter plan, access path
+and estimated row counts without running it, and `--analyze` runs it, reporting
+the rows passing each filter and the time spent in each stage:
+
+    $ python3 main.py query --explain --start-date 2020-01-01 --max-distance 0.01
+    $ python3 main.py query --analyze --hazardous --limit 5
+
+JSON results are written one at a time as they are found; `--compact` leaves out
+the indentation, for smaller files:
+
+    $ python3 main.py query --outfile all.json --compact
+
+Results can also be saved as newline-delimited JSON (`.ndjson`), and any output
+file can be compressed by adding `.gz`, `.bz2` or `.xz` to its name. With
+`--format ndjson`, results are printed to standard output as newline-delimited
+JSON, for piping into other tools:
+
+    $ python3 main.py query --start-date 2020-01-01 --outfile results.ndjson.gz
+    $ python3 main.py query --hazardous --format ndjson | jq .distance_au
+
+The `aggregate` subcommand takes the same criteria, and summarizes the matching
+close approaches - their count, and the minimum, mean and maximum distance and
+velocity - grouped by calendar year or month, by NEO, or by hazardous flag:
+
+    $ python3 main.py aggregate --group-by month --start-date 2020-01-01 --end-date 2020-12-31
+    $ python3 main.py aggregate --group-by hazardous --max-distance 0.05 --outfile summary.csv
+
 The `interactive` subcommand loads the NEO database and spawns an interactive
 command shell that can repeatedly execute `inspect` and `query` commands without
-having to wait to reload the database each time. However, it doesn't hot-reload.
+having to wait to reload the database each time. Its `reload` command reads the
+data files again and applies only what changed to the loaded database, and with
+`--watch` it does so automatically whenever a data file is modified.
+Its query results are cached (see `cache.QueryCache`), so repeating a query with
+another `--limit` or `--outfile` doesn't search the database again; the `cache`
+command shows the cache's contents and hit counters.
 
 If needed, the script can load data from data files other than the default with
 `--neofile` or `--cadfile`.
+
+The linked data set is cached in a snapshot file next to the close approach
+data, and restored from there while the data files are unchanged. Use
+`--no-cache` to bypass the snapshot, or `--rebuild-cache` to replace it:
+
+    $ python3 main.py --rebuild-cache query --limit 5
+
+When the data files do have to be parsed, `--parallel` parses them concurrently
+on a pool of processes, and `--cad-chunks` also splits the close approach file
+across several of them:
+
+    $ python3 main.py --parallel --cad-chunks 4 query --limit 5
+
+The `convert` subcommand saves the data set as a folder of memory-mapped column
+files, which `--store` then opens almost instantly, sharing memory between
+concurrent processes:
+
+    $ python3 main.py convert --outdir data/neodb
+    $ python3 main.py --store data/neodb query --limit 5
+
+Narrow distance or velocity ranges are looked up in sorted indexes, built on
+first use; `--build-indexes` builds them as the data set loads, which suits an
+interactive session:
+
+    $ python3 main.py --build-indexes interactive
 """
 import argparse
 import cmd
 import datetime
+import os
 import pathlib
 import shlex
 import sys
 import time
 
+from aggregate import GROUP_KEYS
+from cache import QueryCache
 from extract import load_neos, load_approaches
-from database import NEODatabase
-from filters import create_filters, limit
-from write import write_to_csv, write_to_json
+from database import SORT_KEYS
+from explain import explain, analyze
+from filters import create_filters
+from snapshot import load_database
+from store import open_store, write_store, StoreError
+from write import (write_to_csv, write_to_json, write_to_ndjson, write_ndjson, output_format,
+                   write_groups_to_csv, write_groups_to_json)
 
 
 # Paths to the root of the project and the `data` subfolder.
@@ -89,6 +166,24 @@ def make_parser():
     parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'),
                         type=pathlib.Path,
                         help="Path to JSON file of close approach data.")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Answer queries with the vectorized, NumPy-backed query engine.")
+    parser.add_argument('--no-cache', dest='use_cache', action='store_false',
+                        help="Neither read nor write the snapshot of the linked data files.")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="Ignore any existing snapshot of the data files, and save a fresh one.")
+    parser.add_argument('--parallel', action='store_true',
+                        help="Parse the data files concurrently, on a pool of processes.")
+    parser.add_argument('--workers', type=int,
+                        help="The number of worker processes for `--parallel` (by default, one per CPU).")
+    parser.add_argument('--cad-chunks', type=int, default=1,
+                        help="With `--parallel`, split the close approach file into this many chunks of rows.")
+    parser.add_argument('--build-indexes', action='store_true',
+                        help="Build the sorted indexes on approach distance and velocity up front, "
+                             "instead of on the first query that uses them.")
+    parser.add_argument('--store', type=pathlib.Path,
+                        help="Open the data set from a folder of column files written by `convert`, "
+                             "instead of from the data files.")
     subparsers = parser.add_subparsers(dest='cmd')
 
     # Add the `inspect` subcommand parser.
@@ -102,11 +197,9 @@ def make_parser():
     inspect_id.add_argument('-n', '--name',
                             help="The IAU name of the NEO to inspect (e.g. 'Halley').")
 
-    # Add the `query` subcommand parser.
-    query = subparsers.add_parser('query',
-                                  description="Query for close approaches that "
-                                              "match a collection of filters.")
-    filters = query.add_argument_group('Filters',
+    # The filters shared by the `query` and `aggregate` subcommand parsers.
+    filter_options = argparse.ArgumentParser(add_help=False)
+    filters = filter_options.add_argument_group('Filters',
                                        description="Filter close approaches by their attributes "
                                                    "or the attributes of their NEOs.")
     filters.add_argument('-d', '--date', type=date_fromisoformat,
@@ -144,18 +237,68 @@ def make_parser():
     filters.add_argument('--not-hazardous', dest='hazardous', default=None, action='store_false',
                          help="If specified, only return close approaches of NEOs that "
                               "are not potentially hazardous.")
+
+    # Add the `query` subcommand parser.
+    query = subparsers.add_parser('query', parents=[filter_options],
+                                  description="Query for close approaches that "
+                                              "match a collection of filters.")
     query.add_argument('-l', '--limit', type=int,
                        help="The maximum number of matches to return. "
                             "Defaults to 10 if no --outfile is given.")
+    query.add_argument('--count', action='store_true',
+                       help="Print the number of matches, instead of the matches themselves.")
+    profile = query.add_mutually_exclusive_group()
+    profile.add_argument('--explain', action='store_true',
+                         help="Describe how the query would be answered - the filter plan, access path "
+                              "and estimated row counts - without running it.")
+    profile.add_argument('--analyze', action='store_true',
+                         help="Run the query in timed stages, and report the rows examined, the rows "
+                              "passing each filter, and the time spent in each stage to stderr.")
+    query.add_argument('--sort-by', choices=tuple(SORT_KEYS),
+                       help="Order the matches by this attribute, instead of internal order "
+                            "(time order, with date criteria). With --limit, only the first "
+                            "matches in that order are kept while searching.")
+    query.add_argument('--desc', action='store_true',
+                       help="With --sort-by, order the matches from the largest value down.")
     query.add_argument('-o', '--outfile', type=pathlib.Path,
                        help="File in which to save structured results. "
                             "If omitted, results are printed to standard output.")
+    query.add_argument('--format', choices=('text', 'ndjson'), default='text',
+                       help="How to print results to standard output, if no --outfile is given: "
+                            "as sentences (the default), or as newline-delimited JSON.")
+    query.add_argument('--compact', action='store_true',
+                       help="Write JSON output without indentation or whitespace, "
+                            "which is smaller and faster to write.")
+
+    # Add the `aggregate` subcommand parser.
+    aggregate = subparsers.add_parser('aggregate', parents=[filter_options],
+                                      description="Summarize the close approaches that match a "
+                                                  "collection of filters, in groups.")
+    aggregate.add_argument('-g', '--group-by', choices=GROUP_KEYS, default='year',
+                           help="Group the close approaches by calendar year (the default), "
+                                "calendar month, NEO, or whether the NEO is potentially hazardous.")
+    aggregate.add_argument('-o', '--outfile', type=pathlib.Path,
+                           help="File in which to save the statistics, as CSV or JSON. "
+                                "If omitted, they are printed to standard output as a table.")
+
+    # Add the `convert` subcommand parser.
+    convert = subparsers.add_parser('convert',
+                                    description="Save the data set as a folder of memory-mapped "
+                                                "column files, for use with `--store`.")
+    convert.add_argument('--outdir', default=(DATA_ROOT / 'neodb'), type=pathlib.Path,
+                         help="Folder in which to save the column files.")
 
     repl = subparsers.add_parser('interactive',
                                  description="Start an interactive command session "
                                              "to repeatedly run `interact` and `query` commands.")
     repl.add_argument('-a', '--aggressive', action='store_true',
                       help="If specified, kill the session whenever a project file is modified.")
+    repl.add_argument('-w', '--watch', action='store_true',
+                      help="If specified, reload the data whenever a data file is modified.")
+    repl.add_argument('--cache-size', type=int, default=64,
+                      help="The maximum number of query results to cache (0 disables the cache).")
+    repl.add_argument('--cache-memory', type=float, default=64,
+                      help="The maximum size of the cached query results, in MiB.")
     return parser, inspect, query
 
 
@@ -195,43 +338,119 @@ def inspect(database, pdes=None, name=None, verbose=False):
     return neo
 
 
-def query(database, args):
-    """Perform the `query` subcommand.
-
-    Create a collection of filters with `create_filters` and supply them to the
-    database's `query` method to produce a stream of matching results.
-
-    If an output file wasn't given, print these results to stdout, limiting to
-    10 entries if no limit was specified. If an output file was given, use the
-    file's extension to infer whether the file should hold CSV or JSON data, and
-    then write the results to the output file in that format.
+def filters_from_args(args):
+    """Create a collection of filters from the `Filters` options of the `query` or `aggregate` subcommand.
 
-    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
     :param args: All arguments from the command line, as parsed by the top-level parser.
+    :return: A collection of filters, as from `create_filters`.
     """
-    # Construct a collection of filters from arguments supplied at the command line.
-    filters = create_filters(
+    return create_filters(
         date=args.date, start_date=args.start_date, end_date=args.end_date,
         distance_min=args.distance_min, distance_max=args.distance_max,
         velocity_min=args.velocity_min, velocity_max=args.velocity_max,
         diameter_min=args.diameter_min, diameter_max=args.diameter_max,
         hazardous=args.hazardous
     )
-    # Query the database with the collection of filters.
-    results = database.query(filters)
 
+
+def query(database, args, cache=None):
+    """Perform the `query` subcommand.
+
+    Create a collection of filters with `create_filters` and supply them to the
+    database's `query` method to produce a stream of matching results. With
+    `--count`, print only the number of matches, from the database's `count`.
+    With `--explain`, describe the query plan instead of running it; with
+    `--analyze`, run it in timed stages, and report on each to stderr.
+
+    If an output file wasn't given, print these results to stdout, limiting to
+    10 entries if no limit was specified, either as sentences or (with `--format
+    ndjson`) as newline-delimited JSON. If an output file was given, use the
+    file's extension to infer whether the file should hold CSV, JSON or
+    newline-delimited JSON data, and whether to compress it, and then write the
+    results to the output file in that format.
+
+    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    :param cache: A `cache.QueryCache` to answer the query through, or None to query the database directly.
+    """
+    # Construct a collection of filters from arguments supplied at the command line.
+    filters = filters_from_args(args)
+    if args.count:
+        print(database.count(filters))
+        return
+
+    # Query the database with the collection of filters, limiting to 10 entries on stdout if not specified.
+    n = args.limit if args.outfile else (args.limit or 10)
+    options = {'sort_by': args.sort_by, 'descending': args.desc, 'limit': n}
+    if args.explain:
+        print(explain(database, filters, **options))
+        return
+    if args.analyze:
+        # Profiling runs the query itself, in stages, so it bypasses the cache.
+        report = analyze(database, filters, write=lambda results: write_results(results, args), **options)
+        print(report, file=sys.stderr)
+        return
+
+    results = database.query(filters, **options) if cache is None else cache.query(database, filters, **options)
+    write_results(results, args)
+
+
+def write_results(results, args):
+    """Print the results of the `query` subcommand, or write them to its output file.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
     if not args.outfile:
-        # Write the results to stdout, limiting to 10 entries if not specified.
-        for result in limit(results, args.limit or 10):
-            print(result)
+        # Write the results to stdout.
+        if args.format == 'ndjson':
+            write_ndjson(results, sys.stdout)
+        else:
+            for result in results:
+                print(result)
     else:
         # Write the results to a file.
-        if args.outfile.suffix == '.csv':
-            write_to_csv(limit(results, args.limit), args.outfile)
-        elif args.outfile.suffix == '.json':
-            write_to_json(limit(results, args.limit), args.outfile)
+        file_format = output_format(args.outfile)
+        if file_format == '.csv':
+            write_to_csv(results, args.outfile)
+        elif file_format == '.json':
+            write_to_json(results, args.outfile, compact=args.compact)
+        elif file_format == '.ndjson':
+            write_to_ndjson(results, args.outfile)
+        else:
+            print("Please use an output file that ends with `.csv`, `.json` or `.ndjson`, "
+                  "optionally followed by `.gz`, `.bz2` or `.xz`.", file=sys.stderr)
+
+
+def aggregate(database, args):
+    """Perform the `aggregate` subcommand.
+
+    Create a collection of filters with `create_filters` and supply them to the
+    database's `aggregate` method to summarize the matching close approaches in
+    groups. If an output file wasn't given, print the statistics as a table;
+    otherwise, write them to the file as CSV or JSON, by its extension.
+
+    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
+    groups = database.aggregate(filters_from_args(args), group_by=args.group_by)
+
+    if not args.outfile:
+        print(f"{args.group_by:>12} {'count':>8} {'distance (au) min/mean/max':>32} "
+              f"{'velocity (km/s) min/mean/max':>30}")
+        for group in groups:
+            print(f"{str(group.group):>12} {group.count:>8} "
+                  f"{group.distance_min:10.4f} {group.distance_mean:10.4f} {group.distance_max:10.4f} "
+                  f"{group.velocity_min:9.2f} {group.velocity_mean:9.2f} {group.velocity_max:9.2f}")
+    else:
+        file_format = output_format(args.outfile)
+        if file_format == '.csv':
+            write_groups_to_csv(groups, args.group_by, args.outfile)
+        elif file_format == '.json':
+            write_groups_to_json(groups, args.group_by, args.outfile)
         else:
-            print("Please use an output file that ends with `.csv` or `.json`.", file=sys.stderr)
+            print("Please use an output file that ends with `.csv` or `.json`, "
+                  "optionally followed by `.gz`, `.bz2` or `.xz`.", file=sys.stderr)
 
 
 class NEOShell(cmd.Cmd):
@@ -250,7 +469,8 @@ class NEOShell(cmd.Cmd):
              "Type `help` or `?` to list commands and `exit` to exit.\n")
     prompt = '(neo) '
 
-    def __init__(self, database, inspect_parser, query_parser, aggressive=False, **kwargs):
+    def __init__(self, database, inspect_parser, query_parser, aggressive=False, cache=None,
+                 neofile=None, cadfile=None, watch=False, **kwargs):
         """Create a new `NEOShell`.
 
         Creating this object doesn't start the session - for that, use `.cmdloop()`.
@@ -259,6 +479,10 @@ class NEOShell(cmd.Cmd):
         :param inspect_parser: The subparser for the `inspect` subcommand.
         :param query_parser: The subparser for the `query` subcommand.
         :param aggressive: Whether to kill the session whenever a project file is changed.
+        :param cache: The `cache.QueryCache` for query results, or None to create a default one.
+        :param neofile: The path of the NEO data file, for the `reload` command.
+        :param cadfile: The path of the close approach data file, for the `reload` command.
+        :param watch: Whether to reload whenever a data file is modified.
         :param kwargs: A dictionary of excess keyword arguments passed to the superclass.
         """
         super().__init__(**kwargs)
@@ -266,6 +490,11 @@ class NEOShell(cmd.Cmd):
         self.inspect = inspect_parser
         self.query = query_parser
         self.aggressive = aggressive
+        self.cache = QueryCache() if cache is None else cache
+        self.neofile = neofile
+        self.cadfile = cadfile
+        self.watch = watch
+        self._data_versions = self._stat_data_files()
 
     @classmethod
     def parse_arg_with(cls, arg, parser):
@@ -349,8 +578,68 @@ class NEOShell(cmd.Cmd):
         if not args:
             return
 
-        # Run the `inspect` subcommand.
-        query(self.db, args)
+        # Run the `query` subcommand, through the cache of earlier results.
+        query(self.db, args, cache=self.cache)
+
+    def do_explain(self, arg):
+        """Shorthand for `query --explain`: describe how a query would be answered, without running it.
+
+            (neo) explain --start-date 2020-01-01 --max-distance 0.01
+        """
+        self.do_query(f'{arg} --explain')
+
+    def do_cache(self, arg):
+        """Show the query result cache's contents and hit counters, or empty it.
+
+        Repeating a query (even with another `--limit` or `--outfile`) reuses
+        its cached results, and a query that only narrows a cached one filters
+        those results instead of the whole database:
+
+            (neo) cache
+            (neo) cache clear
+        """
+        if arg.strip() == 'clear':
+            self.cache.clear()
+        elif arg.strip():
+            print("Usage: cache [clear]", file=sys.stderr)
+            return
+        print(self.cache.stats())
+
+    def do_reload(self, arg):
+        """Read the data files again, and apply what changed to the loaded data.
+
+        Only the NEOs and close approaches that were added, removed or changed
+        are touched, so the session (and any unchanged query results) carries on:
+
+            (neo) reload
+        """
+        if self.neofile is None or self.cadfile is None:
+            print("This session doesn't know which data files to reload.", file=sys.stderr)
+            return
+        versions = self._stat_data_files()
+        start = time.perf_counter()
+        try:
+            delta = self.db.update(load_neos(self.neofile), load_approaches(self.cadfile))
+        except (OSError, ValueError) as err:
+            print(f"Unable to reload the data files: {err}", file=sys.stderr)
+            return
+        self._data_versions = versions
+        if any(delta):
+            self.cache.clear()
+        print(f"Reloaded in {time.perf_counter() - start:.2f} s: "
+              f"{delta.neos_added} NEOs added, {delta.neos_removed} removed, {delta.neos_changed} changed; "
+              f"{delta.approaches_added} close approaches added, {delta.approaches_removed} removed, "
+              f"{delta.approaches_changed} changed.")
+
+    def _stat_data_files(self):
+        """Return the modification time of each data file, or None for a missing one."""
+        versions = []
+        for path in (self.neofile, self.cadfile):
+            try:
+                versions.append(os.stat(path).st_mtime_ns)
+            except (OSError, TypeError):
+                versions.append(None)
+        return versions
 
     def do_EOF(self, _arg):
         """Exit the interactive session."""
@@ -361,7 +650,10 @@ class NEOShell(cmd.Cmd):
     do_quit = do_EOF
 
     def precmd(self, line):
-        """Watch for changes to the files in this project."""
+        """Watch for changes to the files in this project, and to the data files if asked to."""
+        if self.watch and self._stat_data_files() != self._data_versions:
+            print("The data files have been modified; reloading.", file=sys.stderr)
+            self.do_reload('')
         changed = [f for f in PROJECT_ROOT.glob('*.py') if f.stat().st_mtime > _START]
         if changed:
             print("The following file(s) have been modified since this interactive session began: "
@@ -381,16 +673,35 @@ def main():
     parser, inspect_parser, query_parser = make_parser()
     args = parser.parse_args()
 
-    # Extract data from the data files into structured Python objects.
-    database = NEODatabase(load_neos(args.neofile), load_approaches(args.cadfile))
+    # Extract data from the data files into structured Python objects, or restore them from a snapshot.
+    if args.store:
+        try:
+            database = open_store(args.store, columnar=args.columnar)
+        except StoreError as err:
+            print(err, file=sys.stderr)
+            sys.exit(1)
+    else:
+        database = load_database(args.neofile, args.cadfile,
+                                 use_cache=args.use_cache, rebuild=args.rebuild_cache,
+                                 columnar=args.columnar, parallel=args.parallel,
+                                 workers=args.workers, cad_chunks=args.cad_chunks)
+    if args.build_indexes:
+        database.build_indexes()
 
     # Run the chosen subcommand.
     if args.cmd == 'inspect':
         inspect(database, pdes=args.pdes, name=args.name, verbose=args.verbose)
     elif args.cmd == 'query':
         query(database, args)
+    elif args.cmd == 'aggregate':
+        aggregate(database, args)
+    elif args.cmd == 'convert':
+        write_store(database, args.outdir)
+        print(f"Saved the data set as column files in {args.outdir}.")
     elif args.cmd == 'interactive':
-        NEOShell(database, inspect_parser, query_parser, aggressive=args.aggressive).cmdloop()
+        cache = QueryCache(max_entries=args.cache_size, max_bytes=int(args.cache_memory * (1 << 20)))
+        NEOShell(database, inspect_parser, query_parser, aggressive=args.aggressive, cache=cache,
+                 neofile=args.neofile, cadfile=args.cadfile, watch=args.watch).cmdloop()
 
 
 if __name__ == '__main__':
@@ -15,9 +15,31 @@ The functions that construct these objects use information extracted from the
 data files from NASA, so these objects should be able to handle all of the
 quirks of the data set, such as missing names and unknown diameters.
 
+There are hundreds of thousands of these objects in the full data set, so both
+classes declare `__slots__` rather than carrying a per-instance `__dict__`.
+Likewise, a `CloseApproach` keeps the raw values of its row from the data file
+and only parses its time, distance and velocity when they are first accessed.
+Once a `NEODatabase` has copied those values into its columns, it replaces the
+raw strings with compact parsed values (see `NEODatabase._release_raw_values`).
+
 You'll edit this file in Task 1.
 """
-from helpers import cd_to_datetime, datetime_to_str
+from helpers import (cd_to_datetime, cd_to_minute, cd_to_str, datetime_to_minute, minute_to_datetime,
+                     minute_to_str, datetime_to_str, MISSING_MINUTE)
+
+
+# The value of an unknown diameter, distance or velocity.
+_NAN = float('nan')
+
+
+def _parse_diameter(diameter):
+    """Parse a diameter in kilometers from NEO data: NaN if it's missing (an empty string or None, but not a zero)."""
+    return _NAN if diameter is None or diameter == '' else float(diameter)
+
+
+def _parse_hazardous(hazardous):
+    """Parse the `pha` flag of NEO data: only a value other than 'N' (or empty) marks an NEO as hazardous."""
+    return False if not hazardous or hazardous.upper() == 'N' else True
 
 
 class NearEarthObject:
@@ -32,16 +54,40 @@ class NearEarthObject:
     initialized to an empty collection, but eventually populated in the
     `NEODatabase` constructor.
     """
+    __slots__ = ('designation', 'name', 'diameter', 'hazardous', 'approaches')
+
     def __init__(self, **info):
         """Create a new `NearEarthObject`.
 
         :param info: A dictionary of excess keyword arguments supplied to the constructor.
         """
+        self._load(info['pdes'], info['name'], info['diameter'], info['pha'])
 
-        self.designation = None if not info['pdes'] else info['pdes']
-        self.name = None if not info['name'] else info['name']
-        self.diameter = float('nan') if not info['diameter'] else float(info['diameter'])
-        self.hazardous = False if not info['pha'] or info['pha'].upper() == 'N' else True
+    @classmethod
+    def from_row(cls, designation, name, diameter, hazardous):
+        """Create a new `NearEarthObject` from the values of a row of NEO data.
+
+        This is the positional equivalent of `NearEarthObject(pdes=...,
+        name=..., diameter=..., pha=...)`, for loaders that don't build a
+        dictionary per row. The diameter may also be given as a float.
+
+        :param designation: The primary designation of the NEO (`pdes`).
+        :param name: The IAU name of the NEO, or an empty string (`name`).
+        :param diameter: The diameter in kilometers, or an empty string if unknown (`diameter`).
+        :param hazardous: 'Y' if the NEO is potentially hazardous, otherwise 'N' or empty (`pha`).
+        :return: A new `NearEarthObject`.
+        """
+        neo = cls.__new__(cls)
+        neo._load(designation, name, diameter, hazardous)
+        return neo
+
+    def _load(self, designation, name, diameter, hazardous):
+        """Store the values of a row."""
+        # A missing value is an empty string (or None), but not a zero.
+        self.designation = None if designation is None or designation == '' else designation
+        self.name = None if name is None or name == '' else name
+        self.diameter = _parse_diameter(diameter)
+        self.hazardous = _parse_hazardous(hazardous)
 
         # Create an empty initial collection of linked approaches.
         self.approaches = []
@@ -90,22 +136,101 @@ class CloseApproach:
     A `CloseApproach` also maintains a reference to its `NearEarthObject` -
     initally, this information (the NEO's primary designation) is saved in a
     private attribute, but the referenced NEO is eventually replaced in the
-    `NEODatabase` constructor.
+    `NEODatabase` constructor, which then releases the designation.
     """
+    __slots__ = ('_designation', '_time', '_distance', '_velocity', 'neo')
+
     def __init__(self, **info):
         """Create a new `CloseApproach`.
 
         :param info: A dictionary of excess keyword arguments supplied to the constructor.
         """
+        self._load(info['des'], info['cd'], info['dist'], info['v_rel'])
 
-        self._designation = None if not info['des'] else info['des']
-        self.time = None if not info['cd'] else cd_to_datetime(info['cd'])
-        self.distance = float('nan') if not info['dist'] else float(info['dist'])
-        self.velocity = float('nan') if not info['v_rel'] else float(info['v_rel'])
+    @classmethod
+    def from_row(cls, designation, calendar_date, distance, velocity):
+        """Create a new `CloseApproach` from the raw values of a row of close approach data.
+
+        This is the positional equivalent of `CloseApproach(des=..., cd=...,
+        dist=..., v_rel=...)`, for loaders that don't build a dictionary per row.
+        The time may also be given as whole minutes since `helpers.EPOCH`, and
+        the distance and velocity as floats.
+
+        :param designation: The primary designation of the approaching NEO (`des`).
+        :param calendar_date: The time of closest approach, in YYYY-bb-DD hh:mm format (`cd`).
+        :param distance: The nominal approach distance in au, as a string (`dist`).
+        :param velocity: The relative approach velocity in km/s, as a string (`v_rel`).
+        :return: A new `CloseApproach`.
+        """
+        approach = cls.__new__(cls)
+        approach._load(designation, calendar_date, distance, velocity)
+        return approach
+
+    def _load(self, designation, calendar_date, distance, velocity):
+        """Store the raw values of a row, to be parsed on first access."""
+        # A missing value is an empty string (or None), but not a zero.
+        self._designation = None if designation is None or designation == '' else designation
+        self._time = None if calendar_date is None or calendar_date == '' else calendar_date
+        self._distance = _NAN if distance is None or distance == '' else distance
+        self._velocity = _NAN if velocity is None or velocity == '' else velocity
 
         # Create an attribute for the referenced NEO, originally None.
         self.neo = None
 
+    @property
+    def time(self):
+        """Return the time of closest approach as a naive `datetime`, parsed on first access."""
+        time = self._time
+        if time.__class__ is str:
+            time = self._time = cd_to_datetime(time)
+        elif time.__class__ is int:
+            time = self._time = None if time == MISSING_MINUTE else minute_to_datetime(time)
+        return time
+
+    @time.setter
+    def time(self, value):
+        self._time = value
+
+    @property
+    def minute(self):
+        """Return the time of closest approach in whole minutes since `helpers.EPOCH`.
+
+        Unlike `time`, this doesn't parse (or keep) a `datetime` if the time
+        hasn't been accessed yet. An unknown time is `helpers.MISSING_MINUTE`.
+        """
+        time = self._time
+        if time.__class__ is str:
+            return cd_to_minute(time)
+        if time.__class__ is int:
+            return time
+        if time is None:
+            return MISSING_MINUTE
+        return datetime_to_minute(time)
+
+    @property
+    def distance(self):
+        """Return the nominal approach distance in astronomical units, parsed on first access."""
+        distance = self._distance
+        if distance.__class__ is str:
+            distance = self._distance = float(distance)
+        return distance
+
+    @distance.setter
+    def distance(self, value):
+        self._distance = value
+
+    @property
+    def velocity(self):
+        """Return the relative approach velocity in kilometers per second, parsed on first access."""
+        velocity = self._velocity
+        if velocity.__class__ is str:
+            velocity = self._velocity = float(velocity)
+        return velocity
+
+    @velocity.setter
+    def velocity(self, value):
+        self._velocity = value
+
     @property
     def time_str(self):
         """Return a formatted representation of this `CloseApproach`'s approach time.
@@ -117,9 +242,18 @@ class CloseApproach:
 
         The `datetime_to_str` method converts a `datetime` object to a
         formatted string that can be used in human-readable representations and
-        in serialization to CSV and JSON files.
+        in serialization to CSV and JSON files. A time that hasn't been parsed
+        yet is formatted directly, without building a `datetime`. An unknown
+        time is formatted as an empty string.
         """
-        return datetime_to_str(self.time)
+        time = self._time
+        if time.__class__ is str:
+            return cd_to_str(time)
+        if time.__class__ is int:
+            return '' if time == MISSING_MINUTE else minute_to_str(time)
+        if time is None:
+            return ''
+        return datetime_to_str(time)
 
     def __str__(self):
         """Return `str(self)`."""
@@ -0,0 +1,202 @@
+"""Parse the NEO and close approach data files concurrently, on a pool of processes.
+
+The two data files are independent until `NEODatabase` links them, so
+`load_parallel` parses them at the same time in separate worker processes.
+The close approach file, which is by far the larger of the two, can also be
+split into several chunks of rows, each parsed by its own worker.
+
+Workers don't send back `NearEarthObject`s or `CloseApproach`es, which would be
+pickled one attribute at a time. Each returns compact columns instead - lists of
+strings and `array.array`s of numbers, which pickle as flat buffers - and the
+main process builds the objects from these and links them.
+
+A chunk boundary is placed where one row of the `data` array ends and the next
+begins (`],[`), which relies on the rows being flat arrays of strings and
+nulls, as NASA's API emits them. If the file can't be split this way (say, if
+the `fields` header is missing), it is parsed by a single worker instead.
+"""
+import array
+import concurrent.futures
+import json
+import mmap
+import re
+
+from extract import _WHITESPACE, _iter_cad_rows, _iter_neo_rows
+from helpers import cd_to_minute, MISSING_MINUTE
+from models import NearEarthObject, CloseApproach, _parse_diameter, _parse_hazardous
+
+
+# The fields of interest in the close approach file.
+CAD_FIELDS = ('des', 'cd', 'dist', 'v_rel')
+
+_NAN = float('nan')
+
+# Locate the parts of a close approach file needed to split its rows into chunks.
+_FIELDS_PATTERN = re.compile(rb'"fields"\s*:\s*(\[[^\]]*\])')
+_DATA_PATTERN = re.compile(rb'"data"\s*:\s*\[\s*')
+_ROW_BOUNDARY = re.compile(rb'\]\s*,\s*\[')
+
+
+def read_neo_columns(neo_csv_path):
+    """Read the columns of interest of a NEO CSV file.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :return: A tuple of the lists of designations and names, an `array.array('d')`
+             of diameters (NaN if unknown), and an `array.array('b')` of hazardous flags.
+    """
+    designations, names = [], []
+    diameters, hazardous = array.array('d'), array.array('b')
+    with open(neo_csv_path, 'r', newline='') as neo_file_obj:
+        # The same columns and missing-value rules as `extract.load_neos`.
+        for pdes, name, diameter, pha in _iter_neo_rows(neo_file_obj):
+            designations.append(pdes)
+            names.append(name)
+            diameters.append(_parse_diameter(diameter))
+            hazardous.append(_parse_hazardous(pha))
+    return designations, names, diameters, hazardous
+
+
+def _approach_columns(rows, positions):
+    """Collect the columns of interest from rows of close approach data."""
+    des, cd, dist, v_rel = positions
+    designations = []
+    times, distances, velocities = array.array('q'), array.array('d'), array.array('d')
+    for row in rows:
+        designations.append(row[des])
+        # A missing value is an empty string (or None), but not a zero.
+        time, distance, velocity = row[cd], row[dist], row[v_rel]
+        times.append(MISSING_MINUTE if time is None or time == '' else cd_to_minute(time))
+        distances.append(_NAN if distance is None or distance == '' else float(distance))
+        velocities.append(_NAN if velocity is None or velocity == '' else float(velocity))
+    return designations, times, distances, velocities
+
+
+def read_cad_columns(cad_json_path):
+    """Read the columns of interest of a whole close approach JSON file.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :return: A tuple of the list of designations, an `array.array('q')` of times (in
+             minutes since `helpers.EPOCH`), and `array.array('d')`s of distances and velocities.
+    """
+    with open(cad_json_path, 'r') as cad_file_obj:
+        rows = _iter_cad_rows(cad_file_obj)
+        first = next(rows, None)
+        if first is None:
+            return [], array.array('q'), array.array('d'), array.array('d')
+
+        cad_fields, entry = first
+        positions = [cad_fields.index(field) for field in CAD_FIELDS]
+        return _approach_columns(_chain_first(entry, rows), positions)
+
+
+def _chain_first(entry, rows):
+    """Generate `entry`, and then the row of each (fields, row) pair in `rows`."""
+    yield entry
+    for _, row in rows:
+        yield row
+
+
+def read_cad_chunk(cad_json_path, start, end, positions):
+    """Read the columns of interest of a chunk of rows of a close approach JSON file.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param start: The byte offset at which the first row of the chunk starts.
+    :param end: The byte offset at which the chunk ends (the start of the next chunk's first row).
+    :param positions: The positions of the `des`, `cd`, `dist` and `v_rel` fields in each row.
+    :return: The same columns as `read_cad_columns`, for the rows of this chunk.
+    """
+    with open(cad_json_path, 'rb') as cad_file_obj:
+        cad_file_obj.seek(start)
+        text = cad_file_obj.read(end - start).decode('utf-8')
+    return _approach_columns(_iter_chunk_rows(text), positions)
+
+
+def _iter_chunk_rows(text):
+    """Generate the rows of a chunk of the `data` array, up to its end or the array's closing bracket."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        pos = _WHITESPACE.match(text, pos).end()
+        if pos >= len(text) or text[pos] == ']':
+            return
+        row, pos = decoder.raw_decode(text, pos)
+        yield row
+        pos = _WHITESPACE.match(text, pos).end()
+        if pos < len(text) and text[pos] == ',':
+            pos += 1
+
+
+def split_cad_file(cad_json_path, chunks):
+    """Find where to split the rows of a close approach JSON file into chunks.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param chunks: The number of chunks wanted.
+    :return: A tuple of the positions of the fields of interest in each row, and a
+             list of `(start, end)` byte ranges - or None if the file can't be split.
+    """
+    with open(cad_json_path, 'rb') as cad_file_obj:
+        try:
+            contents = mmap.mmap(cad_file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped.
+            return None
+
+    with contents:
+        fields = _FIELDS_PATTERN.search(contents)
+        data = _DATA_PATTERN.search(contents)
+        if fields is None or data is None:
+            return None
+        try:
+            cad_fields = json.loads(fields.group(1))
+            positions = [cad_fields.index(field) for field in CAD_FIELDS]
+        except ValueError:
+            return None
+
+        # The last chunk runs to the end of the file; its worker stops at the closing bracket of `data`.
+        start, size = data.end(), len(contents)
+        step = max((size - start) // chunks, 1)
+        starts = [start]
+        for nominal in range(start + step, size, step):
+            if len(starts) == chunks:
+                break
+            if nominal <= starts[-1]:
+                # A long row already carried the previous boundary past this one.
+                continue
+            boundary = _ROW_BOUNDARY.search(contents, nominal)
+            if boundary is None:
+                break
+            starts.append(boundary.end() - 1)
+        ends = starts[1:] + [size]
+    return positions, list(zip(starts, ends))
+
+
+def load_parallel(neo_csv_path, cad_json_path, workers=None, cad_chunks=1):
+    """Parse both data files on a pool of processes, and build their objects on this one.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param workers: The number of worker processes (by default, the number of CPUs).
+    :param cad_chunks: The number of chunks of rows to split the close approach file into.
+    :return: A tuple of a list of `NearEarthObject`s and a list of `CloseApproach`es, not yet linked.
+    """
+    split = split_cad_file(cad_json_path, cad_chunks) if cad_chunks > 1 else None
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        neo_job = pool.submit(read_neo_columns, neo_csv_path)
+        if split is None:
+            cad_jobs = [pool.submit(read_cad_columns, cad_json_path)]
+        else:
+            positions, ranges = split
+            cad_jobs = [pool.submit(read_cad_chunk, cad_json_path, start, end, positions)
+                        for start, end in ranges]
+
+        designations, names, diameters, hazardous = neo_job.result()
+        neos = [NearEarthObject.from_row(designation, name, diameter, 'Y' if flag else 'N')
+                for designation, name, diameter, flag in zip(designations, names, diameters, hazardous)]
+
+        approaches = []
+        from_row = CloseApproach.from_row
+        for job in cad_jobs:
+            approaches.extend(map(from_row, *job.result()))
+
+    return neos, approaches
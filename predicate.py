@@ -0,0 +1,84 @@
+"""Compile the column tests of a query into one specialized function.
+
+`columnar.ApproachColumns.bind` reduces each filter to an `(op, column,
+reference)` triple. Checking a row against these one at a time costs a Python
+loop over the triples and an `operator` call per criterion. Instead,
+`compile_check` generates the source of a function that reads every column by
+position and compares it inline - `c0[index] <= r0 and c1[index] >= r1 and
+...` - so that each criterion costs one comparison, and the `and` stops at the
+first that fails.
+
+The generated code depends only on the query's shape: the comparator of each
+test, in order, and whether any filter has to be called on the `CloseApproach`
+itself. Columns, reference values and those remaining filters are passed in as
+arguments. So every query of the same shape - in one command, or across the
+commands of an interactive session - reuses the same compiled function, and
+only the first pays for generating it.
+"""
+import functools
+import operator
+
+
+# The infix symbol of each comparator that can be inlined; any other is called.
+_SYMBOLS = {
+    operator.eq: '==',
+    operator.ne: '!=',
+    operator.lt: '<',
+    operator.le: '<=',
+    operator.gt: '>',
+    operator.ge: '>=',
+}
+
+
+def check_rows(candidates, tests, residual, approaches):
+    """Generate the candidate positions that pass every column test and every remaining filter.
+
+    :param candidates: An iterable of approach positions, in the order to generate them.
+    :param tests: A list of `(op, column, reference)` triples, in the order to check them.
+    :param residual: A list of filters to call on the `CloseApproach` of each position that passes the tests.
+    :param approaches: The sequence of `CloseApproach`es that the positions refer to.
+    :return: A stream of the positions that pass.
+    """
+    check = compile_check(tuple(op for op, _, _ in tests), bool(residual))
+    ops, columns, references = zip(*tests) if tests else ((), (), ())
+    return check(candidates, columns, references, ops, residual, approaches)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_check(ops, residual):
+    """Compile a generator function that checks rows against tests with the given comparators.
+
+    The compiled function takes the candidate positions, then the columns,
+    reference values and comparators of the tests (each a sequence in test
+    order), then the remaining filters and the sequence of `CloseApproach`es.
+
+    :param ops: A tuple of the comparator of each test, in the order to check them.
+    :param residual: Whether there are filters to call on the `CloseApproach` of each row that passes the tests.
+    :return: The compiled generator function.
+    """
+    conditions = []
+    for position, op in enumerate(ops):
+        symbol = _SYMBOLS.get(op)
+        if symbol is None:
+            conditions.append(f"o{position}(c{position}[index], r{position})")
+        else:
+            conditions.append(f"c{position}[index] {symbol} r{position}")
+
+    lines = ["def check(candidates, columns, references, ops, residual, approaches):"]
+    if ops:
+        names = range(len(ops))
+        lines.append("    " + ''.join(f"c{position}, " for position in names) + "= columns")
+        lines.append("    " + ''.join(f"r{position}, " for position in names) + "= references")
+        lines.append("    " + ''.join(f"o{position}, " for position in names) + "= ops")
+    lines.append("    for index in candidates:")
+    lines.append(f"        if {' and '.join(conditions) or 'True'}:")
+    if residual:
+        lines.append("            approach = approaches[index]")
+        lines.append("            if all(f(approach) for f in residual):")
+        lines.append("                yield index")
+    else:
+        lines.append("            yield index")
+
+    namespace = {}
+    exec(compile('\n'.join(lines), f"<check {len(ops)} tests>", 'exec'), namespace)
+    return namespace['check']
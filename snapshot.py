@@ -0,0 +1,207 @@
+"""Cache a linked `NEODatabase` in a binary snapshot file next to the data.
+
+Parsing `neos.csv` and `cad.json` and linking the results takes several
+seconds, and happens every time `main.py` runs. The `load_database` function
+instead looks for a snapshot of the linked data set saved by a previous run.
+If the snapshot is still valid for the current data files, the database is
+restored from it without parsing either file; otherwise, the data files are
+loaded as usual and a fresh snapshot is written for next time.
+
+A snapshot holds the same data as a column store (see `store`): the typed
+columns of `columnar.ApproachColumns`, the time index and the approaches of each
+NEO, and the NEOs' designations and names as UTF-8 string tables. These are
+written as raw, native-endian arrays after a one-line JSON header, which records
+each array's item type and size, the byte order, and the approaches that aren't
+linked to any NEO. Nothing in the file is ever executed or unpickled, so a
+tampered snapshot can at worst be rejected or restore wrong data. Restoring
+wraps the arrays without copying them, like `store.open_store`, and creates each
+`CloseApproach` only when it is first looked up.
+
+A snapshot is keyed on the size, modification time and content hash of each data
+file: a snapshot is valid if every file has the same size, and either the same
+modification time or the same content hash.
+
+The snapshot for a close approach file `cad.json` is saved as
+`cad.json.snapshot` in the same folder.
+"""
+import hashlib
+import json
+import os
+import pathlib
+import sys
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from parallel import load_parallel
+from store import COLUMNS, STRING_TABLES, column_data, database_from_column_data
+
+
+# Identifies a snapshot file, and the version of its layout.
+SNAPSHOT_MAGIC = b'NEODB-SNAPSHOT\n'
+SNAPSHOT_VERSION = 2
+
+# Every array in a snapshot starts at a multiple of this many bytes, so that it can be read in place.
+ALIGNMENT = 8
+
+
+def snapshot_path(cad_json_path):
+    """Return the path of the snapshot file for a close approach data file.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :return: The path to the snapshot, next to that file.
+    """
+    cad_json_path = pathlib.Path(cad_json_path)
+    return cad_json_path.with_name(cad_json_path.name + '.snapshot')
+
+
+def _file_hash(path):
+    """Return the SHA-256 digest of a file's contents, as a hex string."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file_obj:
+        for chunk in iter(lambda: file_obj.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_key(path):
+    """Return the (size, modification time, content hash) key of a data file.
+
+    :param path: A path to a data file.
+    :return: A dictionary with the `size`, `mtime_ns` and `sha256` of the file.
+    """
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': _file_hash(path)}
+
+
+def _is_current(key, path):
+    """Return whether a stored file key still describes the file at `path`."""
+    stat = os.stat(path)
+    if stat.st_size != key['size']:
+        return False
+    return stat.st_mtime_ns == key['mtime_ns'] or _file_hash(path) == key['sha256']
+
+
+def _padding(offset):
+    """Return the number of bytes that pad an offset up to the next multiple of `ALIGNMENT`."""
+    return -offset % ALIGNMENT
+
+
+def save_snapshot(database, path, source_paths):
+    """Write a snapshot of a linked `NEODatabase` to a file.
+
+    The snapshot is written to a temporary file first and then moved into
+    place, so that a concurrent reader never sees a partial snapshot.
+
+    :param database: The `NEODatabase` to save.
+    :param path: Where to save the snapshot.
+    :param source_paths: The data files the database was loaded from, to key the snapshot on.
+    """
+    data, tables, unlinked = column_data(database)
+    sections = [(name, typecode, data[name].tobytes()) for name, typecode in COLUMNS.items()]
+    sections.extend((name, 'B', tables[name]) for name in STRING_TABLES)
+
+    header = {
+        'version': SNAPSHOT_VERSION,
+        'byteorder': sys.byteorder,
+        'sources': [_file_key(source) for source in source_paths],
+        'neos': len(database._neos),
+        'unlinked': {str(index): designation for index, designation in unlinked.items()},
+        'sections': [[name, typecode, len(blob)] for name, typecode, blob in sections],
+    }
+    # `json.dumps` escapes any newline inside a string, so the header is exactly one line.
+    header = SNAPSHOT_MAGIC + json.dumps(header).encode('utf-8') + b'\n'
+
+    path = pathlib.Path(path)
+    partial = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(partial, 'wb') as snapshot_file:
+            snapshot_file.write(header + bytes(_padding(len(header))))
+            for _, _, blob in sections:
+                snapshot_file.write(blob + bytes(_padding(len(blob))))
+        os.replace(partial, path)
+    finally:
+        if partial.exists():
+            partial.unlink()
+
+
+def load_snapshot(path, source_paths, columnar=False):
+    """Restore a `NEODatabase` from a snapshot file, if it is valid for the given data files.
+
+    :param path: Where the snapshot was saved.
+    :param source_paths: The data files the database should reflect.
+    :param columnar: Whether the restored database should use the vectorized query engine.
+    :return: The restored `NEODatabase`, or None if there is no valid snapshot.
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            if snapshot_file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return None
+            header = json.loads(snapshot_file.readline())
+            if (header.get('version') != SNAPSHOT_VERSION or header.get('byteorder') != sys.byteorder
+                    or len(header['sources']) != len(source_paths)):
+                return None
+            if not all(_is_current(key, source) for key, source in zip(header['sources'], source_paths)):
+                return None
+            # The arrays start after the header line, padded to `ALIGNMENT`.
+            snapshot_file.seek(_padding(snapshot_file.tell()), os.SEEK_CUR)
+            contents = memoryview(snapshot_file.read())
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+    offset = 0
+    data, tables = {}, {}
+    try:
+        for name, typecode, size in header['sections']:
+            section = contents[offset:offset + size]
+            if len(section) != size:
+                return None
+            if name in STRING_TABLES:
+                tables[name] = bytes(section)
+            elif COLUMNS.get(name) == typecode:
+                data[name] = section.cast(typecode)
+            else:
+                return None
+            offset += size + _padding(size)
+        if set(data) != set(COLUMNS) or set(tables) != set(STRING_TABLES):
+            return None
+        unlinked = {int(index): designation for index, designation in header['unlinked'].items()}
+        return database_from_column_data(data, tables, header['neos'], unlinked, columnar=columnar)
+    except (ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def load_database(neo_csv_path, cad_json_path, use_cache=True, rebuild=False, columnar=False,
+                  parallel=False, workers=None, cad_chunks=1):
+    """Build a `NEODatabase` from data files, through a snapshot cache.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param use_cache: Whether to read and write the snapshot at all.
+    :param rebuild: Whether to ignore any existing snapshot, and replace it with a fresh one.
+    :param columnar: Whether the database should use the vectorized query engine.
+    :param parallel: Whether to parse the data files concurrently, on a pool of processes.
+    :param workers: The number of worker processes, if parsing in parallel (by default, the number of CPUs).
+    :param cad_chunks: The number of chunks to split the close approach file into, if parsing in parallel.
+    :return: A `NEODatabase` of the data in the given files.
+    """
+    source_paths = [neo_csv_path, cad_json_path]
+    path = snapshot_path(cad_json_path)
+
+    if use_cache and not rebuild:
+        database = load_snapshot(path, source_paths, columnar=columnar)
+        if database is not None:
+            return database
+
+    if parallel:
+        neos, approaches = load_parallel(neo_csv_path, cad_json_path, workers=workers, cad_chunks=cad_chunks)
+    else:
+        neos, approaches = load_neos(neo_csv_path), load_approaches(cad_json_path)
+    database = NEODatabase(neos, approaches, columnar=columnar)
+
+    if use_cache:
+        try:
+            save_snapshot(database, path, source_paths)
+        except OSError:
+            # A snapshot is only an optimization - for example, the data folder may be read-only.
+            pass
+    return database
@@ -0,0 +1,290 @@
+"""Save a linked data set as memory-mapped column files, and open it without parsing.
+
+The `write_store` function converts a `NEODatabase` into a folder of
+fixed-width, native-endian binary column files:
+
+- `approach_time.bin` (int64): minutes since `helpers.EPOCH`, per approach.
+- `approach_distance.bin` and `approach_velocity.bin` (float64), per approach.
+- `approach_neo.bin` (int32): the position of each approach's NEO.
+- `neo_diameter.bin` (float64) and `neo_hazardous.bin` (int8), per NEO.
+- `neo_designation.bin` and `neo_name.bin`: UTF-8 string tables, with the
+  (int64) offsets of each NEO's string in `neo_designation_offsets.bin` and
+  `neo_name_offsets.bin`.
+- `time_order.bin`, `day.bin` and `day_start.bin` (int64): the time index of
+  `NEODatabase`, so that it needn't be rebuilt.
+- `neo_order.bin` and `neo_start.bin` (int64): the approaches of each NEO.
+
+A `manifest.json` records the item type of each column, the counts and the
+byte order.
+
+The `open_store` function maps these files into memory with `mmap` and wraps
+them, without copying, in a `columnar.ApproachColumns`. Only the NEOs (a small
+fraction of the data) are built as objects up front; each `CloseApproach` is
+created the first time it is looked up. Since the files are mapped read-only,
+concurrent `main.py` processes opening the same store share the operating
+system's page cache.
+"""
+import array
+import bisect
+import collections.abc
+import json
+import mmap
+import pathlib
+import sys
+
+from columnar import ApproachColumns
+from database import NEODatabase
+from models import NearEarthObject, CloseApproach
+
+
+STORE_VERSION = 1
+MANIFEST = 'manifest.json'
+
+# The `array` item type of each column file.
+COLUMNS = {
+    'approach_time': 'q',
+    'approach_distance': 'd',
+    'approach_velocity': 'd',
+    'approach_neo': 'i',
+    'neo_diameter': 'd',
+    'neo_hazardous': 'b',
+    'neo_designation_offsets': 'q',
+    'neo_name_offsets': 'q',
+    'time_order': 'q',
+    'day': 'q',
+    'day_start': 'q',
+    'neo_order': 'q',
+    'neo_start': 'q',
+}
+STRING_TABLES = ('neo_designation', 'neo_name')
+
+
+class StoreError(Exception):
+    """A column store is missing, incomplete, or incompatible with this machine."""
+
+
+def _string_table(strings):
+    """Encode strings into one UTF-8 blob, and the offset of each string in it.
+
+    :param strings: A sequence of strings (or None, stored as an empty string).
+    :return: A tuple of the blob and an `array.array('q')` of len(strings) + 1 offsets.
+    """
+    encoded = [(string or '').encode('utf-8') for string in strings]
+    offsets = array.array('q', [0])
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+    return b''.join(encoded), offsets
+
+
+def column_data(database):
+    """Gather the columns, string tables and unlinked approaches of a linked `NEODatabase`.
+
+    :param database: The `NEODatabase` to convert.
+    :return: A tuple of a dictionary mapping each of `COLUMNS` to an `array.array` of its item
+             type, a dictionary mapping each of `STRING_TABLES` to its UTF-8 blob, and a
+             dictionary mapping the positions of unlinked approaches to their designations.
+    """
+    neos = database._neos
+    columns = database._columns
+    neo_count = len(neos)
+
+    neo_order = array.array('q', sorted(range(len(columns)), key=columns.neo_index.__getitem__))
+    sorted_neos = [columns.neo_index[index] for index in neo_order]
+    neo_start = array.array('q', [bisect.bisect_left(sorted_neos, position)
+                                  for position in range(neo_count + 1)])
+    neo_start.append(len(neo_order))
+
+    designations, designation_offsets = _string_table([neo.designation for neo in neos])
+    names, name_offsets = _string_table([neo.name for neo in neos])
+    time_order, days, day_starts = database._time_order, database._days, database._day_starts
+
+    data = {
+        'approach_time': columns.time,
+        'approach_distance': columns.distance,
+        'approach_velocity': columns.velocity,
+        'approach_neo': columns.neo_index,
+        'neo_diameter': columns.neo_diameter,
+        'neo_hazardous': columns.neo_hazardous,
+        'neo_designation_offsets': designation_offsets,
+        'neo_name_offsets': name_offsets,
+        'time_order': time_order,
+        'day': days,
+        'day_start': day_starts,
+        'neo_order': neo_order,
+        'neo_start': neo_start,
+    }
+    data = {name: array.array(typecode, data[name]) for name, typecode in COLUMNS.items()}
+    tables = dict(zip(STRING_TABLES, (designations, names)))
+    unlinked = {index: database._approaches[index]._designation
+                for index, neo_index in enumerate(columns.neo_index) if neo_index == neo_count}
+    return data, tables, unlinked
+
+
+def write_store(database, directory):
+    """Write a linked `NEODatabase` as a folder of column files.
+
+    :param database: The `NEODatabase` to convert.
+    :param directory: The folder in which to save the column files; it is created if needed.
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    data, tables, unlinked = column_data(database)
+    for name, column in data.items():
+        with open(directory / f'{name}.bin', 'wb') as column_file:
+            column.tofile(column_file)
+    for name, blob in tables.items():
+        (directory / f'{name}.bin').write_bytes(blob)
+
+    manifest = {
+        'version': STORE_VERSION,
+        'byteorder': sys.byteorder,
+        'approaches': len(database._columns),
+        'neos': len(database._neos),
+        'columns': COLUMNS,
+        'unlinked': {str(index): designation for index, designation in unlinked.items()},
+    }
+    # The manifest is written last, so that a store without one is recognizably incomplete.
+    (directory / MANIFEST).write_text(json.dumps(manifest, indent=2))
+
+
+def _map_column(path, typecode):
+    """Map a column file into memory, read-only, as a typed `memoryview`."""
+    with open(path, 'rb') as column_file:
+        try:
+            mapped = mmap.mmap(column_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file can't be mapped.
+            return memoryview(array.array(typecode))
+    return memoryview(mapped).cast(typecode)
+
+
+class ApproachViews(collections.abc.Sequence):
+    """The close approaches of a column store, each created the first time it is looked up.
+
+    Each `CloseApproach` is created from its row of the columns, linked to its
+    NEO, and kept, so that looking up the same position twice gives the same
+    object.
+    """
+    def __init__(self, columns, neos, unlinked):
+        """Create a new `ApproachViews`.
+
+        :param columns: The `columnar.ApproachColumns` of the store.
+        :param neos: The sequence of `NearEarthObject`s of the store.
+        :param unlinked: A dictionary mapping the positions of unlinked approaches to their designations.
+        """
+        self._columns = columns
+        self._neos = neos
+        self._unlinked = unlinked
+        self._created = {}
+
+    def __len__(self):
+        """Return the number of close approaches."""
+        return len(self._columns)
+
+    def __getitem__(self, index):
+        """Return the `CloseApproach` at a position (or a list of them, for a slice)."""
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+
+        approach = self._created.get(index)
+        if approach is None:
+            columns = self._columns
+            neo_index = columns.neo_index[index]
+            if neo_index < len(self._neos):
+                approach = CloseApproach.from_row(None, columns.time[index],
+                                                  columns.distance[index], columns.velocity[index])
+                approach.neo = self._neos[neo_index]
+            else:
+                approach = CloseApproach.from_row(self._unlinked[index], columns.time[index],
+                                                  columns.distance[index], columns.velocity[index])
+            self._created[index] = approach
+        return approach
+
+
+class NEOApproaches(collections.abc.Sequence):
+    """The close approaches of one NEO in a column store, in file order."""
+    def __init__(self, views, positions):
+        """Create a new `NEOApproaches`.
+
+        :param views: The `ApproachViews` of the store.
+        :param positions: The positions of this NEO's approaches in `views`.
+        """
+        self._views = views
+        self._positions = positions
+
+    def __len__(self):
+        """Return the number of close approaches of this NEO."""
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        """Return the `CloseApproach` at a position (or a list of them, for a slice)."""
+        if isinstance(index, slice):
+            return [self._views[position] for position in self._positions[index]]
+        return self._views[self._positions[index]]
+
+
+def open_store(directory, columnar=False):
+    """Open a folder of column files, written by `write_store`, as a `NEODatabase`.
+
+    :param directory: The folder holding the column files.
+    :param columnar: Whether to answer queries with the vectorized, NumPy-backed engine.
+    :return: A `NEODatabase` backed by memory-mapped columns.
+    :raises StoreError: If the store is missing, incomplete, or was written on an incompatible machine.
+    """
+    directory = pathlib.Path(directory)
+    try:
+        manifest = json.loads((directory / MANIFEST).read_text())
+    except (OSError, ValueError) as err:
+        raise StoreError(f"{directory} is not a complete column store.") from err
+    if manifest.get('version') != STORE_VERSION or manifest.get('byteorder') != sys.byteorder:
+        raise StoreError(f"{directory} was written by an incompatible version or machine.")
+
+    try:
+        mapped = {name: _map_column(directory / f'{name}.bin', typecode)
+                  for name, typecode in manifest['columns'].items()}
+        tables = {name: (directory / f'{name}.bin').read_bytes() for name in STRING_TABLES}
+    except OSError as err:
+        raise StoreError(f"{directory} is not a complete column store.") from err
+
+    unlinked = {int(index): designation for index, designation in manifest['unlinked'].items()}
+    return database_from_column_data(mapped, tables, manifest['neos'], unlinked, columnar=columnar)
+
+
+def database_from_column_data(data, tables, neo_count, unlinked, columnar=False):
+    """Create a `NEODatabase` around columns gathered by `column_data`, without copying them.
+
+    Only the NEOs are built as objects up front; each `CloseApproach` is
+    created the first time it is looked up (see `ApproachViews`).
+
+    :param data: A dictionary mapping each of `COLUMNS` to an indexable buffer of its item type.
+    :param tables: A dictionary mapping each of `STRING_TABLES` to its UTF-8 blob, as `bytes`.
+    :param neo_count: The number of NEOs.
+    :param unlinked: A dictionary mapping the positions of unlinked approaches to their designations.
+    :param columnar: Whether to answer queries with the vectorized, NumPy-backed engine.
+    :return: A `NEODatabase` of the data.
+    """
+    neos = []
+    designations, designation_offsets = tables['neo_designation'], data['neo_designation_offsets']
+    names, name_offsets = tables['neo_name'], data['neo_name_offsets']
+    for position in range(neo_count):
+        designation = designations[designation_offsets[position]:designation_offsets[position + 1]]
+        name = names[name_offsets[position]:name_offsets[position + 1]]
+        neos.append(NearEarthObject.from_row(designation.decode('utf-8'), name.decode('utf-8'),
+                                             data['neo_diameter'][position],
+                                             'Y' if data['neo_hazardous'][position] else 'N'))
+
+    columns = ApproachColumns.from_buffers(
+        data['approach_time'], data['approach_distance'], data['approach_velocity'],
+        data['approach_neo'], data['neo_diameter'], data['neo_hazardous'],
+    )
+    views = ApproachViews(columns, neos, unlinked)
+
+    neo_order, neo_start = data['neo_order'], data['neo_start']
+    for position, neo in enumerate(neos):
+        neo.approaches = NEOApproaches(views, neo_order[neo_start[position]:neo_start[position + 1]])
+
+    time_index = (data['time_order'], data['day'], data['day_start'])
+    return NEODatabase.from_columns(neos, views, columns, time_index=time_index, columnar=columnar)
@@ -0,0 +1,16 @@
+"""Helpers shared by the tests that compare the query results of two databases."""
+import math
+
+from filters import create_filters
+
+
+def describe(database, **criteria):
+    """Summarize the results of a query, for comparison between databases.
+
+    Unlinked approaches summarize their NEO's attributes as None, and unknown
+    diameters (NaN, which never equals itself) as None too.
+    """
+    return [(approach.time, approach.distance, approach.velocity, approach.neo and approach.neo.designation,
+             approach.neo and approach.neo.name, approach.neo and approach.neo.hazardous,
+             approach.neo and (None if math.isnan(approach.neo.diameter) else approach.neo.diameter))
+            for approach in database.query(create_filters(**criteria))]
@@ -0,0 +1,150 @@
+"""Check that `NEODatabase.aggregate` summarizes close approaches in groups correctly.
+
+Each grouping is compared against statistics computed directly from the
+`CloseApproach` objects that `query` produces, on both the NumPy-backed and the
+pure-Python paths.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_aggregate
+"""
+import collections
+import datetime
+import json
+import math
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+from aggregate import GROUP_KEYS
+from columnar import np
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from models import CloseApproach, NearEarthObject
+from write import write_groups_to_csv, write_groups_to_json
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+# Criteria that select everything, a date range and a NEO attribute, or nothing at all.
+CRITERIA = (
+    {},
+    {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 6, 30), 'distance_max': 0.2},
+    {'hazardous': True},
+    {'distance_min': 1, 'distance_max': 0},
+)
+
+
+def group_of(approach, group_by):
+    """Return the group label of a close approach."""
+    if group_by == 'year':
+        return approach.time.year
+    if group_by == 'month':
+        return approach.time.strftime('%Y-%m')
+    if group_by == 'neo':
+        return approach.neo.designation
+    return approach.neo.hazardous
+
+
+class TestAggregate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def expected(self, criteria, group_by):
+        groups = collections.defaultdict(list)
+        for approach in self.db.query(create_filters(**criteria)):
+            groups[group_of(approach, group_by)].append(approach)
+        return groups
+
+    def assertGroupsMatch(self, db):
+        for criteria in CRITERIA:
+            for group_by in GROUP_KEYS:
+                with self.subTest(criteria=criteria, group_by=group_by):
+                    expected = self.expected(criteria, group_by)
+                    received = db.aggregate(create_filters(**criteria), group_by=group_by)
+                    self.assertEqual(sorted(expected, key=str), sorted((group.group for group in received), key=str))
+                    for group in received:
+                        approaches = expected[group.group]
+                        distances = [approach.distance for approach in approaches]
+                        velocities = [approach.velocity for approach in approaches]
+                        self.assertEqual(len(approaches), group.count)
+                        self.assertEqual((min(distances), max(distances)), (group.distance_min, group.distance_max))
+                        self.assertEqual((min(velocities), max(velocities)), (group.velocity_min, group.velocity_max))
+                        self.assertAlmostEqual(sum(distances) / len(distances), group.distance_mean)
+                        self.assertAlmostEqual(sum(velocities) / len(velocities), group.velocity_mean)
+
+    def test_groups_without_numpy(self):
+        with unittest.mock.patch('aggregate.np', None):
+            self.assertGroupsMatch(self.db)
+
+    @unittest.skipIf(np is None, "The vectorized group-by requires NumPy.")
+    def test_groups_with_numpy(self):
+        self.assertGroupsMatch(self.db)
+
+    @unittest.skipIf(np is None, "The columnar query engine requires NumPy.")
+    def test_groups_with_columnar_engine(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE), columnar=True)
+        self.assertGroupsMatch(db)
+
+    def test_groups_come_in_calendar_order(self):
+        months = [group.group for group in self.db.aggregate(create_filters(), group_by='month')]
+        self.assertEqual(sorted(months), months)
+
+    def test_unknown_group_key_raises(self):
+        with self.assertRaises(ValueError):
+            self.db.aggregate(create_filters(), group_by='name')
+
+    def test_write_groups(self):
+        groups = self.db.aggregate(create_filters(), group_by='hazardous')
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = pathlib.Path(directory) / 'groups.csv'
+            json_path = pathlib.Path(directory) / 'groups.json'
+            write_groups_to_csv(groups, 'hazardous', csv_path)
+            write_groups_to_json(groups, 'hazardous', json_path)
+            lines = csv_path.read_text().splitlines()
+            rows = json.loads(json_path.read_text())
+        self.assertEqual(lines[0].split(',')[:2], ['hazardous', 'count'])
+        self.assertEqual(len(lines), len(groups) + 1)
+        self.assertEqual([row['count'] for row in rows], [group.count for group in groups])
+        self.assertEqual([row['hazardous'] for row in rows], [False, True])
+
+
+class TestUnknownValues(unittest.TestCase):
+    """Unknown (NaN) distances and velocities are left out of the statistics, on both paths."""
+    @classmethod
+    def setUpClass(cls):
+        neos = [NearEarthObject(pdes='1', name='', diameter='', pha='N')]
+        approaches = [
+            CloseApproach(des='1', cd='2020-Jan-01 00:00', dist='0.1', v_rel='5'),
+            CloseApproach(des='1', cd='2020-Jan-02 00:00', dist='', v_rel='7'),
+            CloseApproach(des='1', cd='2020-Jan-03 00:00', dist='0.3', v_rel=''),
+            CloseApproach(des='1', cd='2021-Jan-01 00:00', dist='', v_rel='9'),
+        ]
+        cls.db = NEODatabase(neos, approaches)
+
+    def assertUnknownValuesIgnored(self):
+        first, second = self.db.aggregate(create_filters(), group_by='year')
+        self.assertEqual(first.count, 3)
+        self.assertEqual((first.distance_min, first.distance_max), (0.1, 0.3))
+        self.assertAlmostEqual(first.distance_mean, 0.2)
+        self.assertEqual((first.velocity_min, first.velocity_mean, first.velocity_max), (5, 6, 7))
+        self.assertEqual(second.count, 1)
+        self.assertTrue(all(math.isnan(value) for value in second[2:5]))
+        self.assertEqual((second.velocity_min, second.velocity_mean, second.velocity_max), (9, 9, 9))
+
+    def test_unknown_values_without_numpy(self):
+        with unittest.mock.patch('aggregate.np', None):
+            self.assertUnknownValuesIgnored()
+
+    @unittest.skipIf(np is None, "The vectorized group-by requires NumPy.")
+    def test_unknown_values_with_numpy(self):
+        self.assertUnknownValuesIgnored()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Check that a `QueryCache` answers queries exactly as the database does.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_cache
+"""
+import datetime
+import pathlib
+import unittest
+import unittest.mock
+
+from cache import QueryCache
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestQueryCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def setUp(self):
+        self.cache = QueryCache()
+
+    def assertCachedQueryMatches(self, **criteria):
+        expected = list(self.db.query(create_filters(**criteria)))
+        received = list(self.cache.query(self.db, create_filters(**criteria)))
+        self.assertEqual(len(received), len(expected))
+        for left, right in zip(received, expected):
+            self.assertIs(left, right)
+
+    def test_repeated_query_hits(self):
+        self.assertCachedQueryMatches(start_date=datetime.date(2020, 3, 1))
+        expected = list(self.db.query(create_filters(start_date=datetime.date(2020, 3, 1))))
+        with unittest.mock.patch.object(self.db, 'query_indices') as query_indices:
+            received = list(self.cache.query(self.db, create_filters(start_date=datetime.date(2020, 3, 1))))
+            query_indices.assert_not_called()
+        self.assertEqual(received, expected)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_criteria_order_does_not_matter(self):
+        list(self.cache.query(self.db, create_filters(distance_max=0.1, velocity_min=10)))
+        list(self.cache.query(self.db, create_filters(velocity_min=10, distance_max=0.1)))
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_narrower_query_filters_cached_result(self):
+        self.assertCachedQueryMatches(start_date=datetime.date(2020, 3, 1))
+        self.assertCachedQueryMatches(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 4, 1),
+                                      distance_max=0.05)
+        self.assertEqual(self.cache.narrowed, 1)
+
+    def test_dated_query_does_not_narrow_undated_result(self):
+        self.assertCachedQueryMatches(distance_max=0.1)
+        self.assertCachedQueryMatches(distance_max=0.05, date=datetime.date(2020, 3, 2))
+        self.assertEqual((self.cache.narrowed, self.cache.misses), (0, 2))
+
+    def test_wider_query_misses(self):
+        self.assertCachedQueryMatches(distance_max=0.05)
+        self.assertCachedQueryMatches(distance_max=0.1)
+        self.assertEqual((self.cache.narrowed, self.cache.misses), (0, 2))
+
+    def test_least_recently_used_result_is_evicted(self):
+        cache = QueryCache(max_entries=2)
+        for distance_max in (0.1, 0.2, 0.1, 0.3):
+            list(cache.query(self.db, create_filters(distance_max=distance_max)))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        list(cache.query(self.db, create_filters(distance_max=0.1)))
+        self.assertEqual(cache.hits, 2)
+
+    def test_memory_cap_limits_cached_results(self):
+        cache = QueryCache(max_bytes=1024)
+        list(cache.query(self.db, create_filters()))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.bytes, 0)
+
+    def test_sorted_query_reuses_unsorted_result(self):
+        list(self.cache.query(self.db, create_filters(distance_max=0.1)))
+        expected = list(self.db.query(create_filters(distance_max=0.1), sort_by='velocity', descending=True, limit=5))
+        received = list(self.cache.query(self.db, create_filters(distance_max=0.1),
+                                         sort_by='velocity', descending=True, limit=5))
+        self.assertEqual(expected, received)
+        self.assertEqual((self.cache.hits, len(self.cache)), (1, 1))
+
+    def test_limited_query_with_many_matches_goes_to_database(self):
+        cache = QueryCache(eager_matches=100)
+        expected = list(self.db.query(create_filters(distance_max=0.4), sort_by='distance', limit=10))
+        with unittest.mock.patch.object(self.db, 'query_indices', wraps=self.db.query_indices) as query_indices:
+            received = list(cache.query(self.db, create_filters(distance_max=0.4), sort_by='distance', limit=10))
+            query_indices.assert_not_called()
+        self.assertEqual(received, expected)
+        self.assertEqual((cache.misses, len(cache)), (1, 0))
+
+        list(cache.query(self.db, create_filters(distance_max=0.4)))
+        self.assertEqual(len(cache), 1)
+        received = list(cache.query(self.db, create_filters(distance_max=0.4), sort_by='distance', limit=10))
+        self.assertEqual(received, expected)
+        self.assertEqual(cache.hits, 1)
+
+    def test_limited_query_with_few_matches_is_cached(self):
+        cache = QueryCache(eager_matches=100)
+        list(cache.query(self.db, create_filters(distance_max=0.001), limit=1))
+        self.assertEqual(len(cache), 1)
+        self.assertCachedQueryMatches(distance_max=0.001)
+
+    def test_another_database_empties_cache(self):
+        list(self.cache.query(self.db, create_filters(distance_max=0.1)))
+        other = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        list(self.cache.query(other, create_filters(distance_max=0.1)))
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,13 +10,19 @@ To run these tests from the project root, run:
 
 These tests should pass when Task 2 is complete.
 """
+import datetime
+import itertools
 import pathlib
 import math
 import unittest
+import unittest.mock
 
 
+from columnar import np
 from extract import load_neos, load_approaches
 from database import NEODatabase
+from filters import create_filters
+from models import CloseApproach
 
 
 # Paths to the test data files.
@@ -54,6 +60,28 @@ class TestDatabase(unittest.TestCase):
                     self.fail(f"{approach} appears in the approaches of multiple NEOs.")
                 seen.add(approach)
 
+    def test_database_construction_releases_linked_designations(self):
+        for approach in self.approaches:
+            self.assertIsNone(approach._designation)
+
+    def test_database_construction_leaves_approaches_unparsed(self):
+        approaches = load_approaches(TEST_CAD_FILE)
+        db = NEODatabase(load_neos(TEST_NEO_FILE), approaches)
+
+        matches = list(db.query(create_filters(distance_max=0.01)))
+        self.assertGreater(len(matches), 0)
+        # Neither building the database nor filtering should parse a `datetime` for any approach,
+        # and the raw strings from the data file are replaced with the values from the columns.
+        for approach in approaches:
+            self.assertIsInstance(approach._time, int)
+            self.assertIsInstance(approach._distance, float)
+            self.assertIsInstance(approach._velocity, float)
+        self.assertIsInstance(matches[0].time, datetime.datetime)
+
+    def test_models_do_not_carry_instance_dicts(self):
+        self.assertFalse(hasattr(self.neos[0], '__dict__'))
+        self.assertFalse(hasattr(self.approaches[0], '__dict__'))
+
     def test_get_neo_by_designation(self):
         cerberus = self.db.get_neo_by_designation('1865')
         self.assertIsNotNone(cerberus)
@@ -115,5 +143,65 @@ class TestDatabase(unittest.TestCase):
         self.assertIsNone(nonexistent)
 
 
+class TestMissingTime(unittest.TestCase):
+    """A close approach with an empty `cd` is kept, but never matches a date criterion."""
+    @classmethod
+    def setUpClass(cls):
+        cls.known = load_approaches(TEST_CAD_FILE)
+        cls.designation = cls.known[0]._designation
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.known + [cls.missing_time()])
+        cls.databases = [cls.db]
+        if np is not None:
+            cls.databases.append(NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+                                             + [cls.missing_time()], columnar=True))
+
+    @classmethod
+    def missing_time(cls):
+        return CloseApproach(des=cls.designation, cd='', dist='0.1', v_rel='5')
+
+    def test_construction_keeps_approach(self):
+        approaches = list(self.db.query(create_filters()))
+        self.assertEqual(len(approaches), len(self.known) + 1)
+        self.assertIsNone(approaches[-1].time)
+        self.assertEqual(approaches[-1].time_str, '')
+        self.assertIs(approaches[-1].neo, self.db.get_neo_by_designation(self.designation))
+
+    def test_no_date_criterion_matches(self):
+        for db, criteria in itertools.product(
+                self.databases, ({'start_date': datetime.date(1900, 1, 1)}, {'end_date': datetime.date(2200, 1, 1)},
+                                 {'start_date': datetime.date(1900, 1, 1), 'distance_max': 0.1})):
+            with self.subTest(criteria=criteria, columnar=db._vectors is not None):
+                matches = list(db.query(create_filters(**criteria)))
+                if 'distance_max' not in criteria:
+                    self.assertEqual(len(matches), len(self.known))
+                self.assertTrue(all(approach.time is not None for approach in matches))
+                self.assertEqual(db.count(create_filters(**criteria)), len(matches))
+        self.assertEqual(self.db.count(create_filters(distance_min=0.1, distance_max=0.1)),
+                         sum(1 for _ in self.db.query(create_filters(distance_min=0.1, distance_max=0.1))))
+
+    def test_unknown_time_sorts_last(self):
+        for descending in (False, True):
+            with self.subTest(descending=descending):
+                approaches = list(self.db.query(create_filters(), sort_by='time', descending=descending, limit=5000))
+                self.assertIsNone(approaches[-1].time)
+                self.assertTrue(all(approach.time is not None for approach in approaches[:-1]))
+
+    def test_aggregate_groups_unknown_time_last(self):
+        for db in self.databases:
+            for vectorized in ((True, False) if np is not None else (False,)):
+                with self.subTest(columnar=db._vectors is not None, vectorized=vectorized), \
+                        unittest.mock.patch('aggregate.np', np if vectorized else None):
+                    groups = db.aggregate(create_filters(), group_by='month')
+                    self.assertEqual((groups[-1].group, groups[-1].count), (None, 1))
+
+    def test_update_with_missing_time(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE) + [self.missing_time()])
+        delta = db.update(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE) + [self.missing_time()])
+        self.assertFalse(any(delta))
+        delta = db.update(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        self.assertEqual(delta.approaches_removed, 1)
+        self.assertEqual(len(list(db.query(create_filters(start_date=datetime.date(1900, 1, 1))))), len(self.known))
+
+
 if __name__ == '__main__':
     unittest.main()
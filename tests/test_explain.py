@@ -0,0 +1,111 @@
+"""Check that `explain` describes query plans, and `analyze` runs them faithfully.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_explain
+"""
+import datetime
+import pathlib
+import unittest
+
+from database import NEODatabase, DATE_SLICE, FULL_SCAN, INDEX_RANGE, NEO_FIRST
+from explain import explain, analyze
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestExplain(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def test_access_paths(self):
+        cases = [
+            ({}, FULL_SCAN),
+            ({'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 3, 31)}, DATE_SLICE),
+            ({'distance_max': 0.001}, INDEX_RANGE),
+            ({'diameter_min': 1.2}, NEO_FIRST),
+        ]
+        for criteria, path in cases:
+            with self.subTest(**criteria):
+                self.assertIn(f"Access path: {path}", explain(self.db, create_filters(**criteria)))
+
+    def test_estimates_are_exact_for_one_attribute(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        db.build_indexes()
+        filters = create_filters(distance_min=0.3)
+        expected = len(list(db.query(filters)))
+        self.assertIn(f"Estimated matches: {expected}", explain(db, filters))
+
+    def test_explain_builds_no_index(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        report = explain(db, create_filters(distance_max=0.001, diameter_min=1.2), sort_by='velocity', limit=5)
+        self.assertIn("Access path: ", report)
+        self.assertEqual(db._sorted_indexes, {})
+
+    def test_contradictory_criteria(self):
+        report = explain(self.db, create_filters(distance_min=0.2, distance_max=0.1))
+        self.assertIn("nothing matches", report)
+
+    def test_ordering_is_described(self):
+        report = explain(self.db, create_filters(), sort_by='distance', descending=True, limit=5)
+        self.assertIn("Order: by distance, descending, walking its sorted index", report)
+
+
+class TestAnalyze(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def analyze(self, criteria, **options):
+        written = []
+        report = analyze(self.db, create_filters(**criteria), write=written.extend, **options)
+        return report, written
+
+    def test_results_match_query(self):
+        cases = [
+            ({'start_date': datetime.date(2020, 3, 1), 'distance_max': 0.1, 'hazardous': True}, {}),
+            ({'velocity_min': 20}, {'limit': 7}),
+            ({'diameter_max': 0.1}, {'sort_by': 'distance', 'descending': True, 'limit': 4}),
+        ]
+        for criteria, options in cases:
+            with self.subTest(**criteria, **options):
+                report, written = self.analyze(criteria, **options)
+                self.assertEqual(list(self.db.query(create_filters(**criteria), **options)), written)
+                self.assertIn(f"Results: {len(written)}", report)
+
+    def rows_examined(self, report):
+        (line,) = [line for line in report.splitlines() if line.startswith("Rows examined: ")]
+        return int(line.rsplit(': ', 1)[1])
+
+    def test_limit_stops_the_scan_early(self):
+        cases = [
+            ({'distance_max': 0.05}, {'limit': 2}),
+            ({'velocity_min': 20}, {'limit': 7}),
+            ({}, {'sort_by': 'distance', 'limit': 3}),
+        ]
+        for criteria, options in cases:
+            with self.subTest(**criteria, **options):
+                report, written = self.analyze(criteria, **options)
+                self.assertEqual(len(written), options['limit'])
+                self.assertLess(self.rows_examined(report), 100)
+
+    def test_access_path_taken_is_reported(self):
+        report, written = self.analyze({'diameter_min': 1.2})
+        self.assertIn("Access path taken: NEO-first", report)
+        self.assertEqual(self.rows_examined(report), len(written))
+
+    def test_every_stage_is_timed(self):
+        report, _ = self.analyze({'velocity_min': 20}, sort_by='velocity', limit=3)
+        timing = report.splitlines()[-1]
+        for stage in ('plan', 'scan', 'sort', 'materialize', 'write'):
+            self.assertIn(f"{stage} ", timing)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,11 +12,13 @@ These tests should pass when Task 2 is complete.
 """
 import collections.abc
 import datetime
+import json
 import pathlib
 import math
+import tempfile
 import unittest
 
-from extract import load_neos, load_approaches
+from extract import load_neos, load_approaches, iter_approaches
 from models import NearEarthObject, CloseApproach
 
 
@@ -77,6 +79,17 @@ class TestLoadNEOs(unittest.TestCase):
         self.assertEqual(neo.diameter, 0.6)
         self.assertEqual(neo.hazardous, True)
 
+    def test_load_neos_finds_columns_by_header(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / 'neos.csv'
+            path.write_text('pha,extra,diameter,name,pdes\nY,x,0.6,Adonis,2101\n')
+            neo, = load_neos(path)
+
+        self.assertEqual(neo.designation, '2101')
+        self.assertEqual(neo.name, 'Adonis')
+        self.assertEqual(neo.diameter, 0.6)
+        self.assertEqual(neo.hazardous, True)
+
 
 class TestLoadApproaches(unittest.TestCase):
     @classmethod
@@ -118,5 +131,39 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsInstance(approach.velocity, float)
 
 
+class TestIterApproaches(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = [(approach.time, approach.distance, approach.velocity)
+                        for approach in load_approaches(TEST_CAD_FILE)]
+
+    def assertStreamsExpectedApproaches(self, cad_json_path):
+        received = [(approach.time, approach.distance, approach.velocity)
+                    for approach in iter_approaches(cad_json_path)]
+        self.assertEqual(received, self.expected)
+
+    def test_iter_approaches_is_iterator(self):
+        self.assertIsInstance(iter_approaches(TEST_CAD_FILE), collections.abc.Iterator)
+
+    def test_iter_approaches_with_fields_after_data(self):
+        self.assertStreamsExpectedApproaches(TEST_CAD_FILE)
+
+    def test_iter_approaches_with_fields_before_data(self):
+        # NASA's API puts the header first - and the compact encoding spreads rows across many buffer refills.
+        document = json.loads(TEST_CAD_FILE.read_text())
+        reordered = {'signature': document['signature'], 'count': document['count'],
+                     'fields': document['fields'], 'data': document['data']}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / 'cad.json'
+            path.write_text(json.dumps(reordered, separators=(',', ':')))
+            self.assertStreamsExpectedApproaches(path)
+
+    def test_iter_approaches_with_empty_data(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / 'cad.json'
+            path.write_text('{"count": "0", "fields": ["des", "cd", "dist", "v_rel"], "data": []}')
+            self.assertEqual(list(iter_approaches(path)), [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,99 @@
+"""Check that `create_filters` normalizes criteria into a `FilterPlan`.
+
+Criteria on the same attribute should be merged into a single closed interval,
+and contradictory criteria should produce a plan that matches nothing.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_filters
+"""
+import collections.abc
+import datetime
+import operator
+import unittest
+
+from filters import (create_filters, FilterPlan, MatchNothingFilter,
+                     DateFilter, DistanceFilter, VelocityFilter, IsHaradousFilter)
+
+
+class TestFilterPlan(unittest.TestCase):
+    def test_create_filters_without_criteria_is_empty_collection(self):
+        plan = create_filters()
+        self.assertIsInstance(plan, collections.abc.Iterable)
+        self.assertEqual(len(plan), 0)
+        self.assertFalse(plan.empty)
+
+    def test_create_filters_produces_callables(self):
+        plan = create_filters(distance_min=0.1, velocity_max=20)
+        for f in plan:
+            self.assertTrue(callable(f))
+
+    def test_date_and_date_bounds_merge_into_one_interval(self):
+        date = datetime.date(2020, 3, 2)
+        plan = create_filters(date=date,
+                              start_date=datetime.date(2020, 2, 1),
+                              end_date=datetime.date(2020, 4, 1))
+        self.assertEqual(plan.intervals[DateFilter], (date, date))
+
+        filters = list(plan)
+        self.assertEqual(len(filters), 1)
+        self.assertIsInstance(filters[0], DateFilter)
+        self.assertIs(filters[0].op, operator.eq)
+
+    def test_date_bounds_merge_into_one_interval(self):
+        start_date = datetime.date(2020, 2, 1)
+        end_date = datetime.date(2020, 4, 1)
+        plan = create_filters(start_date=start_date, end_date=end_date)
+        self.assertEqual(plan.intervals[DateFilter], (start_date, end_date))
+        self.assertEqual(len(plan), 2)
+
+    def test_one_sided_interval(self):
+        plan = create_filters(velocity_min=10)
+        self.assertEqual(plan.intervals[VelocityFilter], (10, None))
+
+    def test_conflicting_distance_bounds_match_nothing(self):
+        plan = create_filters(distance_min=0.3, distance_max=0.1)
+        self.assertTrue(plan.empty)
+        self.assertEqual([type(f) for f in plan], [MatchNothingFilter])
+
+    def test_conflicting_date_bounds_match_nothing(self):
+        plan = create_filters(date=datetime.date(2020, 1, 1), start_date=datetime.date(2020, 6, 1))
+        self.assertTrue(plan.empty)
+
+    def test_plan_from_list_of_filters(self):
+        plan = FilterPlan.from_filters([
+            DistanceFilter(operator.ge, 0.1),
+            DistanceFilter(operator.ge, 0.2),
+            DistanceFilter(operator.le, 0.5),
+            IsHaradousFilter(operator.eq, True),
+        ])
+        self.assertEqual(plan.intervals[DistanceFilter], (0.2, 0.5))
+        self.assertEqual(plan.intervals[IsHaradousFilter], (True, True))
+        self.assertFalse(plan.empty)
+
+    def test_unmergeable_filters_are_kept_as_residual(self):
+        strict = DistanceFilter(operator.lt, 0.1)
+        plan = FilterPlan.from_filters([strict])
+        self.assertEqual(plan.residual, [strict])
+        self.assertEqual(list(plan), [strict])
+
+    def test_without_leaves_out_attribute(self):
+        plan = create_filters(start_date=datetime.date(2020, 1, 1), distance_max=0.1)
+        remaining = plan.without(DateFilter)
+        self.assertEqual([type(f) for f in remaining], [DistanceFilter])
+
+    def test_key_ignores_order_of_criteria(self):
+        self.assertEqual(create_filters(distance_max=0.1, velocity_min=5).key,
+                         create_filters(velocity_min=5, distance_max=0.1).key)
+        self.assertNotEqual(create_filters(distance_max=0.1).key, create_filters(distance_max=0.2).key)
+
+    def test_narrows(self):
+        wide = create_filters(start_date=datetime.date(2020, 1, 1), distance_max=0.2)
+        narrow = create_filters(start_date=datetime.date(2020, 2, 1), distance_max=0.1, hazardous=True)
+        self.assertTrue(narrow.narrows(wide))
+        self.assertFalse(wide.narrows(narrow))
+        self.assertFalse(create_filters(distance_max=0.1).narrows(wide))
+
+
+if __name__ == '__main__':
+    unittest.main()
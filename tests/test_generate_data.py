@@ -0,0 +1,54 @@
+"""Check that the synthetic data sets of `benchmarks.generate_data` load and link like the real data.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_generate_data
+"""
+import json
+import pathlib
+import tempfile
+import unittest
+
+from benchmarks.generate_data import generate
+from database import NEODatabase
+from extract import load_neos, load_approaches
+
+
+class TestGenerateData(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.neo_path, cls.cad_path = generate(pathlib.Path(cls.tmpdir.name) / 'data', neos=200, approaches=1000,
+                                              seed=1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_row_counts(self):
+        self.assertEqual(len(load_neos(self.neo_path)), 200)
+        self.assertEqual(len(load_approaches(self.cad_path)), 1000)
+        self.assertEqual(json.loads(self.cad_path.read_text())['count'], '1000')
+
+    def test_every_approach_links_to_its_neo(self):
+        db = NEODatabase(load_neos(self.neo_path), load_approaches(self.cad_path))
+        self.assertEqual(len(db._neos_by_designation), 200)
+        approaches = list(db.query([]))
+        self.assertTrue(all(approach.neo is not None for approach in approaches))
+        self.assertEqual(sum(len(neo.approaches) for neo in db._neos), 1000)
+        for approach in approaches[:50]:
+            self.assertIn(approach, approach.neo.approaches)
+
+    def test_approaches_are_in_time_order(self):
+        times = [approach.time for approach in load_approaches(self.cad_path)]
+        self.assertEqual(times, sorted(times))
+
+    def test_same_seed_gives_same_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            neo_path, cad_path = generate(tmpdir, neos=200, approaches=1000, seed=1)
+            self.assertEqual(neo_path.read_bytes(), self.neo_path.read_bytes())
+            self.assertEqual(cad_path.read_bytes(), self.cad_path.read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
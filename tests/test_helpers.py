@@ -0,0 +1,66 @@
+"""Check that NASA-formatted timestamps are converted to and from datetimes.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_helpers
+"""
+import datetime
+import unittest
+
+from helpers import (cd_to_datetime, cd_to_minute, cd_to_str, datetime_to_minute, minute_to_datetime,
+                     minute_to_str, date_to_day, datetime_to_str)
+
+
+class TestCalendarDates(unittest.TestCase):
+    def test_cd_to_datetime(self):
+        self.assertEqual(cd_to_datetime('2020-Dec-31 12:00'), datetime.datetime(2020, 12, 31, 12, 0))
+        self.assertEqual(cd_to_datetime('1900-Jan-01 00:54'), datetime.datetime(1900, 1, 1, 0, 54))
+
+    def test_cd_to_datetime_matches_strptime_for_every_month(self):
+        for month in range(1, 13):
+            dt = datetime.datetime(2020, month, 15, 23, 59)
+            calendar_date = dt.strftime('%Y-%b-%d %H:%M')
+            self.assertEqual(cd_to_datetime(calendar_date), dt)
+
+    def test_cd_to_datetime_falls_back_for_unusual_layout(self):
+        self.assertEqual(cd_to_datetime('2020-dec-31 12:00'), datetime.datetime(2020, 12, 31, 12, 0))
+        self.assertEqual(cd_to_datetime('2020-Dec-1 2:05'), datetime.datetime(2020, 12, 1, 2, 5))
+
+    def test_cd_to_datetime_rejects_malformed_input(self):
+        for calendar_date in ('2020-Dec-32 12:00', '2020-Foo-01 12:00', '2020-12-31 12:00', ''):
+            with self.assertRaises(ValueError):
+                cd_to_datetime(calendar_date)
+
+    def test_cd_to_minute_matches_cd_to_datetime(self):
+        for calendar_date in ('1900-Jan-01 00:00', '1969-Jul-29 12:01', '2099-Dec-31 23:59', '2020-dec-31 12:00'):
+            minute = cd_to_minute(calendar_date)
+            self.assertEqual(minute, datetime_to_minute(cd_to_datetime(calendar_date)))
+            self.assertEqual(minute_to_datetime(minute), cd_to_datetime(calendar_date))
+
+    def test_cd_to_minute_rejects_malformed_input(self):
+        for calendar_date in ('2020-Dec-31 24:00', '2020-Feb-30 12:00', 'not a date'):
+            with self.assertRaises(ValueError):
+                cd_to_minute(calendar_date)
+
+    def test_date_to_day(self):
+        self.assertEqual(date_to_day(datetime.date(1970, 1, 1)), 0)
+        self.assertEqual(date_to_day(datetime.date(1969, 12, 31)), -1)
+        self.assertEqual(cd_to_minute('1970-Jan-02 00:00') // (24 * 60), date_to_day(datetime.date(1970, 1, 2)))
+
+    def test_datetime_to_str(self):
+        self.assertEqual(datetime_to_str(datetime.datetime(2020, 12, 31, 12, 0)), '2020-12-31 12:00')
+
+    def test_cd_to_str_and_minute_to_str_match_datetime_to_str(self):
+        for calendar_date in ('1900-Jan-01 00:00', '1969-Jul-29 12:01', '2099-Dec-31 23:59', '2020-dec-1 2:05'):
+            expected = datetime_to_str(cd_to_datetime(calendar_date))
+            self.assertEqual(cd_to_str(calendar_date), expected)
+            self.assertEqual(minute_to_str(cd_to_minute(calendar_date)), expected)
+
+    def test_cd_to_str_rejects_malformed_input(self):
+        for calendar_date in ('2020-Dec-31 24:00', '2020-Feb-30 12:00', 'not a date'):
+            with self.assertRaises(ValueError):
+                cd_to_str(calendar_date)
+
+
+if __name__ == '__main__':
+    unittest.main()
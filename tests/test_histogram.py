@@ -0,0 +1,95 @@
+"""Check the selectivity estimates of `ColumnStatistics`, and the order in which filters are checked.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_histogram
+"""
+import datetime
+import operator
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, DistanceFilter, VelocityFilter
+from histogram import ColumnStatistics, Histogram, DEFAULT_SELECTIVITY
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestHistogram(unittest.TestCase):
+    def test_fractions(self):
+        histogram = Histogram([1.0, 2.0, 2.0, 3.0, float('nan')])
+        self.assertEqual(histogram.fraction(operator.eq, 2.0), 2 / 5)
+        self.assertEqual(histogram.fraction(operator.le, 2.0), 3 / 5)
+        self.assertEqual(histogram.fraction(operator.lt, 2.0), 1 / 5)
+        self.assertEqual(histogram.fraction(operator.ge, 2.0), 3 / 5)
+        self.assertEqual(histogram.fraction(operator.gt, 2.0), 1 / 5)
+        self.assertIsNone(histogram.fraction(operator.ne, 2.0))
+
+    def test_empty(self):
+        self.assertEqual(Histogram([]).fraction(operator.le, 1.0), 0.0)
+
+
+class TestColumnStatistics(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.total = len(cls.db._approaches)
+
+    def test_estimates_are_exact_when_every_approach_is_sampled(self):
+        statistics = ColumnStatistics(self.db._columns, sample_size=self.total)
+        for criteria in ({'date': datetime.date(2020, 3, 2)}, {'start_date': datetime.date(2020, 6, 1)},
+                         {'distance_max': 0.1}, {'velocity_min': 20}, {'diameter_min': 0.5},
+                         {'hazardous': True}, {'hazardous': False}):
+            with self.subTest(criteria=criteria):
+                (f,) = create_filters(**criteria)
+                expected = sum(1 for approach in self.db._approaches if f(approach)) / self.total
+                self.assertAlmostEqual(statistics.selectivity(f), expected)
+
+    def test_sampled_estimates_are_close(self):
+        statistics = ColumnStatistics(self.db._columns, sample_size=500)
+        (f,) = create_filters(distance_max=0.1)
+        expected = sum(1 for approach in self.db._approaches if f(approach)) / self.total
+        self.assertAlmostEqual(statistics.selectivity(f), expected, delta=0.05)
+
+    def test_filters_without_a_histogram(self):
+        residual = lambda approach: True  # noqa: E731
+        statistics = self.db._statistics
+        self.assertEqual(statistics.selectivity(residual), DEFAULT_SELECTIVITY)
+        self.assertGreater(statistics.cost(residual), statistics.cost(DistanceFilter(operator.le, 0.1)))
+
+    def test_combined_selectivity(self):
+        statistics = ColumnStatistics(self.db._columns, sample_size=self.total)
+        distance = statistics.selectivity(DistanceFilter(operator.le, 0.1))
+        velocity = statistics.selectivity(VelocityFilter(operator.ge, 20))
+        self.assertAlmostEqual(statistics.combined_selectivity(create_filters(distance_max=0.1, velocity_min=20)),
+                               distance * velocity)
+        self.assertAlmostEqual(statistics.combined_selectivity(create_filters(distance_min=0.05, distance_max=0.1)),
+                               min(distance, statistics.selectivity(DistanceFilter(operator.ge, 0.05))))
+        self.assertEqual(statistics.combined_selectivity([]), 1.0)
+
+    def test_most_selective_first(self):
+        loose = VelocityFilter(operator.ge, 0)
+        tight = DistanceFilter(operator.le, 0.001)
+        medium = DistanceFilter(operator.le, 0.2)
+        self.assertEqual(self.db._statistics.order([loose, medium, tight]), [tight, medium, loose])
+
+    def test_checking_stops_at_the_first_failure(self):
+        calls = []
+
+        def residual(approach):
+            calls.append(approach)
+            return True
+
+        filters = [residual, DistanceFilter(operator.le, 0.001)]
+        matches = list(self.db._check_rows(range(self.total), filters))
+        self.assertEqual(len(calls), len(matches))
+        self.assertLess(len(matches), self.total)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Check that parsing the data files on a pool of processes gives the same data set.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_parallel
+"""
+import json
+import math
+import pathlib
+import tempfile
+import unittest
+
+from extract import load_neos, load_approaches
+from parallel import load_parallel, split_cad_file
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def describe_neo(neo):
+    """Summarize a NEO for comparison, treating unknown diameters as equal."""
+    diameter = None if math.isnan(neo.diameter) else neo.diameter
+    return neo.designation, neo.name, diameter, neo.hazardous
+
+
+def describe_approach(approach):
+    """Summarize an unlinked close approach for comparison."""
+    return approach._designation, approach.time, approach.distance, approach.velocity
+
+
+class TestLoadParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = [describe_neo(neo) for neo in load_neos(TEST_NEO_FILE)]
+        cls.approaches = [describe_approach(approach) for approach in load_approaches(TEST_CAD_FILE)]
+
+    def assertLoadsExpectedData(self, cad_json_path, cad_chunks):
+        neos, approaches = load_parallel(TEST_NEO_FILE, cad_json_path, workers=2, cad_chunks=cad_chunks)
+        self.assertEqual([describe_neo(neo) for neo in neos], self.neos)
+        self.assertEqual([describe_approach(approach) for approach in approaches], self.approaches)
+
+    def test_load_parallel_without_chunks(self):
+        self.assertLoadsExpectedData(TEST_CAD_FILE, cad_chunks=1)
+
+    def test_load_parallel_with_chunks(self):
+        self.assertLoadsExpectedData(TEST_CAD_FILE, cad_chunks=5)
+
+    def test_load_parallel_with_fields_before_data(self):
+        document = json.loads(TEST_CAD_FILE.read_text())
+        reordered = {'fields': document['fields'], 'data': document['data']}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / 'cad.json'
+            path.write_text(json.dumps(reordered, indent=1))
+            self.assertLoadsExpectedData(path, cad_chunks=3)
+
+    def test_load_parallel_with_missing_values(self):
+        document = json.loads(TEST_CAD_FILE.read_text())
+        cd, dist, v_rel = (document['fields'].index(field) for field in ('cd', 'dist', 'v_rel'))
+        document['data'][0][dist] = ''
+        document['data'][1][v_rel] = None
+        document['data'][2][cd] = ''
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / 'cad.json'
+            path.write_text(json.dumps(document))
+            _, approaches = load_parallel(TEST_NEO_FILE, path, workers=2, cad_chunks=2)
+        self.assertEqual(len(approaches), len(self.approaches))
+        self.assertTrue(math.isnan(approaches[0].distance))
+        self.assertEqual(approaches[0].velocity, self.approaches[0][3])
+        self.assertTrue(math.isnan(approaches[1].velocity))
+        self.assertIsNone(approaches[2].time)
+        self.assertEqual([describe_approach(approach) for approach in approaches[3:]], self.approaches[3:])
+
+    def test_split_cad_file_covers_whole_file(self):
+        positions, ranges = split_cad_file(TEST_CAD_FILE, 4)
+        self.assertEqual(len(ranges), 4)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, start)
+        self.assertEqual(ranges[-1][1], TEST_CAD_FILE.stat().st_size)
+
+    def test_split_cad_file_without_fields(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = pathlib.Path(tmpdir) / 'cad.json'
+            path.write_text('{"data": [["2020 AB", "2020-Jan-01 00:00", "0.1", "5.0"]]}')
+            self.assertIsNone(split_cad_file(path, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Check that compiled column tests match checking the filters one at a time.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_predicate
+"""
+import datetime
+import operator
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, DistanceFilter, VelocityFilter
+from predicate import check_rows, compile_check
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestCompiledCheck(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.positions = range(len(cls.db._approaches))
+
+    def check(self, filters):
+        tests, residual = self.db._columns.bind(filters)
+        return list(check_rows(self.positions, tests, residual, self.db._approaches))
+
+    def expected(self, filters):
+        return [index for index in self.positions if all(f(self.db._approaches[index]) for f in filters)]
+
+    def test_every_comparator(self):
+        for op in (operator.eq, operator.ne, operator.lt, operator.le, operator.gt, operator.ge):
+            with self.subTest(op=op.__name__):
+                filters = [VelocityFilter(op, 15.0), DistanceFilter(operator.le, 0.3)]
+                self.assertEqual(self.check(filters), self.expected(filters))
+
+    def test_criteria_from_create_filters(self):
+        filters = create_filters(start_date=datetime.date(2020, 3, 1), end_date=datetime.date(2020, 6, 30),
+                                 distance_max=0.4, velocity_min=5, diameter_max=2, hazardous=False)
+        self.assertEqual(self.check(filters), self.expected(filters))
+
+    def test_no_tests(self):
+        self.assertEqual(self.check([]), list(self.positions))
+
+    def test_residual_filters(self):
+        residual = lambda approach: approach.neo is not None and approach.neo.name is not None  # noqa: E731
+        filters = [DistanceFilter(operator.le, 0.2), residual]
+        self.assertEqual(self.check(filters), self.expected(filters))
+
+    def test_comparators_that_cant_be_inlined(self):
+        contains = lambda value, reference: reference[0] <= value <= reference[1]  # noqa: E731
+        tests = [(contains, self.db._columns.distance, (0.1, 0.2))]
+        expected = [index for index in self.positions if 0.1 <= self.db._columns.distance[index] <= 0.2]
+        self.assertEqual(list(check_rows(self.positions, tests, [], self.db._approaches)), expected)
+
+    def test_queries_of_the_same_shape_share_a_function(self):
+        first = compile_check((operator.ge, operator.le), False)
+        self.assertIs(compile_check((operator.ge, operator.le), False), first)
+        self.assertIsNot(compile_check((operator.le, operator.ge), False), first)
+
+        compile_check.cache_clear()
+        for criteria in ({'distance_max': 0.05, 'velocity_min': 5}, {'distance_max': 0.06, 'velocity_min': 6}):
+            list(self.db._check_rows(self.positions, create_filters(**criteria)))
+        info = compile_check.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,9 +16,10 @@ import datetime
 import pathlib
 import unittest
 
+from columnar import np
 from database import NEODatabase
 from extract import load_neos, load_approaches
-from filters import create_filters
+from filters import create_filters, DiameterFilter, DistanceFilter, FilterPlan, IsHaradousFilter
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -111,6 +112,15 @@ class TestQuery(unittest.TestCase):
         received = set(self.db.query(filters))
         self.assertEqual(expected, received, msg="Computed results do not match expected results.")
 
+    def test_query_with_date_bounds_generates_approaches_in_time_order(self):
+        start_date = datetime.date(2020, 3, 1)
+        end_date = datetime.date(2020, 5, 31)
+
+        filters = create_filters(start_date=start_date, end_date=end_date, distance_max=0.1)
+        received = [approach.time for approach in self.db.query(filters)]
+        self.assertGreater(len(received), 0)
+        self.assertEqual(sorted(received), received)
+
     def test_query_with_bounds_and_a_specific_date(self):
         start_date = datetime.date(2020, 2, 1)
         date = datetime.date(2020, 3, 2)
@@ -529,5 +539,65 @@ class TestQuery(unittest.TestCase):
         self.assertEqual(expected, received, msg="Computed results do not match expected results.")
 
 
+@unittest.skipIf(np is None, "The columnar query engine requires NumPy.")
+class TestColumnarQuery(TestQuery):
+    """Run every query test again against the vectorized, NumPy-backed engine."""
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(cls.neos, cls.approaches, columnar=True)
+
+    def test_query_generates_approaches_in_internal_order(self):
+        filters = create_filters(distance_max=0.05)
+        received = list(self.db.query(filters))
+        expected = [approach for approach in self.approaches if approach.distance <= 0.05]
+        self.assertEqual(expected, received)
+
+
+class TestIndexedQuery(TestQuery):
+    """Run every query test again, driving distance and velocity criteria from the sorted indexes."""
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(cls.neos, cls.approaches)
+        cls.db.index_selectivity = 1.0
+        cls.db.build_indexes()
+
+    def test_index_driver_narrows_to_matching_range(self):
+        plan = FilterPlan.from_filters(create_filters(distance_max=0.025))
+        filter_classes, candidates = self.db._index_driver(plan)
+        self.assertEqual((DistanceFilter,), filter_classes)
+        expected = [index for index, approach in enumerate(self.approaches) if approach.distance <= 0.025]
+        self.assertEqual(expected, list(candidates))
+
+    def test_query_generates_dated_approaches_in_time_order(self):
+        filters = create_filters(start_date=datetime.date(2020, 3, 1), velocity_min=20)
+        received = list(self.db.query(filters))
+        self.assertEqual(sorted(received, key=lambda approach: approach.time), received)
+
+    def test_neo_driver_narrows_to_approaches_of_matching_neos(self):
+        plan = FilterPlan.from_filters(create_filters(diameter_min=1, hazardous=True))
+        filter_classes, candidates = self.db._index_driver(plan)
+        self.assertEqual((DiameterFilter, IsHaradousFilter), filter_classes)
+        expected = [index for index, approach in enumerate(self.approaches)
+                    if approach.neo.diameter >= 1 and approach.neo.hazardous]
+        self.assertEqual(expected, list(candidates))
+
+    def test_neo_driver_matches_unlinked_approaches_as_not_hazardous(self):
+        neos = load_neos(TEST_NEO_FILE)
+        approaches = load_approaches(TEST_CAD_FILE)
+        db = NEODatabase([neo for neo in neos if neo.hazardous], approaches)
+        db.index_selectivity = 1.0
+        received = list(db.query(create_filters(hazardous=False)))
+        self.assertEqual([approach for approach in approaches if approach.neo is None], received)
+
+    def test_unselective_index_is_not_used(self):
+        db = NEODatabase(self.neos, self.approaches)
+        plan = FilterPlan.from_filters(create_filters(distance_max=10))
+        self.assertIsNone(db._index_driver(plan))
+
+
 if __name__ == '__main__':
     unittest.main()
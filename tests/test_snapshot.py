@@ -0,0 +1,110 @@
+"""Check that a linked `NEODatabase` can be saved to and restored from a snapshot.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_snapshot
+"""
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from extract import load_neos, load_approaches
+from snapshot import load_database, snapshot_path, SNAPSHOT_MAGIC, SNAPSHOT_VERSION
+from store import ApproachViews, COLUMNS, STRING_TABLES
+from tests.support import describe
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.tmpdir.name)
+        self.neo_file = root / 'neos.csv'
+        self.cad_file = root / 'cad.json'
+        shutil.copy(TEST_NEO_FILE, self.neo_file)
+        shutil.copy(TEST_CAD_FILE, self.cad_file)
+        self.snapshot = snapshot_path(self.cad_file)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_first_load_writes_snapshot(self):
+        load_database(self.neo_file, self.cad_file)
+        self.assertTrue(self.snapshot.exists())
+
+    def test_no_cache_does_not_write_snapshot(self):
+        load_database(self.neo_file, self.cad_file, use_cache=False)
+        self.assertFalse(self.snapshot.exists())
+
+    def test_restored_database_matches_loaded_database(self):
+        loaded = load_database(self.neo_file, self.cad_file)
+        with unittest.mock.patch('snapshot.load_approaches') as load_approaches:
+            restored = load_database(self.neo_file, self.cad_file)
+            load_approaches.assert_not_called()
+
+        self.assertEqual(describe(restored), describe(loaded))
+        self.assertEqual(describe(restored, diameter_max=1.0, hazardous=True),
+                         describe(loaded, diameter_max=1.0, hazardous=True))
+        self.assertEqual(restored.get_neo_by_name('Adonis').designation, '2101')
+
+    def test_snapshot_is_json_header_and_arrays(self):
+        load_database(self.neo_file, self.cad_file)
+        with open(self.snapshot, 'rb') as snapshot_file:
+            self.assertEqual(snapshot_file.read(len(SNAPSHOT_MAGIC)), SNAPSHOT_MAGIC)
+            header = json.loads(snapshot_file.readline())
+        self.assertEqual(header['version'], SNAPSHOT_VERSION)
+        self.assertEqual([name for name, _, _ in header['sections']], list(COLUMNS) + list(STRING_TABLES))
+
+    def test_corrupt_snapshot_is_replaced(self):
+        load_database(self.neo_file, self.cad_file)
+        contents = self.snapshot.read_bytes()
+        truncated = contents[:len(contents) // 2]
+        mistyped = contents.replace(b'"approach_time", "q"', b'"approach_time", "d"')
+        for corrupt in (truncated, mistyped, SNAPSHOT_MAGIC + b'{}\n'):
+            with self.subTest(size=len(corrupt)):
+                self.snapshot.write_bytes(corrupt)
+                loaded = load_database(self.neo_file, self.cad_file)
+                self.assertEqual(len(describe(loaded)), 4700)
+                self.assertEqual(self.snapshot.read_bytes(), contents)
+
+    def test_restored_database_creates_approaches_lazily_and_updates(self):
+        loaded = load_database(self.neo_file, self.cad_file)
+        restored = load_database(self.neo_file, self.cad_file)
+        self.assertIsInstance(restored._approaches, ApproachViews)
+        delta = restored.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+        self.assertFalse(any(delta))
+        self.assertEqual(describe(restored, distance_max=0.1), describe(loaded, distance_max=0.1))
+
+    def test_changed_data_file_invalidates_snapshot(self):
+        load_database(self.neo_file, self.cad_file)
+        with open(self.cad_file, 'a') as cad_file_obj:
+            cad_file_obj.write('\n')
+        with unittest.mock.patch('snapshot.load_approaches', wraps=lambda path: []) as load_approaches:
+            load_database(self.neo_file, self.cad_file)
+            load_approaches.assert_called_once()
+
+    def test_touched_but_unchanged_data_file_keeps_snapshot(self):
+        load_database(self.neo_file, self.cad_file)
+        stat = os.stat(self.cad_file)
+        os.utime(self.cad_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with unittest.mock.patch('snapshot.load_approaches') as load_approaches:
+            load_database(self.neo_file, self.cad_file)
+            load_approaches.assert_not_called()
+
+    def test_rebuild_ignores_snapshot(self):
+        load_database(self.neo_file, self.cad_file)
+        with unittest.mock.patch('snapshot.load_approaches', wraps=lambda path: []) as load_approaches:
+            load_database(self.neo_file, self.cad_file, rebuild=True)
+            load_approaches.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
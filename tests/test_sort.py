@@ -0,0 +1,94 @@
+"""Check that `NEODatabase.query` orders and limits its results by an attribute.
+
+Each ordered query is compared against a full sort of the unordered matches,
+whichever path - a walk of a presorted index, or a bounded heap - answers it.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_sort
+"""
+import datetime
+import math
+import pathlib
+import unittest
+import unittest.mock
+
+from database import NEODatabase, SORT_KEYS
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+# Criteria that select everything, a date range, a NEO attribute, and a narrow distance range.
+CRITERIA = (
+    {},
+    {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 6, 30)},
+    {'hazardous': False},
+    {'distance_max': 0.01},
+)
+
+
+def attribute(approach, sort_by):
+    """Return the attribute of a close approach to sort by, as a number (NaN if unknown)."""
+    if sort_by == 'time':
+        return approach.time.timestamp()
+    if sort_by == 'diameter':
+        return approach.neo.diameter if approach.neo else float('nan')
+    return getattr(approach, sort_by)
+
+
+class TestSortedQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+        cls.positions = {id(approach): position for position, approach in enumerate(cls.approaches)}
+
+    def expected(self, criteria, sort_by, descending, limit):
+        # Unknown values come last; ties keep the approaches' order in the data set.
+        sign = -1 if descending else 1
+        matches = sorted(self.db.query(create_filters(**criteria)), key=lambda approach: self.positions[id(approach)])
+        known = [approach for approach in matches if not math.isnan(attribute(approach, sort_by))]
+        unknown = [approach for approach in matches if math.isnan(attribute(approach, sort_by))]
+        ordered = sorted(known, key=lambda approach: sign * attribute(approach, sort_by)) + unknown
+        return ordered[:limit] if limit else ordered
+
+    def test_sorted_queries_match_full_sort(self):
+        for criteria in CRITERIA:
+            for sort_by in SORT_KEYS:
+                for descending in (False, True):
+                    for limit in (None, 1, 20):
+                        with self.subTest(criteria=criteria, sort_by=sort_by, descending=descending, limit=limit):
+                            received = list(self.db.query(create_filters(**criteria), sort_by=sort_by,
+                                                          descending=descending, limit=limit))
+                            self.assertEqual(self.expected(criteria, sort_by, descending, limit), received)
+
+    def test_unsorted_query_respects_limit(self):
+        received = list(self.db.query(create_filters(), limit=5))
+        self.assertEqual(list(self.db.query(create_filters()))[:5], received)
+
+    def test_closest_approaches_come_first(self):
+        received = list(self.db.query(create_filters(), sort_by='distance', limit=3))
+        closest = min(approach.distance for approach in self.db.query(create_filters()))
+        self.assertEqual(received[0].distance, closest)
+        self.assertLessEqual(received[0].distance, received[1].distance)
+
+    def test_driving_index_is_chosen_once(self):
+        filters = create_filters(distance_max=0.01)
+        expected = list(self.db.query(filters, sort_by='velocity', limit=5))
+        with unittest.mock.patch.object(self.db, '_choose_driver', wraps=self.db._choose_driver) as choose, \
+                unittest.mock.patch.object(self.db, '_driver_candidates',
+                                           wraps=self.db._driver_candidates) as candidates:
+            self.assertEqual(list(self.db.query(filters, sort_by='velocity', limit=5)), expected)
+        self.assertEqual((choose.call_count, candidates.call_count), (1, 1))
+
+    def test_unknown_sort_key_raises(self):
+        with self.assertRaises(ValueError):
+            list(self.db.query(create_filters(), sort_by='name'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Check that a linked `NEODatabase` can be saved to and opened from a column store.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_store
+"""
+import contextlib
+import datetime
+import io
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from main import main
+from store import open_store, write_store, StoreError, MANIFEST
+from tests.support import describe
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestStore(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.directory = pathlib.Path(cls.tmpdir.name) / 'neodb'
+        cls.loaded = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        write_store(cls.loaded, cls.directory)
+        cls.opened = open_store(cls.directory)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_store_writes_manifest(self):
+        self.assertTrue((self.directory / MANIFEST).exists())
+
+    def test_opened_database_matches_loaded_database(self):
+        self.assertEqual(describe(self.opened), describe(self.loaded))
+
+    def test_opened_database_queries_match_loaded_database(self):
+        criteria = [
+            {'date': datetime.date(2020, 3, 2)},
+            {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 3, 31)},
+            {'distance_max': 0.1, 'velocity_min': 15},
+            {'diameter_max': 1.0, 'hazardous': True},
+        ]
+        for kwargs in criteria:
+            with self.subTest(**kwargs):
+                self.assertEqual(describe(self.opened, **kwargs), describe(self.loaded, **kwargs))
+
+    def test_opened_database_looks_up_neos(self):
+        neo = self.opened.get_neo_by_name('Adonis')
+        self.assertEqual(neo.designation, '2101')
+        self.assertIs(self.opened.get_neo_by_designation('2101'), neo)
+
+    def test_neo_approaches_link_back_to_neo(self):
+        loaded = self.loaded.get_neo_by_designation('2101')
+        opened = self.opened.get_neo_by_designation('2101')
+        self.assertEqual(len(opened.approaches), len(loaded.approaches))
+        for approach in opened.approaches:
+            self.assertIs(approach.neo, opened)
+
+    def test_approach_is_created_once(self):
+        approaches = list(self.opened.query(create_filters(date=datetime.date(2020, 3, 2))))
+        again = list(self.opened.query(create_filters(date=datetime.date(2020, 3, 2))))
+        self.assertTrue(approaches)
+        for first, second in zip(approaches, again):
+            self.assertIs(first, second)
+
+    def test_missing_store_raises_store_error(self):
+        with self.assertRaises(StoreError):
+            open_store(pathlib.Path(self.tmpdir.name) / 'missing')
+
+    def test_main_reports_missing_store(self):
+        missing = pathlib.Path(self.tmpdir.name) / 'missing'
+        stderr = io.StringIO()
+        with unittest.mock.patch('sys.argv', ['main.py', '--store', str(missing), 'inspect', '--pdes', '433']), \
+                contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as raised:
+            main()
+        self.assertNotEqual(raised.exception.code, 0)
+        self.assertIn(str(missing), stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
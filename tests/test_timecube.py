@@ -0,0 +1,75 @@
+"""Check that counts from a `TimeCube` match counting the results of a query.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_timecube
+"""
+import datetime
+import pathlib
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, FilterPlan
+from timecube import DISTANCE_EDGES, VELOCITY_EDGES, band, band_range
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestBands(unittest.TestCase):
+    def test_edges_have_bands_of_their_own(self):
+        self.assertEqual(band(0.05, DISTANCE_EDGES), 2 * DISTANCE_EDGES.index(0.05) + 1)
+        self.assertEqual(band(0.04, DISTANCE_EDGES), 2 * DISTANCE_EDGES.index(0.05))
+        self.assertEqual(band(0.06, DISTANCE_EDGES), 2 * DISTANCE_EDGES.index(0.05) + 2)
+        self.assertEqual(band(float('nan'), VELOCITY_EDGES), 2 * len(VELOCITY_EDGES) + 1)
+
+    def test_bounds_at_edges_select_bands(self):
+        k = DISTANCE_EDGES.index(0.05)
+        self.assertEqual(band_range((None, 0.05), DISTANCE_EDGES), range(0, 2 * k + 2))
+        self.assertEqual(band_range((0.05, None), DISTANCE_EDGES), range(2 * k + 1, 2 * len(DISTANCE_EDGES) + 1))
+        self.assertIsNone(band_range((0.042, None), DISTANCE_EDGES))
+
+
+class TestTimeCube(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def test_counts_match_queries(self):
+        criteria = [
+            {},
+            {'date': datetime.date(2020, 1, 1)},
+            {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 6, 30)},
+            {'distance_max': 0.05},
+            {'distance_min': 0.05, 'velocity_max': 20},
+            {'start_date': datetime.date(2020, 2, 1), 'distance_max': 0.1, 'velocity_min': 10, 'hazardous': True},
+            {'end_date': datetime.date(2020, 4, 1), 'hazardous': False},
+        ]
+        for kwargs in criteria:
+            with self.subTest(**kwargs):
+                plan = FilterPlan.from_filters(create_filters(**kwargs))
+                expected = len(list(self.db.query(plan)))
+                self.assertEqual(self.db._time_cube().count(plan), expected)
+                self.assertEqual(self.db.count(plan), expected)
+
+    def test_counts_do_not_scan_when_the_cube_fits(self):
+        with unittest.mock.patch.object(NEODatabase, 'query_indices', side_effect=AssertionError):
+            self.db.count(create_filters(start_date=datetime.date(2020, 2, 1), distance_max=0.1))
+
+    def test_criteria_off_the_edges_fall_back_to_a_search(self):
+        for kwargs in ({'distance_max': 0.042}, {'diameter_min': 0.5}, {'velocity_min': 12.5, 'hazardous': True}):
+            with self.subTest(**kwargs):
+                plan = FilterPlan.from_filters(create_filters(**kwargs))
+                self.assertIsNone(self.db._time_cube().count(plan))
+                self.assertEqual(self.db.count(plan), len(list(self.db.query(plan))))
+
+    def test_contradictory_criteria_count_nothing(self):
+        self.assertEqual(self.db.count(create_filters(distance_min=0.1, distance_max=0.05)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
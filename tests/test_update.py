@@ -0,0 +1,152 @@
+"""Check that updating a `NEODatabase` in place matches loading the new data from scratch.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_update
+"""
+import csv
+import datetime
+import json
+import pathlib
+import tempfile
+import unittest
+
+from cache import QueryCache
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from tests.support import describe
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestUpdate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(cls.tmpdir.name)
+        cls.neo_file = root / 'neos.csv'
+        cls.cad_file = root / 'cad.json'
+
+        with open(TEST_NEO_FILE) as neo_file:
+            rows = list(csv.DictReader(neo_file))
+        fieldnames = list(rows[0])
+        by_designation = {row['pdes']: row for row in rows}
+        by_designation['2101']['diameter'] = '0.7'   # Adonis grows.
+        by_designation['4581']['name'] = 'Renamed'   # Asclepius is renamed.
+        rows.remove(by_designation['2011 YE40'])     # An NEO is removed, but its approaches stay.
+        rows.append(dict(rows[0], pdes='2099 ZZ', name='Newcomer', diameter='', pha='Y'))
+        with open(cls.neo_file, 'w', newline='') as neo_file:
+            writer = csv.DictWriter(neo_file, fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        document = json.loads(TEST_CAD_FILE.read_text())
+        data = document['data']
+        dist = document['fields'].index('dist')
+        cls.removed = data[10:20]
+        del data[10:20]
+        data[0][dist] = '0.5'
+        data.append(['2099 ZZ'] + data[1][1:])
+        data.append(['2099 ZY'] + data[2][1:])
+        cls.cad_file.write_text(json.dumps(document))
+
+        cls.fresh = NEODatabase(load_neos(cls.neo_file), load_approaches(cls.cad_file))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def setUp(self):
+        self.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        self.delta = self.db.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+
+    def test_delta_counts_changes(self):
+        self.assertEqual((self.delta.neos_added, self.delta.neos_removed, self.delta.neos_changed), (1, 1, 2))
+        self.assertEqual((self.delta.approaches_added, self.delta.approaches_removed,
+                          self.delta.approaches_changed), (2, 10, 1))
+
+    def test_updated_database_matches_fresh_database(self):
+        criteria = [
+            {},
+            {'start_date': datetime.date(2020, 3, 1), 'end_date': datetime.date(2020, 6, 30)},
+            {'date': datetime.date(2020, 1, 1)},
+            {'distance_max': 0.1, 'hazardous': True},
+            {'diameter_min': 0.65},
+        ]
+        for kwargs in criteria:
+            with self.subTest(**kwargs):
+                self.assertEqual(describe(self.db, **kwargs), describe(self.fresh, **kwargs))
+
+    def test_lookups_are_updated(self):
+        self.assertIsNone(self.db.get_neo_by_name('Asclepius'))
+        self.assertEqual(self.db.get_neo_by_name('Renamed').designation, '4581')
+        self.assertIsNone(self.db.get_neo_by_designation('2011 YE40'))
+        newcomer = self.db.get_neo_by_name('Newcomer')
+        self.assertEqual(len(newcomer.approaches), 1)
+        self.assertIs(newcomer.approaches[0].neo, newcomer)
+
+    def test_kept_objects_keep_identity(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        adonis = db.get_neo_by_designation('2101')
+        first = next(iter(db.query(create_filters())))
+        db.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+        self.assertIs(db.get_neo_by_designation('2101'), adonis)
+        self.assertEqual(adonis.diameter, 0.7)
+        self.assertIs(next(iter(db.query(create_filters()))), first)
+        self.assertEqual(first.distance, 0.5)
+
+    def test_update_with_same_data_changes_nothing(self):
+        generation = self.db.generation
+        delta = self.db.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+        self.assertEqual(tuple(delta), (0, 0, 0, 0, 0, 0))
+        self.assertEqual(self.db.generation, generation)
+        self.assertEqual(describe(self.db), describe(self.fresh))
+
+    def test_update_with_same_data_keeps_columns_and_indexes(self):
+        self.db.build_indexes()
+        columns, time_order, statistics = self.db._columns, self.db._time_order, self.db._statistics
+        self.db.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+        self.assertIs(self.db._columns, columns)
+        self.assertIs(self.db._time_order, time_order)
+        self.assertIs(self.db._statistics, statistics)
+
+    def test_time_cube_is_updated(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        db.build_indexes()
+        cube = db._cube
+        db.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+        self.assertIs(db._cube, cube)
+        fresh_cube = self.fresh._time_cube()
+        self.assertEqual({cell: list(days) for cell, days in cube._days.items() if days},
+                         {cell: list(days) for cell, days in fresh_cube._days.items()})
+        for kwargs in ({}, {'hazardous': True}, {'distance_max': 0.5, 'start_date': datetime.date(2020, 3, 1)}):
+            with self.subTest(**kwargs):
+                self.assertEqual(db.count(create_filters(**kwargs)), len(describe(self.fresh, **kwargs)))
+
+    def test_sorted_indexes_are_updated(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        db.build_indexes()
+        db.update(load_neos(self.neo_file), load_approaches(self.cad_file))
+        self.fresh.build_indexes()
+        self.assertEqual(set(db._sorted_indexes), set(self.fresh._sorted_indexes))
+        for key, index in self.fresh._sorted_indexes.items():
+            with self.subTest(index=getattr(key, '__name__', key)):
+                self.assertEqual([list(part) for part in db._sorted_indexes[key]], [list(part) for part in index])
+        for kwargs in ({'distance_max': 0.1}, {'velocity_min': 30}, {'diameter_min': 0.65}, {'hazardous': True}):
+            with self.subTest(**kwargs):
+                self.assertEqual(describe(db, **kwargs), describe(self.fresh, **kwargs))
+
+    def test_update_empties_query_cache(self):
+        cache = QueryCache()
+        list(cache.query(self.db, create_filters(distance_max=0.1)))
+        self.db.update(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        list(cache.query(self.db, create_filters(distance_max=0.1)))
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
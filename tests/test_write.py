@@ -18,16 +18,19 @@ import collections.abc
 import contextlib
 import csv
 import datetime
+import gzip
 import io
 import json
+import lzma
 import pathlib
+import tempfile
 import unittest
 import unittest.mock
 
 
 from extract import load_neos, load_approaches
 from database import NEODatabase
-from write import write_to_csv, write_to_json
+from write import write_to_csv, write_to_json, write_to_ndjson, write_ndjson, output_format
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -131,6 +134,17 @@ class TestWriteToCSV(unittest.TestCase):
         self.assertGreater(len(rows), 0)
         self.assertSetEqual(set(fieldnames), set(rows[0].keys()))
 
+    def test_csv_data_matches_serialized_rows(self):
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(('datetime_utc', 'distance_au', 'velocity_km_s', 'designation', 'name',
+                         'diameter_km', 'potentially_hazardous'))
+        for approach in build_results(5):
+            serialized = approach.serialize()
+            writer.writerow([serialized['datetime_utc'], serialized['distance_au'], serialized['velocity_km_s'],
+                             *serialized['neo'].values()])
+        self.assertEqual(self.value, buf.getvalue())
+
 
 class TestWriteToJSON(unittest.TestCase):
     @classmethod
@@ -226,5 +240,83 @@ class TestWriteToJSON(unittest.TestCase):
         self.assertIsInstance(approach['neo']['potentially_hazardous'], bool)
 
 
+class TestWriteToJSONStreaming(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(5)
+
+    @unittest.mock.patch('write.open')
+    def write(self, results, mock_file, **kwargs):
+        with UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+            write_to_json(results, None, **kwargs)
+            buf.seek(0)
+            return buf.getvalue()
+
+    def test_json_data_matches_indented_dump(self):
+        expected = json.dumps([approach.serialize() for approach in self.results], indent=4)
+        self.assertEqual(self.write(self.results), expected)
+
+    def test_compact_json_data_has_no_whitespace_between_tokens(self):
+        expected = json.dumps([approach.serialize() for approach in self.results], separators=(',', ':'))
+        self.assertEqual(self.write(self.results, compact=True), expected)
+
+    def test_empty_results_write_empty_list(self):
+        self.assertEqual(self.write([]), '[]')
+        self.assertEqual(self.write([], compact=True), '[]')
+
+    def test_json_data_is_written_from_generator(self):
+        value = self.write(approach for approach in self.results)
+        self.assertEqual(len(json.loads(value)), 5)
+
+
+class TestWriteNDJSONAndCompressed(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(5)
+        cls.expected = [approach.serialize() for approach in cls.results]
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ndjson_stream_has_one_object_per_line(self):
+        buf = io.StringIO()
+        write_ndjson(self.results, buf)
+        lines = buf.getvalue().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual([json.loads(line) for line in lines][0].keys(), self.expected[0].keys())
+
+    def test_ndjson_file(self):
+        path = self.root / 'results.ndjson'
+        write_to_ndjson(self.results, path)
+        self.assertEqual(len(path.read_text().splitlines()), 5)
+
+    def test_gzip_csv_matches_plain_csv(self):
+        write_to_csv(self.results, self.root / 'results.csv')
+        write_to_csv(self.results, self.root / 'results.csv.gz')
+        with gzip.open(self.root / 'results.csv.gz', 'rt') as compressed:
+            self.assertEqual(compressed.read(), (self.root / 'results.csv').read_text())
+
+    def test_xz_ndjson_decompresses(self):
+        path = self.root / 'results.ndjson.xz'
+        write_to_ndjson(self.results, path)
+        with lzma.open(path, 'rt') as compressed:
+            self.assertEqual(len(compressed.read().splitlines()), 5)
+
+    def test_compression_error_is_raised(self):
+        with self.assertRaises(OSError):
+            write_to_json(self.results, self.root / 'missing' / 'results.json.gz')
+
+    def test_output_format(self):
+        self.assertEqual(output_format(pathlib.Path('results.csv')), '.csv')
+        self.assertEqual(output_format(pathlib.Path('results.json.bz2')), '.json')
+        self.assertEqual(output_format(pathlib.Path('results.ndjson.gz')), '.ndjson')
+        self.assertIsNone(output_format(pathlib.Path('results.txt.gz')))
+
+
 if __name__ == '__main__':
     unittest.main()
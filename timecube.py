@@ -0,0 +1,143 @@
+"""Count close approaches over date ranges and bands of values, without scanning them.
+
+A `TimeCube` sorts every close approach into a cell by its distance band, its
+velocity band and its NEO's hazardous flag, and keeps, for each cell, the days
+(since `helpers.EPOCH`) of its approaches in sorted order. That sorted list is
+the cell's cumulative count per day: the number of its approaches up to any day
+is one binary search, so the number in a date range is the difference of two.
+A count over a date range and a combination of bands is the sum of those
+differences over the matching cells - a few hundred binary searches at most,
+however many approaches there are.
+
+Bands are split at the edges in `DISTANCE_EDGES` and `VELOCITY_EDGES`. Each
+edge is a band of its own, between the open bands on either side of it, so that
+both `--min-distance` and `--max-distance` at an edge select whole bands. A
+count can only be answered from the cube if every distance and velocity bound
+is an edge, and there are no other criteria than dates and the hazardous flag;
+`TimeCube.count` returns None otherwise.
+
+A cube is kept up to date with `add` and `remove` as close approaches change
+(see `NEODatabase.update`), rather than rebuilt.
+"""
+import array
+import bisect
+
+from filters import DateFilter, DistanceFilter, VelocityFilter, IsHaradousFilter
+from helpers import MINUTES_PER_DAY, MISSING_DAY, date_to_day
+
+
+# The band edges, in astronomical units and kilometers per second.
+DISTANCE_EDGES = (0.0, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5)
+VELOCITY_EDGES = (0.0, 1.0, 2.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0, 40.0, 50.0)
+
+
+def band(value, edges):
+    """Find the band of a value.
+
+    Band `2k + 1` holds exactly `edges[k]`; band `2k` holds the values between
+    `edges[k - 1]` and `edges[k]`; band `2 * len(edges)` holds the values past
+    the last edge; and band `2 * len(edges) + 1` holds NaN.
+
+    :param value: A number.
+    :param edges: A sorted tuple of band edges.
+    :return: The band of the value.
+    """
+    if value != value:
+        return 2 * len(edges) + 1
+    k = bisect.bisect_left(edges, value)
+    return 2 * k + 1 if k < len(edges) and edges[k] == value else 2 * k
+
+
+def band_range(interval, edges):
+    """Find the bands that a closed interval selects, if its bounds are band edges.
+
+    :param interval: A `(low, high)` interval, either end of which may be None, or None if unbounded.
+    :param edges: A sorted tuple of band edges.
+    :return: A `range` of bands, or None if a bound isn't one of the edges.
+    """
+    if interval is None:
+        return range(2 * len(edges) + 2)
+    low, high = interval
+    start, stop = 0, 2 * len(edges) + 1
+    if low is not None:
+        if low not in edges:
+            return None
+        start = 2 * edges.index(low) + 1
+    if high is not None:
+        if high not in edges:
+            return None
+        stop = 2 * edges.index(high) + 2
+    return range(start, stop)
+
+
+class TimeCube:
+    """The days of the close approaches in each cell of (hazardous flag, distance band, velocity band)."""
+    distance_bands = 2 * len(DISTANCE_EDGES) + 2
+    velocity_bands = 2 * len(VELOCITY_EDGES) + 2
+
+    def __init__(self, columns, time_order):
+        """Build a new `TimeCube` from the columns of a set of close approaches.
+
+        :param columns: A `columnar.ApproachColumns` of the close approaches.
+        :param time_order: The positions of the close approaches, sorted by time.
+        """
+        self.cells = array.array('h', map(self.cell, columns.hazardous, columns.distance, columns.velocity))
+        self._days = {}
+        cells, time = self.cells, columns.time
+        for index in time_order:
+            days = self._days.get(cells[index])
+            if days is None:
+                days = self._days[cells[index]] = array.array('q')
+            days.append(time[index] // MINUTES_PER_DAY)
+
+    @classmethod
+    def cell(cls, hazardous, distance, velocity):
+        """Return the cell of a close approach from its NEO's hazardous flag, its distance and its velocity."""
+        return ((bool(hazardous) * cls.distance_bands + band(distance, DISTANCE_EDGES)) * cls.velocity_bands
+                + band(velocity, VELOCITY_EDGES))
+
+    def add(self, cell, minute):
+        """Count a close approach at a time (in minutes since `helpers.EPOCH`) in a cell."""
+        days = self._days.setdefault(cell, array.array('q'))
+        bisect.insort(days, minute // MINUTES_PER_DAY)
+
+    def remove(self, cell, minute):
+        """Stop counting a close approach at a time (in minutes since `helpers.EPOCH`) in a cell."""
+        days = self._days[cell]
+        del days[bisect.bisect_left(days, minute // MINUTES_PER_DAY)]
+
+    def count(self, plan):
+        """Count the close approaches that match a filter plan, if its criteria fit the cube.
+
+        :param plan: A `FilterPlan` capturing user-specified criteria.
+        :return: The number of matching close approaches, or None if the plan has other
+                 criteria than dates, the hazardous flag, and distance and velocity bounds
+                 at band edges.
+        """
+        if plan.residual or set(plan.intervals) - {DateFilter, DistanceFilter, VelocityFilter, IsHaradousFilter}:
+            return None
+        distance_bands = band_range(plan.intervals.get(DistanceFilter), DISTANCE_EDGES)
+        velocity_bands = band_range(plan.intervals.get(VelocityFilter), VELOCITY_EDGES)
+        if distance_bands is None or velocity_bands is None:
+            return None
+        low, high = plan.intervals.get(IsHaradousFilter, (None, None))
+        flags = [flag for flag in (False, True) if (low is None or low <= flag) and (high is None or flag <= high)]
+
+        first, last = plan.intervals.get(DateFilter, (None, None))
+        first = None if first is None else date_to_day(first)
+        last = None if last is None else date_to_day(last)
+        if DateFilter in plan.intervals and last is None:
+            # Approaches with an unknown time are counted on `helpers.MISSING_DAY`, outside every date range.
+            last = MISSING_DAY - 1
+        total = 0
+        for flag in flags:
+            for distance_band in distance_bands:
+                base = (flag * self.distance_bands + distance_band) * self.velocity_bands
+                for velocity_band in velocity_bands:
+                    days = self._days.get(base + velocity_band)
+                    if not days:
+                        continue
+                    start = 0 if first is None else bisect.bisect_left(days, first)
+                    stop = len(days) if last is None else bisect.bisect_right(days, last)
+                    total += max(stop - start, 0)
+        return total
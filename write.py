@@ -1,17 +1,135 @@
-"""Write a stream of close approaches to CSV or to JSON.
+"""Write a stream of close approaches to CSV, to JSON or to newline-delimited JSON.
 
-This module exports two functions: `write_to_csv` and `write_to_json`, each of
-which accept an `results` stream of close approaches and a path to which to
-write the data.
+This module exports three functions: `write_to_csv`, `write_to_json` and
+`write_to_ndjson`, each of which accept an `results` stream of close approaches
+and a path to which to write the data. The `write_ndjson` function writes
+newline-delimited JSON to an already-open stream, such as standard output.
+The `write_groups_to_csv` and `write_groups_to_json` functions write the
+grouped statistics of the `aggregate` subcommand instead.
 
 These functions are invoked by the main module with the output of the `limit`
 function and the filename supplied by the user at the command line. The file's
-extension determines which of these functions is used.
+extension determines which of these functions is used (see `output_format`).
+
+An output file whose name ends in `.gz`, `.bz2` or `.xz` is compressed with
+gzip, bzip2 or LZMA. The compressor runs on a background thread, fed through
+a bounded queue, so that finding and formatting results overlaps compressing
+them.
 
 You'll edit this file in Part 4.
 """
+import bz2
 import csv
+import gzip
+import io
 import json
+import lzma
+import pathlib
+import queue
+import threading
+
+from aggregate import GroupStats
+
+
+# The size of the write buffer for output files, in bytes.
+WRITE_BUFFER_SIZE = 1 << 20
+
+# The function to open a compressed file with, by file extension.
+COMPRESSORS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+# The output formats, by file extension.
+FORMATS = ('.csv', '.json', '.ndjson')
+
+
+def output_format(filename):
+    """Return the output format of a filename, from its extension.
+
+    A compression extension is looked through, so `results.csv.gz` is written as CSV.
+
+    :param filename: A Path-like object pointing to where the data should be saved.
+    :return: One of `FORMATS`, or None if the filename has no known format.
+    """
+    path = pathlib.PurePath(filename)
+    if path.suffix in COMPRESSORS:
+        path = path.with_suffix('')
+    return path.suffix if path.suffix in FORMATS else None
+
+
+class _BackgroundCompressor(io.RawIOBase):
+    """A binary stream that compresses what is written to it on a background thread.
+
+    Each write is put on a bounded queue, and a worker thread takes chunks off
+    the queue and writes them to a compressed file. The compressors release the
+    GIL while they work, so the writer keeps producing while the previous chunk
+    is compressed. An error on the worker thread is raised by the next write, or
+    by `close`.
+    """
+    def __init__(self, filename, open_compressed, queue_size=8):
+        """Create a new `_BackgroundCompressor`, and start its worker thread.
+
+        :param filename: A Path-like object pointing to where the compressed data should be saved.
+        :param open_compressed: A function to open a compressed file, such as `gzip.open`.
+        :param queue_size: The number of chunks that may wait to be compressed.
+        """
+        super().__init__()
+        self._chunks = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._worker = threading.Thread(target=self._compress, args=(filename, open_compressed), daemon=True)
+        self._worker.start()
+
+    def writable(self):
+        """Return True, since this stream can be written to."""
+        return True
+
+    def write(self, data):
+        """Queue a chunk of data to be compressed."""
+        self._check_worker()
+        self._chunks.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        """Wait for every queued chunk to be compressed, and close the compressed file."""
+        if self.closed:
+            return
+        self._chunks.put(None)
+        self._worker.join()
+        super().close()
+        self._check_worker()
+
+    def _check_worker(self):
+        """Raise the error that stopped the worker thread, if any, once."""
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _compress(self, filename, open_compressed):
+        """Compress queued chunks into the file, until the end-of-data marker (None)."""
+        try:
+            with open_compressed(filename, 'wb') as compressed_file:
+                for chunk in iter(self._chunks.get, None):
+                    compressed_file.write(chunk)
+        except Exception as err:
+            self._error = err
+            # Keep taking chunks off the queue, so that the writer is never blocked.
+            for _ in iter(self._chunks.get, None):
+                pass
+
+
+def _open_output(filename):
+    """Open an output file for writing text, compressing it if its extension asks for it.
+
+    :param filename: A Path-like object pointing to where the data should be saved.
+    :return: A writable text file object.
+    """
+    open_compressed = COMPRESSORS.get(pathlib.PurePath(filename).suffix) if filename is not None else None
+    if open_compressed is None:
+        return open(filename, mode='w', buffering=WRITE_BUFFER_SIZE)
+    compressor = _BackgroundCompressor(filename, open_compressed)
+    return io.TextIOWrapper(io.BufferedWriter(compressor, WRITE_BUFFER_SIZE))
 
 
 def write_to_csv(results, filename):
@@ -21,23 +139,31 @@ def write_to_csv(results, filename):
     corresponds to the information in a single close approach from the `results`
     stream and its associated near-Earth object.
 
+    Each row is built as a tuple straight from the attributes of the approach
+    and its NEO, rather than through `CloseApproach.serialize`, and the rows are
+    handed to the CSV writer in one `writerows` call through a large buffer. The
+    output is the same as writing each row of `serialize()` values.
+
     :param results: An iterable of `CloseApproach` objects.
     :param filename: A Path-like object pointing to where the data should be saved.
     """
     fieldnames = ('datetime_utc', 'distance_au', 'velocity_km_s', 'designation', 'name', 'diameter_km', 'potentially_hazardous')
 
-    with open(filename, mode='w') as neo_file:
+    with _open_output(filename) as neo_file:
         neo_writer = csv.writer(neo_file, delimiter=',')
         neo_writer.writerow(fieldnames)
-        for row in results:
-            ser_approach = row.serialize()
-            ser_neo = ser_approach['neo']
-            neo_writer.writerow([ser_approach['datetime_utc'], ser_approach['distance_au'], ser_approach['velocity_km_s'],
-                                 ser_neo['designation'], ser_neo['name'], ser_neo['diameter_km'],
-                                 ser_neo['potentially_hazardous']])
+        neo_writer.writerows(_csv_rows(results))
 
 
-def write_to_json(results, filename):
+def _csv_rows(results):
+    """Generate the CSV row of each `CloseApproach`, as a tuple of its values and its NEO's."""
+    for approach in results:
+        neo = approach.neo
+        yield (approach.time_str, approach.distance, approach.velocity,
+               neo.designation, '' if neo.name is None else neo.name, neo.diameter, neo.hazardous)
+
+
+def write_to_json(results, filename, compact=False):
     """Write an iterable of `CloseApproach` objects to a JSON file.
 
     The precise output specification is in `README.md`. Roughly, the output is a
@@ -45,13 +171,89 @@ def write_to_json(results, filename):
     their values and the 'neo' key mapping to a dictionary of the associated
     NEO's attributes.
 
+    The list is written one element at a time, as each close approach arrives
+    from `results`, so the full result set is never held in memory. The output
+    is the same as that of `json.dump(..., indent=4)` on the whole list, or of
+    `json.dump(..., separators=(',', ':'))` if `compact` is set.
+
     :param results: An iterable of `CloseApproach` objects.
     :param filename: A Path-like object pointing to where the data should be saved.
+    :param compact: Whether to leave out the indentation and the whitespace between tokens.
     """
+    if compact:
+        encode = json.JSONEncoder(separators=(',', ':')).encode
+        start, separator, end = '[', ',', ']'
+    else:
+        indented = json.JSONEncoder(indent=4).encode
+
+        def encode(element):
+            # Nest the element one level deeper. JSON strings escape their newlines, so only line breaks match.
+            return '    ' + indented(element).replace('\n', '\n    ')
 
-    with open(filename, mode='w') as neo_file:
-        approach_list = []
+        start, separator, end = '[\n', ',\n', '\n]'
+
+    with _open_output(filename) as neo_file:
+        write = neo_file.write
+        empty = True
         for row in results:
-            approach_list.append(row.serialize())
-        json_object = json.dumps(approach_list, indent=4)
-        neo_file.write(json_object)
+            write(separator if not empty else start)
+            write(encode(row.serialize()))
+            empty = False
+        write('[]' if empty else end)
+
+
+def write_ndjson(results, stream):
+    """Write an iterable of `CloseApproach` objects to an open stream, as newline-delimited JSON.
+
+    Each close approach is written as one line holding the compact JSON object
+    of its `serialize()` values, as soon as it arrives from `results`.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param stream: A writable text file object, such as `sys.stdout`.
+    """
+    encode = json.JSONEncoder(separators=(',', ':')).encode
+    write = stream.write
+    for row in results:
+        write(encode(row.serialize()))
+        write('\n')
+
+
+def write_to_ndjson(results, filename):
+    """Write an iterable of `CloseApproach` objects to a newline-delimited JSON file.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    with _open_output(filename) as neo_file:
+        write_ndjson(results, neo_file)
+
+
+def write_groups_to_csv(groups, group_by, filename):
+    """Write the grouped statistics of close approaches to a CSV file.
+
+    Each row holds one group: its label (in a column named after `group_by`),
+    then its count and its minimum, mean and maximum distance and velocity.
+
+    :param groups: An iterable of `aggregate.GroupStats`.
+    :param group_by: The attribute the close approaches were grouped by, such as 'year'.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    with _open_output(filename) as groups_file:
+        writer = csv.writer(groups_file)
+        writer.writerow((group_by,) + GroupStats._fields[1:])
+        writer.writerows(('' if group.group is None else group.group,) + tuple(group[1:]) for group in groups)
+
+
+def write_groups_to_json(groups, group_by, filename):
+    """Write the grouped statistics of close approaches to a JSON file.
+
+    The output is a list of dictionaries, one per group, mapping `group_by` to
+    the group's label, and each statistic's name to its value.
+
+    :param groups: An iterable of `aggregate.GroupStats`.
+    :param group_by: The attribute the close approaches were grouped by, such as 'year'.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    rows = [dict(zip((group_by,) + GroupStats._fields[1:], group)) for group in groups]
+    with _open_output(filename) as groups_file:
+        json.dump(rows, groups_file, indent=4)